@@ -0,0 +1,112 @@
+"""
+Problema del Viajero (TSP) - Animación de la optimización
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Reproduce las rutas intermedias de una optimización. Los puntos, los
+extremos, la leyenda, la cuadrícula y los bordes se dibujan una sola vez;
+en cada cuadro solo cambian los datos de la línea de la ruta y los textos
+de iteración y progreso, que se redibujan con blitting (se restaura el fondo
+guardado y se pintan encima únicamente esos artistas). Las longitudes de
+todos los cuadros se calculan antes de empezar.
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.animation import FuncAnimation
+
+
+# Longitud de cada ruta de la secuencia (calculada con NumPy)
+def longitudes_rutas(coords, rutas):
+    xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    longitudes = []
+    for ruta in rutas:
+        tramos = np.diff(xy[np.asarray(ruta, dtype=np.intp)], axis=0)
+        longitudes.append(float(np.hypot(tramos[:, 0], tramos[:, 1]).sum()))
+    return longitudes
+
+
+# Crea la ventana de animación de una secuencia de rutas
+def animar_rutas(coords, rutas, titulo, intervalo=200, longitudes=None):
+    """
+    rutas es una secuencia (len y rutas[i]) de rutas sobre los índices de
+    coords, todas con los mismos extremos. intervalo es el tiempo entre
+    cuadros en milisegundos. Si no se dan las longitudes de cada ruta se
+    calculan aquí, una sola vez.
+    Devuelve (figura, animación). La animación queda guardada también en la
+    figura para que no se libere mientras la ventana esté abierta.
+    """
+    xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    x_all, y_all = xy[:, 0], xy[:, 1]
+    if longitudes is None:
+        longitudes = longitudes_rutas(xy, rutas)
+    num_cuadros = len(rutas)
+    ultimo = max(num_cuadros - 1, 1)
+
+    # Crear figura de animación con espacio para título y progreso
+    fig_anim = plt.figure(figsize=(14, 9))
+    fig_anim.patch.set_facecolor('#ffffff')
+    ax_anim = plt.subplot2grid((20, 1), (1, 0), rowspan=18, fig=fig_anim)
+
+    # Límites fijos para toda la animación
+    ax_anim.set_xlim(x_all.min() - 5, x_all.max() + 5)
+    ax_anim.set_ylim(y_all.min() - 5, y_all.max() + 5)
+    ax_anim.set_aspect('equal', adjustable='box')
+
+    # Parte fija: puntos, extremos, leyenda, cuadrícula y bordes (mismo estilo que graficar_ruta)
+    puntos = ax_anim.scatter(x_all, y_all, c='#3498db', s=70, alpha=0.6,
+                    edgecolors='#2c3e50', linewidth=1.2, zorder=3)
+    primera = rutas[0]
+    inicio = ax_anim.scatter(xy[primera[0], 0], xy[primera[0], 1], c='#2ecc71', s=200,
+                    marker='o', edgecolors='#27ae60', linewidth=2.5, zorder=4, label='Inicio')
+    fin = ax_anim.scatter(xy[primera[-1], 0], xy[primera[-1], 1], c='#e74c3c', s=200,
+                    marker='s', edgecolors='#c0392b', linewidth=2.5, zorder=4, label='Fin')
+    leyenda = ax_anim.legend(loc='upper right', fontsize=10, frameon=True,
+                   shadow=False, fancybox=False, framealpha=0.95,
+                   edgecolor='#bdc3c7')
+    ax_anim.grid(True, alpha=0.2, linestyle='-', color='#bdc3c7', linewidth=0.5)
+    ax_anim.set_facecolor('#f8f9fa')
+    for spine in ax_anim.spines.values():
+        spine.set_edgecolor('#bdc3c7')
+        spine.set_linewidth(1)
+
+    # Parte que cambia: la línea de la ruta
+    (linea,) = ax_anim.plot([], [], color='#e74c3c', linewidth=2.5, alpha=0.8,
+                            solid_capstyle='round', zorder=2)
+
+    # Los textos de arriba y abajo van en unos ejes invisibles que cubren la
+    # figura: el blitting restaura y copia la región de los ejes de cada artista
+    ax_textos = fig_anim.add_axes([0, 0, 1, 1])
+    ax_textos.set_axis_off()
+    ax_textos.set_zorder(-1)
+    titulo_text = ax_textos.text(0.5, 0.96, "", ha='center', va='top',
+                                 fontsize=14, color='#2c3e50', weight='bold')
+    progress_text = ax_textos.text(0.5, 0.02, "", ha='center', va='bottom',
+                                   fontsize=11, color='#2c3e50', weight='bold',
+                                   bbox=dict(boxstyle="round,pad=0.4",
+                                             facecolor='#ecf0f1', alpha=0.9,
+                                             edgecolor='#95a5a6', linewidth=1.5))
+    # Los puntos y la leyenda se vuelven a pintar encima de la línea, como en graficar_ruta
+    artistas = (linea, puntos, inicio, fin, leyenda, titulo_text, progress_text)
+
+    def iniciar():
+        linea.set_data([], [])
+        titulo_text.set_text("")
+        progress_text.set_text("")
+        return artistas
+
+    def update(frame):
+        orden = np.asarray(rutas[frame], dtype=np.intp)
+        linea.set_data(x_all[orden], y_all[orden])
+        titulo_text.set_text(f"{titulo}\nIteración {frame}/{num_cuadros - 1}  |  "
+                             f"Distancia Actual: {longitudes[frame]:.2f}")
+        progreso = (frame / ultimo) * 100
+        barra = '█' * int(progreso / 2) + '░' * (50 - int(progreso / 2))
+        progress_text.set_text(f"Progreso: {progreso:.0f}% [{barra}]")
+        return artistas
+
+    fig_anim.subplots_adjust(left=0.08, right=0.95, top=0.93, bottom=0.08)
+    ani = FuncAnimation(fig_anim, update, frames=num_cuadros, init_func=iniciar,
+                        interval=intervalo, repeat=False, blit=True)
+    fig_anim.animacion = ani
+    return fig_anim, ani
@@ -0,0 +1,286 @@
+"""
+Problema del Viajero (TSP) - Banco de pruebas de rendimiento
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Ejecuta cada motor sobre los archivos datos_*.txt y sobre instancias
+aleatorias con semilla (uniformes y agrupadas en cúmulos, de 1k a 100k
+puntos) y guarda tiempo, memoria máxima y longitud de la ruta en un reporte
+JSON. Cada caso corre en un proceso nuevo para que la memoria medida sea solo
+la suya.
+
+Uso:
+    python benchmark.py                          # todos los casos
+    python benchmark.py --rapido                 # datos_*.txt y 1k puntos
+    python benchmark.py --tamanos 1000 5000 --motores or2opt or_lk
+    python benchmark.py --comparar anterior.json # marca regresiones
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import main_optimizado as m
+from busqueda_local import or2opt, or_lk
+from carga import cargar_puntos
+from construccion import arista_voraz, ruta_curva
+from distancias import matriz_distancias, vecinos_cercanos
+from dos_opt_vectorizado import dos_opt_vectorizado
+from genetico import algoritmo_genetico
+from indice_espacial import vecino_mas_cercano_rejilla
+from multi_start import multi_start_paralelo, semillas_intentos
+
+# Archivos de datos incluidos en el repositorio
+ARCHIVOS = ["datos_40.txt", "datos_60.txt", "datos_100.txt", "datos_200.txt"]
+
+# Tamaños y tipos de las instancias generadas
+TAMANOS = [1000, 10000, 100000]
+TIPOS = ["uniforme", "agrupada"]
+
+# Parámetros de Annealing (los mismos de main_optimizado)
+PARAMETROS_SA = dict(temp_inicial=10000, temp_final=0.01, alpha=0.97, iteraciones_por_temp=300)
+
+
+# Instancia uniforme en el cuadrado [0, 1000] x [0, 1000]
+def generar_uniforme(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return rng.uniform(0, 1000, size=(n, 2))
+
+
+# Instancia agrupada: cúmulos gaussianos con centros al azar
+def generar_agrupada(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    num_cumulos = max(2, int(math.sqrt(n) / 4))
+    centros = rng.uniform(0, 1000, size=(num_cumulos, 2))
+    cumulo = rng.integers(num_cumulos, size=n)
+    sigma = 1000 / (8 * math.sqrt(num_cumulos))
+    return centros[cumulo] + rng.normal(0, sigma, size=(n, 2))
+
+
+# --- Motores: cada uno recibe coords (lista de (x, y)) y devuelve una ruta ---
+
+def _vecino_mas_cercano(coords, opciones):
+    dist = matriz_distancias(coords)
+    return m.vecino_mas_cercano(coords, dist)
+
+
+def _dos_opt_simple(coords, opciones):
+    dist = matriz_distancias(coords)
+    return m.dos_opt_simple(coords, m.vecino_mas_cercano(coords, dist), dist)
+
+
+def _dos_opt_mejorado(coords, opciones):
+    dist = matriz_distancias(coords)
+    return m.dos_opt_mejorado(coords, m.vecino_mas_cercano(coords, dist), dist)
+
+
+# El pipeline completo de main_optimizado: NN, 2-opt, Or-opt y multi-start SA
+def _annealing_multistart(coords, opciones, adaptativo=False):
+    dist = matriz_distancias(coords)
+    ruta = m.dos_opt_mejorado(coords, m.vecino_mas_cercano(coords, dist), dist)
+    ruta = or2opt(coords, ruta, dist=dist)
+    mejor, mejor_clave = ruta, (m.longitud(coords, ruta, dist), 0)
+    _, semillas = semillas_intentos(opciones["intentos"], opciones["semilla"])
+    intentos = multi_start_paralelo(m.simulated_annealing, coords, ruta, semillas, opciones["procesos"], dist,
+                                    mostrar=False, adaptativo=adaptativo, **PARAMETROS_SA)
+    for intento, _, ruta_sa in intentos:
+        clave = (m.longitud(coords, ruta_sa, dist), intento)
+        if clave < mejor_clave:
+            mejor, mejor_clave = ruta_sa, clave
+    return mejor
+
+
+# El mismo pipeline con el enfriamiento adaptativo de Annealing
+def _annealing_adaptativo(coords, opciones):
+    return _annealing_multistart(coords, opciones, adaptativo=True)
+
+
+def _vecino_rejilla(coords, opciones):
+    return vecino_mas_cercano_rejilla(coords)
+
+
+def _curva_hilbert(coords, opciones):
+    return ruta_curva(coords, "hilbert")
+
+
+def _arista_voraz(coords, opciones):
+    return arista_voraz(coords)
+
+
+def _dos_opt_vectorizado(coords, opciones):
+    return dos_opt_vectorizado(coords, vecino_mas_cercano_rejilla(coords))
+
+
+def _or2opt(coords, opciones):
+    return or2opt(coords, vecino_mas_cercano_rejilla(coords), vecinos_cercanos(coords, 8))
+
+
+def _or_lk(coords, opciones):
+    return or_lk(coords, vecino_mas_cercano_rejilla(coords), vecinos_cercanos(coords, 8))
+
+
+# Algoritmo memético con islas (parte de arista voraz + Or-LK)
+def _genetico(coords, opciones):
+    return algoritmo_genetico(coords, procesos=opciones["procesos"], semilla=opciones["semilla"])
+
+
+# Nombre del motor -> (función, máximo de puntos en que se ejecuta)
+MOTORES = {
+    "vecino_mas_cercano": (_vecino_mas_cercano, 5000),
+    "dos_opt_simple": (_dos_opt_simple, 1000),
+    "dos_opt_mejorado": (_dos_opt_mejorado, 1000),
+    "annealing_multistart": (_annealing_multistart, 1000),
+    "annealing_adaptativo": (_annealing_adaptativo, 1000),
+    "genetico": (_genetico, 1000),
+    "vecino_rejilla": (_vecino_rejilla, 1000000),
+    "curva_hilbert": (_curva_hilbert, 1000000),
+    "arista_voraz": (_arista_voraz, 1000000),
+    "dos_opt_vectorizado": (_dos_opt_vectorizado, 10000),
+    "or2opt": (_or2opt, 1000000),
+    "or_lk": (_or_lk, 1000000),
+}
+
+
+# Coordenadas de una instancia descrita por (tipo, parámetro)
+def _coordenadas(instancia, semilla):
+    tipo, parametro = instancia
+    if tipo == "archivo":
+        return cargar_puntos(parametro)[1]
+    if tipo == "uniforme":
+        return generar_uniforme(parametro, semilla)
+    return generar_agrupada(parametro, semilla)
+
+
+# Memoria máxima del proceso en MB
+def _memoria_maxima_mb():
+    import resource  # solo existe en Unix
+    maxima = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la da en KB y macOS en bytes
+    return maxima / (1 << 20) if sys.platform == "darwin" else maxima / 1024
+
+
+# Ejecuta un caso dentro del proceso trabajador
+def _ejecutar_caso(instancia, motor, opciones):
+    xy = _coordenadas(instancia, opciones["semilla"])
+    coords = [tuple(p) for p in xy.tolist()]
+    funcion = MOTORES[motor][0]
+    try:
+        memoria_inicial = _memoria_maxima_mb()
+        medir = _memoria_maxima_mb
+    except ImportError:
+        # Sin el módulo resource (Windows) se usa tracemalloc
+        import tracemalloc
+        tracemalloc.start()
+        memoria_inicial = 0.0
+        medir = lambda: tracemalloc.get_traced_memory()[1] / (1 << 20)
+    inicio = time.perf_counter()
+    ruta = funcion(coords, opciones)
+    tiempo = time.perf_counter() - inicio
+    memoria = medir() - memoria_inicial
+
+    n = len(coords)
+    valida = len(ruta) == n and (n == 0 or (ruta[0] == 0 and ruta[-1] == n - 1)) and len(set(ruta)) == n
+    orden = np.asarray(ruta, dtype=np.int64)
+    tramos = np.diff(xy[orden], axis=0)
+    return {
+        "instancia": instancia[1] if instancia[0] == "archivo" else f"{instancia[0]}_{instancia[1]}",
+        "n": n,
+        "motor": motor,
+        "tiempo_s": round(tiempo, 4),
+        "memoria_mb": round(memoria, 1),
+        "longitud": round(float(np.hypot(tramos[:, 0], tramos[:, 1]).sum()), 4),
+        "valida": valida,
+    }
+
+
+# Casos (instancia, motor) que se van a ejecutar
+def _casos(archivos, tamanos, tipos, motores):
+    instancias = [(("archivo", a), None) for a in archivos]
+    instancias += [((tipo, n), n) for n in tamanos for tipo in tipos]
+    casos = []
+    for instancia, n in instancias:
+        for motor in motores:
+            if n is None or n <= MOTORES[motor][1]:
+                casos.append((instancia, motor))
+    return casos
+
+
+# Compara con un reporte anterior y devuelve las regresiones encontradas
+def comparar(resultados, anterior, tolerancia=0.3):
+    previos = {(r["instancia"], r["motor"]): r for r in anterior["resultados"]}
+    regresiones = []
+    for r in resultados:
+        p = previos.get((r["instancia"], r["motor"]))
+        if p is None:
+            continue
+        if r["tiempo_s"] > p["tiempo_s"] * (1 + tolerancia) and r["tiempo_s"] - p["tiempo_s"] > 0.05:
+            regresiones.append(f"{r['instancia']} / {r['motor']}: tiempo {p['tiempo_s']:.3f}s -> {r['tiempo_s']:.3f}s")
+        if r["longitud"] > p["longitud"] * (1 + 1e-9):
+            regresiones.append(f"{r['instancia']} / {r['motor']}: longitud {p['longitud']:.2f} -> {r['longitud']:.2f}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas de los motores del TSP")
+    parser.add_argument("--archivos", nargs="*", default=ARCHIVOS)
+    parser.add_argument("--tamanos", nargs="*", type=int, default=TAMANOS)
+    parser.add_argument("--tipos", nargs="*", choices=TIPOS, default=TIPOS)
+    parser.add_argument("--motores", nargs="*", choices=list(MOTORES), default=list(MOTORES))
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--intentos", type=int, default=35, help="intentos de Annealing")
+    parser.add_argument("--procesos", type=int, default=1, help="procesos para los intentos de Annealing")
+    parser.add_argument("--rapido", action="store_true", help="solo datos_*.txt e instancias de 1k")
+    parser.add_argument("--salida", default="benchmark.json")
+    parser.add_argument("--comparar", help="reporte anterior para detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.3, help="aumento de tiempo tolerado (0.3 = 30%%)")
+    args = parser.parse_args()
+
+    tamanos = [n for n in args.tamanos if n <= 1000] if args.rapido else args.tamanos
+    opciones = {"semilla": args.semilla, "intentos": args.intentos, "procesos": args.procesos}
+    casos = _casos(args.archivos, tamanos, args.tipos, args.motores)
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "semilla": args.semilla,
+        "intentos_sa": args.intentos,
+        "resultados": [],
+    }
+    # Un proceso nuevo por caso: la memoria máxima medida es solo la del caso
+    contexto = multiprocessing.get_context("spawn")
+    print(f"{'instancia':<16} {'motor':<22} {'n':>7} {'tiempo (s)':>11} {'memoria (MB)':>13} {'longitud':>14}")
+    for instancia, motor in casos:
+        with contexto.Pool(1) as pool:
+            r = pool.apply(_ejecutar_caso, (instancia, motor, opciones))
+        reporte["resultados"].append(r)
+        marca = "" if r["valida"] else "  (ruta inválida)"
+        print(f"{r['instancia']:<16} {r['motor']:<22} {r['n']:>7} {r['tiempo_s']:>11.3f} "
+              f"{r['memoria_mb']:>13.1f} {r['longitud']:>14.2f}{marca}")
+        # Se guarda después de cada caso para no perder lo medido si se interrumpe
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+    print(f"\nReporte guardado en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(reporte["resultados"], json.load(f), args.tolerancia)
+        if regresiones:
+            print("\nRegresiones respecto a", args.comparar)
+            for linea in regresiones:
+                print("  -", linea)
+            sys.exit(1)
+        print("Sin regresiones respecto a", args.comparar)
+
+
+# Main
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,436 @@
+"""
+Problema del Viajero (TSP) - Búsqueda local con listas de vecinos
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Versiones de la mejora local pensadas para instancias grandes (10k-100k
+puntos): en lugar de revisar todos los pares (i, j), cada ciudad solo se
+compara con sus k vecinos más cercanos, y las "don't-look bits" hacen que
+solo se vuelvan a revisar las ciudades cercanas a un cambio reciente.
+
+Igual que dos_opt_simple, nunca se mueven ruta[0] ni ruta[-1].
+"""
+
+import math
+import time
+from collections import deque
+
+from distancias import vecinos_cercanos
+from recorrido import Recorrido
+
+# Longitudes de segmento que prueba Or-opt
+LONGITUDES_OR_OPT = (1, 2, 3)
+
+# Lin-Kernighan: máximo de movimientos encadenados y alternativas probadas
+# en cada nivel (a partir del último nivel listado solo se sigue la mejor)
+PROFUNDIDAD_LK = 50
+AMPLITUD_LK = (5, 3, 1)
+
+# Desde este número de ciudades la ruta se guarda como Recorrido (lista de
+# dos niveles): invertir un tramo cuesta O(sqrt(n)) en lugar de O(n)
+MIN_PUNTOS_RECORRIDO = 50000
+
+
+# Función de distancia entre índices: de la matriz si existe, si no desde coords
+def _funcion_distancia(coords, dist=None):
+    if dist is not None:
+        return lambda u, v: dist[u][v]
+    xs = [p[0] for p in coords]
+    ys = [p[1] for p in coords]
+    hypot = math.hypot
+    return lambda u, v: hypot(xs[u] - xs[v], ys[u] - ys[v])
+
+
+class _BusquedaLocal:
+    """
+    Estado compartido por los movimientos: la ruta, la posición de cada
+    ciudad, las listas de vecinos y la cola de ciudades activas.
+    Cada movimiento recibe una ciudad, busca una mejora que la involucre y,
+    si la aplica, devuelve las ciudades cuyas aristas cambiaron.
+    """
+
+    def __init__(self, coords, ruta, vecinos, k, dist, profundidad=None, amplitud=None):
+        self.ruta = ruta
+        self.profundidad = PROFUNDIDAD_LK if profundidad is None else profundidad
+        self.amplitud = AMPLITUD_LK if amplitud is None else amplitud
+        self.n = len(ruta)
+        if vecinos is None:
+            vecinos = vecinos_cercanos(coords, k)
+        if hasattr(vecinos, "tolist"):
+            vecinos = vecinos.tolist()
+        self.vecinos = vecinos
+        self.d = _funcion_distancia(coords, dist)
+        # Indexado por ciudad: la ruta puede no usar todos los índices de
+        # coords (ruta_incremental deja huecos al eliminar puntos)
+        self.pos = [0] * len(vecinos)
+        for p, ciudad in enumerate(ruta):
+            self.pos[ciudad] = p
+
+    # Aplica movimientos hasta que ninguna ciudad activa tenga una mejora
+    # (o hasta el plazo, en segundos de time.monotonic(), si se da). Si se
+    # dan las ciudades activas, solo esas empiezan en la cola (por ejemplo,
+    # las que tocan las aristas que cambiaron en una ruta ya optimizada)
+    def ejecutar(self, movimientos, estadisticas=None, plazo=None, activas=None):
+        cola = deque(self.ruta if activas is None else dict.fromkeys(activas))
+        activa = [False] * len(self.vecinos)
+        for ciudad in cola:
+            activa[ciudad] = True
+        # Veces que se probó cada movimiento y veces que mejoró
+        probados = [0] * len(movimientos)
+        aplicados = [0] * len(movimientos)
+        while cola:
+            if plazo is not None and time.monotonic() >= plazo:
+                break
+            a = cola.popleft()
+            activa[a] = False
+            for m, movimiento in enumerate(movimientos):
+                tocadas = movimiento(a)
+                probados[m] += 1
+                if tocadas:
+                    aplicados[m] += 1
+                    for ciudad in tocadas:
+                        if not activa[ciudad]:
+                            activa[ciudad] = True
+                            cola.append(ciudad)
+                    break
+        if estadisticas is not None:
+            for m, movimiento in enumerate(movimientos):
+                nombre = "busqueda_local." + movimiento.__name__
+                estadisticas.movimiento(nombre, probados[m], aplicados[m], aplicados[m])
+        return self.ruta
+
+    # Reescribe ruta[i..j] con los valores dados y actualiza las posiciones
+    def _reemplazar(self, i, j, valores):
+        ruta, pos = self.ruta, self.pos
+        ruta[i:j + 1] = valores
+        for p in range(i, j + 1):
+            pos[ruta[p]] = p
+
+    def _invertir(self, i, j):
+        self._reemplazar(i, j, self.ruta[i:j + 1][::-1])
+
+    # Movimiento 2-opt que conecta a con uno de sus vecinos
+    def dos_opt(self, a):
+        ruta, pos, d, n = self.ruta, self.pos, self.d, self.n
+        i = pos[a]
+
+        # Dirección 1: quitar la arista (a, siguiente de a)
+        if i < n - 1:
+            b = ruta[i + 1]
+            d_ab = d(a, b)
+            for c in self.vecinos[a]:
+                d_ac = d(a, c)
+                if d_ac >= d_ab:
+                    break  # vecinos ordenados: ninguno más puede mejorar
+                j = pos[c]
+                if j == n - 1 or c == b:
+                    continue
+                e = ruta[j + 1]
+                if d_ab + d(c, e) - d_ac - d(b, e) > 1e-12:
+                    if i < j:
+                        self._invertir(i + 1, j)
+                    else:
+                        self._invertir(j + 1, i)
+                    return (a, b, c, e)
+
+        # Dirección 2: quitar la arista (anterior de a, a)
+        if i > 0:
+            b = ruta[i - 1]
+            d_ab = d(a, b)
+            for c in self.vecinos[a]:
+                d_ac = d(a, c)
+                if d_ac >= d_ab:
+                    break
+                j = pos[c]
+                if j == 0 or c == b:
+                    continue
+                e = ruta[j - 1]
+                if d_ab + d(c, e) - d_ac - d(b, e) > 1e-12:
+                    if j < i:
+                        self._invertir(j, i - 1)
+                    else:
+                        self._invertir(i, j - 1)
+                    return (a, b, c, e)
+        return None
+
+    # Movimiento Or-opt: mover un segmento de 1-3 ciudades que empieza o
+    # termina en a, insertándolo (en cualquier sentido) junto a un vecino
+    def or_opt(self, a):
+        ruta, pos, d, n = self.ruta, self.pos, self.d, self.n
+        i = pos[a]
+        for largo in LONGITUDES_OR_OPT:
+            for ini in ((i,) if largo == 1 else (i, i - largo + 1)):
+                fin = ini + largo - 1
+                if ini < 1 or fin > n - 2:
+                    continue  # el segmento no puede incluir los extremos
+                s1 = ruta[ini]
+                s2 = ruta[fin]
+                p = ruta[ini - 1]
+                q = ruta[fin + 1]
+                # Lo que se ahorra al sacar el segmento y unir p con q
+                g1 = d(p, s1) + d(s2, q) - d(p, q)
+                if g1 <= 1e-12:
+                    continue
+                for extremo, otro in ((s1, s2), (s2, s1)):
+                    for c in self.vecinos[extremo]:
+                        d_ec = d(extremo, c)
+                        if d_ec >= g1:
+                            break
+                        jc = pos[c]
+                        if ini <= jc <= fin:
+                            continue
+                        # Insertar entre c y su siguiente: c, extremo ... otro, v
+                        if jc < n - 1 and not ini <= jc + 1 <= fin:
+                            v = ruta[jc + 1]
+                            if g1 - (d_ec + d(otro, v) - d(c, v)) > 1e-12:
+                                self._mover_segmento(ini, fin, jc, extremo)
+                                return (p, q, s1, s2, c, v)
+                        # Insertar entre c y su anterior: u, otro ... extremo, c
+                        if jc > 0 and not ini <= jc - 1 <= fin:
+                            u = ruta[jc - 1]
+                            if g1 - (d(u, otro) + d_ec - d(u, c)) > 1e-12:
+                                self._mover_segmento(ini, fin, jc - 1, otro)
+                                return (p, q, s1, s2, u, c)
+        return None
+
+    # Mueve ruta[ini..fin] entre las posiciones j y j+1, empezando por `primero`
+    def _mover_segmento(self, ini, fin, j, primero):
+        ruta = self.ruta
+        segmento = ruta[ini:fin + 1]
+        if segmento[0] != primero:
+            segmento.reverse()
+        if j > fin:
+            self._reemplazar(ini, j, ruta[fin + 1:j + 1] + segmento)
+        else:
+            self._reemplazar(j + 1, fin, segmento + ruta[j + 1:ini])
+
+    # Movimiento de Lin-Kernighan que empieza quitando una arista de a
+    def lin_kernighan(self, a):
+        ruta, pos, n = self.ruta, self.pos, self.n
+        i = pos[a]
+        for t2 in (ruta[i + 1] if i < n - 1 else None, ruta[i - 1] if i > 0 else None):
+            if t2 is None:
+                continue
+            self._tocadas = [a, t2]
+            self._agregadas = set()
+            self._quitadas = {(min(a, t2), max(a, t2))}
+            if self._profundizar(a, t2, self.d(a, t2), 0, 1e-12) > 0:
+                return self._tocadas
+        return None
+
+    # Candidatos (t3, t4) para continuar la cadena desde la arista (t1, t2)
+    def _candidatos_lk(self, t1, t2, g):
+        ruta, pos, d, n = self.ruta, self.pos, self.d, self.n
+        sucesor = pos[t2] == pos[t1] + 1
+        candidatos = []
+        for t3 in self.vecinos[t2]:
+            g1 = g - d(t2, t3)
+            if g1 <= 1e-12:
+                break  # criterio de ganancia positiva (vecinos ordenados)
+            if t3 == t1 or (min(t2, t3), max(t2, t3)) in self._quitadas:
+                continue
+            # t4 es el vecino de t3 que deja una ruta válida al cerrar con t1
+            j = pos[t3]
+            if sucesor:
+                if j == 0:
+                    continue
+                t4 = ruta[j - 1]
+            else:
+                if j == n - 1:
+                    continue
+                t4 = ruta[j + 1]
+            if t4 == t2 or (min(t3, t4), max(t3, t4)) in self._agregadas:
+                continue
+            candidatos.append((g1 + d(t3, t4), t3, t4, g1))
+        candidatos.sort(reverse=True)
+        return candidatos
+
+    # Sigue la cadena de movimientos; deja la ruta mejorada y devuelve la
+    # ganancia total si supera el umbral, o la deja como estaba y devuelve 0
+    def _profundizar(self, t1, t2, g, nivel, umbral):
+        if nivel >= self.profundidad:
+            return 0
+        limite = self.amplitud[nivel] if nivel < len(self.amplitud) else 1
+        d = self.d
+        for _, t3, t4, g1 in self._candidatos_lk(t1, t2, g)[:limite]:
+            # Quitar (t1, t2) y (t3, t4), agregar (t2, t3) y cerrar con (t4, t1)
+            ini, fin = self._mover_lk(t1, t2, t3)
+            arista_y = (min(t2, t3), max(t2, t3))
+            arista_x = (min(t3, t4), max(t3, t4))
+            self._agregadas.add(arista_y)
+            self._quitadas.add(arista_x)
+            self._tocadas.extend((t3, t4))
+            total = g1 + d(t3, t4)
+            cierre = total - d(t4, t1)
+            mas = self._profundizar(t1, t4, total, nivel + 1, max(umbral, cierre))
+            if mas > 0:
+                return mas
+            if cierre > umbral:
+                return cierre
+            # Ninguna continuación mejora: deshacer este paso
+            self._invertir(ini, fin)
+            self._agregadas.discard(arista_y)
+            self._quitadas.discard(arista_x)
+            del self._tocadas[-2:]
+        return 0
+
+    # Aplica el movimiento 2-opt de la cadena; devuelve el tramo invertido
+    def _mover_lk(self, t1, t2, t3):
+        pos = self.pos
+        i = pos[t1]
+        j = pos[t3]
+        if pos[t2] == i + 1:
+            ini, fin = (i + 1, j - 1) if j > i else (j, i)
+        else:
+            ini, fin = (j + 1, i - 1) if j < i else (i, j)
+        self._invertir(ini, fin)
+        return ini, fin
+
+
+class _Posiciones:
+    """pos[ciudad] leída de un Recorrido, con la misma interfaz que la lista."""
+
+    def __init__(self, recorrido):
+        self.posicion = recorrido.posicion
+
+    def __getitem__(self, ciudad):
+        return self.posicion(ciudad)
+
+
+class _BusquedaLocalRecorrido(_BusquedaLocal):
+    """
+    Los mismos movimientos sobre un Recorrido, para rutas grandes: en lugar
+    de reescribir las posiciones de todo el tramo invertido, se voltean
+    ~sqrt(n) segmentos. Al terminar, la ruta se copia de vuelta a la lista
+    que se dio, igual que cuando se modifica en el lugar.
+    """
+
+    def __init__(self, coords, ruta, vecinos, k, dist, profundidad=None, amplitud=None):
+        super().__init__(coords, [], vecinos, k, dist, profundidad, amplitud)
+        self.lista = ruta
+        self.n = len(ruta)
+        self.ruta = Recorrido(ruta, capacidad=len(self.vecinos))
+        self.pos = _Posiciones(self.ruta)
+
+    def ejecutar(self, movimientos, estadisticas=None, plazo=None, activas=None):
+        if activas is None:
+            activas = self.lista
+        super().ejecutar(movimientos, estadisticas, plazo, activas)
+        self.lista[:] = self.ruta.tolist()
+        return self.lista
+
+    def _invertir(self, i, j):
+        self.ruta.invertir(i, j)
+
+    # Mover el segmento S junto a un tramo B es invertir los dos juntos
+    # (queda B' S' o S' B') y luego volver a invertir B, y S si se quiere
+    # en su sentido original
+    def _mover_segmento(self, ini, fin, j, primero):
+        ruta = self.ruta
+        largo = fin - ini + 1
+        al_derecho = ruta[ini] == primero
+        if j > fin:
+            ruta.invertir(ini, j)
+            ruta.invertir(ini, j - largo)
+            if al_derecho:
+                ruta.invertir(j - largo + 1, j)
+        else:
+            ruta.invertir(j + 1, fin)
+            ruta.invertir(j + 1 + largo, fin)
+            if al_derecho:
+                ruta.invertir(j + 1, j + largo)
+
+
+# Estado de la búsqueda con la representación que conviene al tamaño de la ruta
+def _crear_busqueda(coords, ruta, vecinos, k, dist, profundidad=None, amplitud=None):
+    clase = _BusquedaLocalRecorrido if len(ruta) >= MIN_PUNTOS_RECORRIDO else _BusquedaLocal
+    return clase(coords, ruta, vecinos, k, dist, profundidad, amplitud)
+
+
+# 2-opt restringido a los k vecinos más cercanos, con don't-look bits
+def dos_opt_vecinos(coords, ruta, vecinos=None, k=8, dist=None, estadisticas=None, limite_tiempo=None, activas=None):
+    """
+    Mejora la ruta con movimientos 2-opt considerando para cada ciudad solo
+    sus k vecinos más cercanos.
+    Las ciudades pendientes de revisar se guardan en una cola; al aplicar un
+    movimiento se reactivan únicamente los cuatro extremos de las aristas
+    cambiadas. Termina cuando la cola se vacía: es un óptimo local de las
+    don't-look bits, no de las listas de vecinos. Una ciudad que ya salió de
+    la cola no se vuelve a revisar aunque un movimiento posterior cambie las
+    aristas de sus vecinos, así que pueden quedar mejoras (otra llamada las
+    encuentra).
+    La lista de vecinos puede pasarse ya construida (vecinos_cercanos).
+    """
+    if len(ruta) <= 3:
+        return ruta
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    busqueda = _crear_busqueda(coords, ruta, vecinos, k, dist)
+    return busqueda.ejecutar([busqueda.dos_opt], estadisticas, plazo, activas)
+
+
+# Or-opt: mueve segmentos de 1 a 3 ciudades a otra parte de la ruta
+def or_opt(coords, ruta, vecinos=None, k=8, dist=None, estadisticas=None, limite_tiempo=None, activas=None):
+    """
+    Mejora la ruta moviendo segmentos de 1, 2 o 3 ciudades consecutivas
+    entre dos ciudades vecinas, en el sentido original o invertido.
+    Cada movimiento se evalúa en tiempo constante con las 3 aristas que
+    quita y las 3 que agrega. Los extremos de la ruta no se mueven.
+    """
+    if len(ruta) <= 3:
+        return ruta
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    busqueda = _crear_busqueda(coords, ruta, vecinos, k, dist)
+    return busqueda.ejecutar([busqueda.or_opt], estadisticas, plazo, activas)
+
+
+# Or-2opt: combina 2-opt e inserción de segmentos en una sola búsqueda
+def or2opt(coords, ruta, vecinos=None, k=8, dist=None, estadisticas=None, limite_tiempo=None, activas=None):
+    """
+    Búsqueda local con los dos vecindarios a la vez: para cada ciudad activa
+    se prueba primero un movimiento 2-opt y, si no hay, uno Or-opt (la
+    inserción de segmentos, un caso particular de 3-opt). Llega a óptimos
+    locales que 2-opt solo no puede resolver.
+    """
+    if len(ruta) <= 3:
+        return ruta
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    busqueda = _crear_busqueda(coords, ruta, vecinos, k, dist)
+    return busqueda.ejecutar([busqueda.dos_opt, busqueda.or_opt], estadisticas, plazo, activas)
+
+
+# Lin-Kernighan: cadenas de movimientos 2-opt de profundidad variable
+def lin_kernighan(coords, ruta, vecinos=None, k=8, dist=None, profundidad=PROFUNDIDAD_LK, amplitud=AMPLITUD_LK,
+                  estadisticas=None, limite_tiempo=None, activas=None):
+    """
+    Mejora de profundidad variable al estilo Lin-Kernighan para rutas con
+    extremos fijos. Desde cada ciudad activa t1 se quita una de sus aristas
+    (t1, t2) y se encadenan movimientos: agregar (t2, t3) con t3 entre los
+    vecinos de t2 mientras la ganancia acumulada sea positiva, quitar
+    (t3, t4) y cerrar provisionalmente con (t4, t1). Se conserva el mejor
+    cierre de la cadena y se deshace el resto.
+    En los primeros niveles se prueban varias alternativas (amplitud) con
+    retroceso; después solo se sigue la mejor. Las aristas agregadas no se
+    vuelven a quitar ni las quitadas a agregar dentro de una misma cadena.
+    Cada paso es una inversión de un tramo interior, así que ruta[0] y
+    ruta[-1] nunca se mueven.
+    """
+    if len(ruta) <= 3:
+        return ruta
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    busqueda = _crear_busqueda(coords, ruta, vecinos, k, dist, profundidad, amplitud)
+    return busqueda.ejecutar([busqueda.lin_kernighan], estadisticas, plazo, activas)
+
+
+# Or-LK: Lin-Kernighan más inserción de segmentos
+def or_lk(coords, ruta, vecinos=None, k=8, dist=None, profundidad=PROFUNDIDAD_LK, amplitud=AMPLITUD_LK,
+          estadisticas=None, limite_tiempo=None, activas=None):
+    """
+    Igual que lin_kernighan, pero cuando una ciudad no tiene cadena que mejore
+    se prueba además un movimiento Or-opt, que LK con movimientos 2-opt no
+    siempre encuentra.
+    """
+    if len(ruta) <= 3:
+        return ruta
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    busqueda = _crear_busqueda(coords, ruta, vecinos, k, dist, profundidad, amplitud)
+    return busqueda.ejecutar([busqueda.lin_kernighan, busqueda.or_opt], estadisticas, plazo, activas)
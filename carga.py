@@ -0,0 +1,325 @@
+"""
+Problema del Viajero (TSP) - Carga masiva de archivos de puntos
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Lee archivos "ID X Y" directamente a arreglos NumPy contiguos. El archivo se
+abre con mmap y se procesa por bloques: cuando todas las líneas de un bloque
+tienen el formato esperado, los números se convierten de una sola vez con
+NumPy; si algún bloque tiene líneas raras, ese bloque se lee línea por línea
+con las mismas reglas que leer_puntos.
+
+cargar_instancia guarda además una caché binaria (.npz) junto al archivo de
+texto con las coordenadas y, si se piden, las listas de vecinos (y en otro
+.npz la matriz de distancias); las siguientes ejecuciones la abren con mmap
+sin copiar nada.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+import zipfile
+
+import numpy as np
+
+from distancias import matriz_distancias_np, vecinos_cercanos
+
+# Tamaño aproximado (en bytes) de cada bloque de lectura
+TAM_BLOQUE = 1 << 22
+
+# Permisos de los archivos nuevos según la umask (mkstemp los crea con 0600)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Línea que detiene la lectura (lo que sigue son notas o restricciones)
+_MARCA_FIN = re.compile(rb"(?m)^[ \t\r\f\v]*OJO")
+
+# Clases de bytes para la conversión vectorizada
+_ESPACIO = np.zeros(256, dtype=bool)
+_ESPACIO[[9, 10, 11, 12, 13, 32]] = True
+_NO_ENTERO = ~_ESPACIO
+_NO_ENTERO[list(b"0123456789+-")] = False
+
+
+# Lee un bloque línea por línea con las reglas de leer_puntos
+def _leer_lineas(bloque):
+    ids, xs, ys = [], [], []
+    texto = bloque.decode("utf-8", errors="replace")
+    # Mismos cortes de línea que open() en modo texto: \n, \r\n y \r
+    for linea in texto.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        partes = linea.split()
+        if len(partes) < 3:
+            continue
+        try:
+            pid = int(partes[0])
+            x = float(partes[1])
+            y = float(partes[2])
+        except ValueError:
+            continue
+        ids.append(pid)
+        xs.append(x)
+        ys.append(y)
+    coords = np.column_stack([np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64)])
+    return np.array(ids, dtype=np.int64), coords
+
+
+# Convierte un bloque con NumPy; None si no es el caso simple
+def _convertir_bloque(bloque):
+    """
+    Caso simple: cada línea no vacía tiene exactamente 3 columnas y el ID es
+    un entero. Los números se convierten todos de una vez con np.fromstring
+    (mismo resultado que float()); si algún texto no es un número válido la
+    conversión falla o produce otra cantidad de valores y se usa la lectura
+    línea por línea.
+    """
+    b = np.frombuffer(bloque, dtype=np.uint8)
+    # Un \r suelto también corta la línea al leer en modo texto
+    retornos = np.flatnonzero(b == 13) + 1
+    if len(retornos) and (retornos[-1] == len(b) or (b[retornos] != 10).any()):
+        return None
+    # Inicio de cada columna y cantidad de columnas de cada línea
+    lleno = ~_ESPACIO[b]
+    inicio = lleno.copy()
+    inicio[1:] &= ~lleno[:-1]
+    columnas = np.flatnonzero(inicio)
+    if len(columnas) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, 2), dtype=np.float64)
+    por_linea = np.diff(np.searchsorted(columnas, np.flatnonzero(b == 10)), prepend=0, append=len(columnas))
+    if len(columnas) % 3 or ((por_linea != 0) & (por_linea != 3)).any():
+        return None
+    # Todo lo que no sea dígito ni signo debe estar en X o Y, nunca en el ID
+    otros = np.flatnonzero(_NO_ENTERO[b])
+    if (np.searchsorted(columnas, otros, side="right") % 3 == 1).any():
+        return None
+    try:
+        valores = np.fromstring(bloque, dtype=np.float64, sep=" ")
+    except ValueError:
+        return None
+    if len(valores) != len(columnas):
+        return None
+    valores = valores.reshape(-1, 3)
+    ids = valores[:, 0]
+    # IDs fuera del rango exacto de float64 se leen como texto
+    if (np.abs(ids) >= 2 ** 53).any():
+        return None
+    return ids.astype(np.int64), valores[:, 1:].copy()
+
+
+# Convierte un bloque de texto en (ids, coords)
+def _leer_bloque(bloque):
+    convertido = _convertir_bloque(bloque)
+    if convertido is None:
+        # Líneas con otro formato (exponentes, texto, columnas de más o de menos)
+        return _leer_lineas(bloque)
+    return convertido
+
+
+# Carga un archivo de puntos a arreglos NumPy
+def cargar_puntos(nombre_archivo, tam_bloque=TAM_BLOQUE):
+    """
+    Devuelve (ids, coords): ids es un arreglo int64 de forma (n,) y coords un
+    arreglo float64 de forma (n, 2), ordenados como puntos.sort() en main
+    (por ID, y en empate por X e Y).
+    Reglas de lectura (las mismas de leer_puntos, más la marca OJO):
+    - Las líneas vacías se ignoran.
+    - La lectura se detiene en la primera línea que empieza con OJO.
+    - Las líneas con menos de 3 columnas se ignoran; las columnas extra no.
+    - ID debe ser entero y X, Y números reales; si no, la línea se ignora.
+    """
+    with open(nombre_archivo, "rb") as f:
+        try:
+            datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            datos = b""  # archivo vacío: mmap no acepta tamaño 0
+        try:
+            marca = _MARCA_FIN.search(datos)
+            fin = marca.start() if marca else len(datos)
+            partes_ids, partes_coords = [], []
+            ini = 0
+            while ini < fin:
+                # Cortar el bloque en un salto de línea
+                corte = datos.find(b"\n", min(ini + tam_bloque, fin), fin)
+                corte = fin if corte < 0 else corte + 1
+                ids, coords = _leer_bloque(datos[ini:corte])
+                partes_ids.append(ids)
+                partes_coords.append(coords)
+                ini = corte
+        finally:
+            if isinstance(datos, mmap.mmap):
+                datos.close()
+
+    if not partes_ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, 2), dtype=np.float64)
+    ids = np.concatenate(partes_ids)
+    coords = np.concatenate(partes_coords).reshape(-1, 2)
+    # Los archivos suelen venir ordenados por ID; solo se ordena si hace falta
+    if (ids[1:] > ids[:-1]).all():
+        return ids, coords
+    orden = np.lexsort((coords[:, 1], coords[:, 0], ids))
+    return ids[orden], coords[orden]
+
+
+# Hash del contenido de un archivo (para saber si la caché sigue siendo válida)
+def hash_archivo(nombre_archivo, tam_bloque=1 << 24):
+    h = hashlib.blake2b(digest_size=16)
+    with open(nombre_archivo, "rb") as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+# Nombre del archivo de caché que corresponde a un archivo de datos
+def nombre_cache(nombre_archivo):
+    return nombre_archivo + ".npz"
+
+
+# La matriz de distancias va en su propio archivo: ocupa n x n y no debe
+# reescribirse cada vez que se agregan listas de vecinos a la caché
+def nombre_cache_dist(nombre_archivo):
+    return nombre_archivo + ".dist.npz"
+
+
+# Abre un .npz sin comprimir con cada arreglo mapeado en memoria (sin copiar)
+def _abrir_npz(nombre):
+    """
+    np.load ignora mmap_mode en los .npz, pero np.savez guarda cada arreglo
+    sin comprimir dentro del zip: basta encontrar dónde empiezan sus datos
+    y mapear esa parte del archivo.
+    """
+    arreglos = {}
+    with zipfile.ZipFile(nombre) as z, open(nombre, "rb") as f:
+        for info in z.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return None
+            # Encabezado local del zip: 30 bytes + nombre + campo extra
+            f.seek(info.header_offset + 26)
+            largo_nombre, largo_extra = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + largo_nombre + largo_extra)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                forma, fortran, tipo = np.lib.format.read_array_header_1_0(f)
+            else:
+                forma, fortran, tipo = np.lib.format.read_array_header_2_0(f)
+            clave = info.filename[:-4]  # sin ".npy"
+            if len(forma) == 0 or 0 in forma or tipo.hasobject:
+                # Escalares y arreglos vacíos no se pueden mapear: se leen
+                f.seek(info.header_offset + 30 + largo_nombre + largo_extra)
+                arreglos[clave] = np.lib.format.read_array(f)
+            else:
+                arreglos[clave] = np.memmap(nombre, dtype=tipo, mode="r", offset=f.tell(),
+                                            shape=forma, order="F" if fortran else "C")
+    return arreglos
+
+
+# Guarda la caché de forma atómica (nunca queda un .npz a medio escribir)
+def _guardar_npz(nombre, arreglos):
+    # Un temporal propio: dos procesos que cargan el mismo archivo no chocan
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(nombre) or ".",
+                                            prefix=os.path.basename(nombre) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            np.savez(f, **arreglos)
+        os.chmod(temporal, 0o666 & ~_UMASK)
+        os.replace(temporal, nombre)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+
+
+# Abre una caché existente; None si no existe o está dañada
+def _abrir_cache(nombre):
+    if not os.path.exists(nombre):
+        return None
+    try:
+        return _abrir_npz(nombre)
+    except (OSError, ValueError, zipfile.BadZipFile, struct.error):
+        return None  # caché dañada: se regenera
+
+
+# Guarda la caché si se puede y la devuelve mapeada; si no se puede escribir
+# (directorio de solo lectura, disco lleno) se sigue con los arreglos en memoria
+def _guardar_cache(nombre, arreglos):
+    try:
+        _guardar_npz(nombre, arreglos)
+        return _abrir_npz(nombre)
+    except OSError:
+        return arreglos
+
+
+# Carga una instancia usando (y manteniendo) la caché binaria
+def cargar_instancia(nombre_archivo, k=None, matriz=False, usar_cache=True):
+    """
+    Devuelve (ids, coords, vecinos, dist):
+    - ids, coords: como cargar_puntos.
+    - vecinos: listas de los k vecinos más cercanos (si se da k), o None.
+    - dist: matriz de distancias n x n como ndarray (si matriz=True), o None.
+    La primera vez se lee el texto y se guarda todo en nombre_archivo + ".npz"
+    (la matriz, en nombre_archivo + ".dist.npz"). Las siguientes veces se
+    abre la caché con mmap. La caché se identifica por el hash del contenido
+    del texto: si el archivo cambia se descarta y se vuelve a generar. Lo que
+    se pida y no esté (otro k, la matriz) se calcula y se agrega a la caché.
+    Si la caché no se puede escribir, se devuelven los arreglos en memoria.
+    """
+    if not usar_cache:
+        ids, coords = cargar_puntos(nombre_archivo)
+        vecinos = vecinos_cercanos(coords, k) if k else None
+        dist = matriz_distancias_np(coords) if matriz else None
+        return ids, coords, vecinos, dist
+
+    cache = nombre_cache(nombre_archivo)
+    estado = os.stat(nombre_archivo)
+    arreglos = _abrir_cache(cache)
+    reescribir = False
+    if arreglos is None or "hash" not in arreglos:
+        arreglos = None
+    elif "dist" in arreglos:
+        # Caché de una versión anterior, con la matriz adentro: se saca
+        arreglos = {clave: v for clave, v in arreglos.items() if clave != "dist"}
+        reescribir = True
+    elif int(arreglos["tamano"]) != estado.st_size or int(arreglos["mtime_ns"]) != estado.st_mtime_ns:
+        # Cambió el tamaño o la fecha: el hash dice si cambió el contenido
+        if str(arreglos["hash"]) == hash_archivo(nombre_archivo):
+            arreglos["mtime_ns"] = np.int64(estado.st_mtime_ns)
+            arreglos["tamano"] = np.int64(estado.st_size)
+            reescribir = True
+        else:
+            arreglos = None
+    if arreglos is None:
+        ids, coords = cargar_puntos(nombre_archivo)
+        arreglos = {
+            "hash": np.array(hash_archivo(nombre_archivo)),
+            "tamano": np.int64(estado.st_size),
+            "mtime_ns": np.int64(estado.st_mtime_ns),
+            "ids": ids,
+            "coords": coords,
+        }
+        reescribir = True
+
+    # Lo que se pide y todavía no está en la caché
+    clave_vecinos = f"vecinos_{k}" if k else None
+    if k and clave_vecinos not in arreglos:
+        arreglos[clave_vecinos] = vecinos_cercanos(arreglos["coords"], k)
+        reescribir = True
+    if reescribir:
+        # Copias en memoria: el archivo mapeado se va a reemplazar
+        arreglos = {clave: np.array(v) for clave, v in arreglos.items()}
+        arreglos = _guardar_cache(cache, arreglos)
+
+    dist = None
+    if matriz:
+        cache_dist = nombre_cache_dist(nombre_archivo)
+        guardada = _abrir_cache(cache_dist)
+        if guardada is not None and "dist" in guardada and str(guardada.get("hash")) == str(arreglos["hash"]):
+            dist = guardada["dist"]
+        else:
+            nueva = {"hash": np.array(str(arreglos["hash"])), "dist": matriz_distancias_np(arreglos["coords"])}
+            dist = _guardar_cache(cache_dist, nueva)["dist"]
+
+    vecinos = arreglos[clave_vecinos] if k else None
+    return arreglos["ids"], arreglos["coords"], vecinos, dist
@@ -0,0 +1,211 @@
+"""
+Problema del Viajero (TSP) - Rutas iniciales para instancias muy grandes
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Alternativas a vecino_mas_cercano con el mismo contrato: la ruta empieza en
+el índice 0, termina en el índice n-1 y pasa una vez por cada punto.
+- Curva de llenado del espacio (Hilbert o Morton): se ordenan los puntos
+  según su posición sobre la curva. Todo es NumPy y O(n log n) por el
+  ordenamiento; un millón de puntos toma menos de un segundo.
+- Arista voraz: se recorren las aristas candidatas (las de las listas de
+  vecinos) de la más corta a la más larga y se acepta cada una que no deje
+  un punto con grado 3 ni cierre un ciclo. Deja una ruta bastante mejor que
+  vecino más cercano como punto de partida para 2-opt.
+"""
+
+import numpy as np
+
+from distancias import coordenadas_np, vecinos_cercanos
+from indice_espacial import RejillaEspacial
+
+# Bits por coordenada de la curva (rejilla de 2^16 x 2^16 celdas)
+BITS_CURVA = 16
+
+# Vecinos por punto cuyas aristas son candidatas para arista voraz
+K_VORAZ = 6
+
+
+# Coordenadas llevadas a enteros de 0 a 2^bits - 1 (misma escala en x y en y)
+def _cuantizar(xy, bits):
+    minimo = xy.min(axis=0)
+    lado = float((xy.max(axis=0) - minimo).max())
+    escala = ((1 << bits) - 1) / lado if lado > 0 else 0.0
+    q = ((xy - minimo) * escala).astype(np.int64)
+    return q[:, 0], q[:, 1]
+
+
+# Posición de cada punto sobre la curva de Hilbert
+def indice_hilbert(coords, bits=BITS_CURVA):
+    """
+    Versión vectorizada del algoritmo clásico xy -> d: en cada nivel, de la
+    celda más grande a la más chica, se suma el cuadrante y se rota el
+    sistema de coordenadas para que el resto de la curva quede en su lugar.
+    """
+    x, y = _cuantizar(coordenadas_np(coords), bits)
+    x, y = x.astype(np.int32), y.astype(np.int32)
+    d = np.zeros(len(x), dtype=np.int64)
+    maximo = (1 << bits) - 1
+    for nivel in range(bits - 1, -1, -1):
+        rx = (x >> nivel) & 1
+        ry = (y >> nivel) & 1
+        d += (1 << (2 * nivel)) * ((3 * rx) ^ ry).astype(np.int64)
+        # Rotar el cuadrante con XOR: reflejar (maximo - v == v ^ maximo) si
+        # rx = 1 y ry = 0, y luego intercambiar x con y si ry = 0
+        sin_ry = ry ^ 1
+        reflejo = -(rx & sin_ry) & maximo
+        x ^= reflejo
+        y ^= reflejo
+        cambio = (x ^ y) & -sin_ry
+        x ^= cambio
+        y ^= cambio
+    return d
+
+
+# Posición de cada punto sobre la curva de Morton (orden Z)
+def indice_morton(coords, bits=BITS_CURVA):
+    """Intercala los bits de x y de y; más barata que Hilbert, con más saltos."""
+    x, y = _cuantizar(coordenadas_np(coords), bits)
+
+    def separar(v):
+        # Deja un bit libre entre cada par de bits de v (hasta 32 bits)
+        v = v.astype(np.uint64)
+        for desplazamiento, mascara in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                                        (1, 0x5555555555555555)):
+            v = (v | (v << np.uint64(desplazamiento))) & np.uint64(mascara)
+        return v
+
+    return separar(x) | (separar(y) << np.uint64(1))
+
+
+# Ruta inicial siguiendo una curva de llenado del espacio
+def ruta_curva(coords, curva="hilbert", bits=BITS_CURVA):
+    """
+    Los puntos interiores se visitan en el orden en que los recorre la curva
+    (o en el orden inverso, si así quedan más cerca de los extremos).
+    curva: "hilbert" o "morton".
+    """
+    xy = coordenadas_np(coords)
+    n = len(xy)
+    if n <= 3:
+        return list(range(n))
+    if curva == "hilbert":
+        indice = indice_hilbert(xy[1:n - 1], bits)
+    elif curva == "morton":
+        indice = indice_morton(xy[1:n - 1], bits)
+    else:
+        raise ValueError(f"curva desconocida: {curva}")
+    interior = np.argsort(indice, kind="stable") + 1
+    # Sentido en que el primer y el último interior quedan más cerca de los extremos
+    primero, ultimo = xy[interior[0]], xy[interior[-1]]
+    directo = np.hypot(*(xy[0] - primero)) + np.hypot(*(ultimo - xy[n - 1]))
+    inverso = np.hypot(*(xy[0] - ultimo)) + np.hypot(*(primero - xy[n - 1]))
+    if inverso < directo:
+        interior = interior[::-1]
+    return [0] + interior.tolist() + [n - 1]
+
+
+# Ruta inicial con la heurística de arista voraz
+def arista_voraz(coords, vecinos=None, k=K_VORAZ):
+    """
+    Las aristas candidatas son las de cada punto con sus k vecinos más
+    cercanos, ordenadas por longitud con NumPy. Se acepta una arista si sus
+    dos puntos tienen grado menor a 2 (los extremos 0 y n-1, menor a 1) y
+    une dos fragmentos distintos (unión-búsqueda). Unir el fragmento del
+    inicio con el del final cerraría la ruta, así que solo se permite como
+    última unión.
+    Los fragmentos que quedan sueltos se encadenan como en vecino más
+    cercano: desde el extremo libre del fragmento actual se salta al extremo
+    libre más cercano de otro fragmento (con la rejilla espacial), y el
+    fragmento del punto final va al último.
+    vecinos: arreglo (n, k) como el de distancias.vecinos_cercanos.
+    """
+    xy = coordenadas_np(coords)
+    n = len(xy)
+    if n <= 3:
+        return list(range(n))
+    if vecinos is None:
+        vecinos = vecinos_cercanos(xy, k)
+    fin = n - 1
+
+    # Aristas candidatas sin repetir, de la más corta a la más larga
+    a = np.repeat(np.arange(n, dtype=np.int64), vecinos.shape[1])
+    b = np.asarray(vecinos, dtype=np.int64).ravel()
+    claves = np.unique(np.minimum(a, b) * n + np.maximum(a, b))
+    a, b = claves // n, claves % n
+    orden = np.argsort(np.hypot(xy[a, 0] - xy[b, 0], xy[a, 1] - xy[b, 1]), kind="stable")
+    a, b = a[orden].tolist(), b[orden].tolist()
+
+    grado_maximo = [2] * n
+    grado_maximo[0] = grado_maximo[fin] = 1
+    grado = [0] * n
+    ady1 = [-1] * n  # los (hasta dos) vecinos de cada punto en la ruta
+    ady2 = [-1] * n
+    padre = list(range(n))
+    # Marca de cada fragmento (en su raíz): 1 si contiene el inicio, 2 si contiene el final
+    marca = [0] * n
+    marca[0] = 1
+    marca[fin] |= 2
+    fragmentos = n
+
+    def raiz(u):
+        while padre[u] != u:
+            padre[u] = padre[padre[u]]
+            u = padre[u]
+        return u
+
+    for u, v in zip(a, b):
+        if grado[u] >= grado_maximo[u] or grado[v] >= grado_maximo[v]:
+            continue
+        ru, rv = raiz(u), raiz(v)
+        if ru == rv:
+            continue
+        if marca[ru] | marca[rv] == 3 and fragmentos > 2:
+            continue
+        padre[ru] = rv
+        marca[rv] |= marca[ru]
+        if ady1[u] < 0:
+            ady1[u] = v
+        else:
+            ady2[u] = v
+        if ady1[v] < 0:
+            ady1[v] = u
+        else:
+            ady2[v] = u
+        grado[u] += 1
+        grado[v] += 1
+        fragmentos -= 1
+
+    ruta = []
+
+    # Agrega a la ruta el fragmento que empieza en el extremo u y devuelve el otro extremo
+    def recorrer(u):
+        previo = -1
+        while True:
+            ruta.append(u)
+            siguiente = ady1[u] if ady1[u] != previo else ady2[u]
+            if siguiente < 0:
+                return u
+            previo, u = u, siguiente
+
+    # Extremos libres de los fragmentos que no contienen el inicio ni el final
+    libres = [u for u in range(n) if grado[u] < 2 and marca[raiz(u)] == 0]
+    rejilla = RejillaEspacial(xy.tolist(), indices=libres)
+    actual = recorrer(0)
+    while len(rejilla):
+        siguiente = rejilla.mas_cercano(xy[actual, 0], xy[actual, 1])
+        rejilla.eliminar(siguiente)
+        actual = recorrer(siguiente)
+        if actual != siguiente:
+            rejilla.eliminar(actual)
+    if ruta[-1] != fin:
+        # El fragmento del final se recorre desde su otro extremo
+        u, previo = fin, -1
+        while True:
+            siguiente = ady1[u] if ady1[u] != previo else ady2[u]
+            if siguiente < 0:
+                break
+            previo, u = u, siguiente
+        recorrer(u)
+    return ruta
@@ -0,0 +1,135 @@
+"""
+Problema del Viajero (TSP) - Cota inferior de Held-Karp
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Cota inferior para la ruta más corta entre ruta[0] y ruta[-1] que pasa por
+todos los puntos. Una ruta así es un árbol generador en el que los extremos
+tienen grado 1 y los demás puntos grado 2, así que el árbol generador mínimo
+ya es una cota (para rutas abiertas hace el papel del 1-tree de los ciclos).
+La cota de Held-Karp la mejora con penalizaciones pi por punto: el costo de
+cada arista (u, v) pasa a ser d(u, v) + pi[u] + pi[v] y
+
+    L(pi) = árbol mínimo con esos costos - sum(pi[v] * grado_objetivo[v])
+
+es una cota inferior para cualquier pi. Las penalizaciones se ajustan con
+el método del subgradiente: suben en los puntos con grado de más y bajan en
+las hojas, para que el árbol se parezca cada vez más a una ruta.
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+# Árbol generador mínimo (Prim) con los costos penalizados
+def _arbol_minimo(x, y, pi, dist=None):
+    """
+    Devuelve (costo penalizado, grado de cada punto). Cada paso de Prim
+    calcula con NumPy la fila del punto recién agregado, así que no hace
+    falta la matriz de distancias (memoria O(n)); si se da, se usa.
+    """
+    n = len(x)
+    en_arbol = np.zeros(n, dtype=bool)
+    clave = np.full(n, np.inf)
+    padre = np.zeros(n, dtype=np.intp)
+    grado = np.zeros(n, dtype=np.intp)
+    costo = 0.0
+    actual = 0
+    en_arbol[0] = True
+    clave[0] = np.inf
+    for _ in range(n - 1):
+        if dist is not None:
+            fila = dist[actual] + pi
+        else:
+            fila = np.hypot(x - x[actual], y - y[actual])
+            fila += pi
+        fila += pi[actual]
+        mejora = fila < clave
+        mejora &= ~en_arbol
+        clave[mejora] = fila[mejora]
+        padre[mejora] = actual
+        actual = int(np.argmin(clave))
+        costo += clave[actual]
+        grado[actual] += 1
+        grado[padre[actual]] += 1
+        en_arbol[actual] = True
+        clave[actual] = np.inf
+    return costo, grado
+
+
+# Cota inferior de Held-Karp para la ruta con extremos fijos
+def cota_inferior(coords, cota_superior=None, iteraciones=200, dist=None, limite_tiempo=None):
+    """
+    coords: lista de (x, y) o arreglo (n, 2); ruta[0] = índice 0 y
+    ruta[-1] = índice n-1, como en el resto del proyecto.
+    cota_superior: longitud de una ruta conocida (por ejemplo, la de la
+    búsqueda local); sirve para el tamaño de paso del subgradiente y para
+    detenerse si la cota la alcanza. Sin ella se usa el doble del árbol
+    mínimo, que también es la longitud de una ruta válida.
+    dist: matriz de distancias (ndarray) opcional; sin ella la memoria es O(n).
+    Devuelve la mejor cota encontrada. Con cada iteración cuesta O(n^2), así
+    que está pensada para instancias de hasta unos miles de puntos.
+    """
+    return cota_y_penalizaciones(coords, cota_superior, iteraciones, dist, limite_tiempo)[0]
+
+
+# Cota inferior y las penalizaciones pi con las que se obtuvo
+def cota_y_penalizaciones(coords, cota_superior=None, iteraciones=200, dist=None, limite_tiempo=None):
+    """
+    Igual que cota_inferior, pero devuelve (cota, pi). Con los costos
+    d(u, v) + pi[u] + pi[v] todas las rutas de 0 a n-1 aumentan lo mismo
+    (sum(pi * grado_objetivo)), así que la ruta óptima no cambia y el árbol
+    mínimo con esos costos es una cota mucho más ajustada (ver exacto.py).
+    """
+    xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    n = len(xy)
+    if n <= 1:
+        return 0.0, np.zeros(n)
+    if n == 2:
+        return float(math.hypot(*(xy[1] - xy[0]))), np.zeros(n)
+    x = np.ascontiguousarray(xy[:, 0])
+    y = np.ascontiguousarray(xy[:, 1])
+    if dist is not None:
+        dist = np.asarray(dist, dtype=np.float64)
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+
+    grado_objetivo = np.full(n, 2, dtype=np.intp)
+    grado_objetivo[0] = grado_objetivo[-1] = 1
+    pi = np.zeros(n)
+    mejor = -math.inf
+    mejor_pi = pi
+    paso = 2.0  # multiplicador del tamaño de paso; se reduce a la mitad si no hay mejora
+    sin_mejora = 0
+    for _ in range(iteraciones):
+        costo, grado = _arbol_minimo(x, y, pi, dist)
+        valor = costo - float(pi @ grado_objetivo)
+        if cota_superior is None:
+            # Primera iteración (pi = 0): recorrer el árbol mínimo da una ruta
+            # de a lo más el doble de su costo
+            cota_superior = 2 * costo
+        if valor > mejor + 1e-12:
+            mejor = valor
+            mejor_pi = pi.copy()
+            sin_mejora = 0
+        else:
+            sin_mejora += 1
+            if sin_mejora >= 10:
+                paso /= 2
+                sin_mejora = 0
+        subgradiente = grado - grado_objetivo
+        norma = int(subgradiente @ subgradiente)
+        # Grados exactos: el árbol es una ruta de 0 a n-1, y es la óptima
+        if norma == 0 or mejor >= cota_superior - 1e-9 or paso < 1e-4:
+            break
+        if plazo is not None and time.monotonic() >= plazo:
+            break
+        pi += paso * (cota_superior - valor) / norma * subgradiente
+    return min(mejor, cota_superior), mejor_pi
+
+
+# Brecha relativa entre la longitud de una ruta y la cota inferior
+def brecha(longitud, cota):
+    # Las diferencias de redondeo no deben dar una brecha negativa
+    return max(0.0, (longitud - cota) / cota) if cota > 0 else 0.0
@@ -0,0 +1,67 @@
+"""
+Problema del Viajero (TSP) - Matriz de distancias precalculada
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+"""
+
+import numpy as np
+
+from indice_espacial import vecinos_cercanos_rejilla
+
+# A partir de este tamaño los vecinos se buscan con la rejilla espacial
+LIMITE_VECINOS_FUERZA_BRUTA = 5000
+
+
+# Convierte la lista de coordenadas (x, y) en un arreglo NumPy de forma (n, 2)
+def coordenadas_np(coords):
+    return np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+# Calcula todas las distancias entre pares de puntos de una sola vez
+def matriz_distancias_np(coords):
+    """
+    Devuelve la matriz n x n de distancias euclidianas como ndarray.
+    Se calcula con operaciones vectorizadas, sin bucles de Python.
+    """
+    xy = coordenadas_np(coords)
+    dx = xy[:, 0, None] - xy[None, :, 0]
+    dy = xy[:, 1, None] - xy[None, :, 1]
+    return np.hypot(dx, dy)
+
+
+# Matriz de distancias lista para los bucles de los algoritmos
+def matriz_distancias(coords):
+    """
+    Devuelve la matriz de distancias como lista de listas.
+    En los bucles de Python puro, dist[a][b] sobre listas es mucho más
+    rápido que indexar un ndarray elemento por elemento.
+    """
+    return matriz_distancias_np(coords).tolist()
+
+
+# Lista de los k vecinos más cercanos de cada punto
+def vecinos_cercanos(coords, k=8, bloque=1024):
+    """
+    Devuelve un arreglo (n, k) de índices: la fila i contiene los k puntos
+    más cercanos a i, ordenados de menor a mayor distancia.
+    Se procesa por bloques de filas para no construir la matriz n x n completa;
+    en instancias grandes se usa la rejilla espacial para no comparar todos
+    contra todos.
+    """
+    xy = coordenadas_np(coords)
+    n = len(xy)
+    if n > LIMITE_VECINOS_FUERZA_BRUTA:
+        return vecinos_cercanos_rejilla(xy, k)
+    k = max(0, min(k, n - 1))
+    vecinos = np.empty((n, k), dtype=np.int32)
+    if k == 0:
+        return vecinos
+    for ini in range(0, n, bloque):
+        fin = min(ini + bloque, n)
+        d2 = (xy[ini:fin, 0, None] - xy[None, :, 0]) ** 2 + (xy[ini:fin, 1, None] - xy[None, :, 1]) ** 2
+        # Un punto no es vecino de sí mismo
+        d2[np.arange(fin - ini), np.arange(ini, fin)] = np.inf
+        candidatos = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        orden = np.argsort(np.take_along_axis(d2, candidatos, axis=1), axis=1, kind="stable")
+        vecinos[ini:fin] = np.take_along_axis(candidatos, orden, axis=1)
+    return vecinos
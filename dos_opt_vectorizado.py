@@ -0,0 +1,83 @@
+"""
+Problema del Viajero (TSP) - 2-opt vectorizado con NumPy
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Misma vecindad que dos_opt_simple (invertir ruta[i..j] con extremos fijos),
+pero para cada i las ganancias de todos los j se calculan de una sola vez
+con NumPy en lugar de un bucle de Python.
+"""
+
+import time
+
+import numpy as np
+
+
+# 2-opt con la evaluación de cada fila i vectorizada
+def dos_opt_vectorizado(coords, ruta, primera_mejora=False, estadisticas=None, limite_tiempo=None):
+    """
+    Aplica 2-opt hasta que ninguna inversión mejora la ruta. Para cada i se
+    calcula la ganancia de invertir ruta[i..j] para todos los j válidos y se
+    aplica la mejor (o la primera que mejora, con primera_mejora=True); luego
+    se vuelve a evaluar la misma i hasta que ya no mejora.
+    Las coordenadas se guardan en el orden de la ruta, así que las ganancias
+    salen de tramos contiguos de arreglos (sin indexación dispersa) y no se
+    necesita la matriz de distancias: la memoria es O(n).
+    ruta[0] y ruta[-1] nunca se mueven. Modifica ruta y la devuelve.
+    Si se acaba limite_tiempo (segundos) se devuelve la ruta como va.
+    """
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    n = len(ruta)
+    if n <= 3:
+        return ruta
+    xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    orden = np.asarray(ruta, dtype=np.int64)
+    x = xy[orden, 0].copy()
+    y = xy[orden, 1].copy()
+    # aristas[k] = longitud del tramo entre las posiciones k y k+1
+    aristas = np.hypot(x[1:] - x[:-1], y[1:] - y[:-1])
+
+    pasadas = 0
+    inversiones = 0
+    mejoro = True
+    while mejoro:
+        mejoro = False
+        pasadas += 1
+        i = 1
+        while i < n - 2:
+            if plazo is not None and time.monotonic() >= plazo:
+                mejoro = False
+                break
+            xa, ya = x[i - 1], y[i - 1]  # punto anterior al segmento
+            xb, yb = x[i], y[i]          # primer punto del segmento
+            # Para j = i+1 .. n-2: c = posición j, d = posición j+1
+            xc, yc = x[i + 1:n - 1], y[i + 1:n - 1]
+            xd, yd = x[i + 2:n], y[i + 2:n]
+            antes = aristas[i - 1] + aristas[i + 1:n - 1]
+            despues = np.hypot(xc - xa, yc - ya) + np.hypot(xd - xb, yd - yb)
+            ganancia = antes - despues
+            if primera_mejora:
+                mejoras = np.flatnonzero(ganancia > 1e-12)
+                k = mejoras[0] if len(mejoras) else -1
+            else:
+                k = int(np.argmax(ganancia))
+                if ganancia[k] <= 1e-12:
+                    k = -1
+            if k < 0:
+                i += 1
+                continue
+            # Invertir ruta[i..j] y actualizar las aristas afectadas
+            j = i + 1 + k
+            orden[i:j + 1] = orden[i:j + 1][::-1]
+            x[i:j + 1] = x[i:j + 1][::-1]
+            y[i:j + 1] = y[i:j + 1][::-1]
+            aristas[i:j] = aristas[i:j][::-1]
+            aristas[i - 1] = np.hypot(x[i] - xa, y[i] - ya)
+            aristas[j] = np.hypot(x[j + 1] - x[j], y[j + 1] - y[j])
+            inversiones += 1
+            mejoro = True
+    if estadisticas is not None:
+        estadisticas.contar("dos_opt_vectorizado.pasadas", pasadas)
+        estadisticas.contar("dos_opt_vectorizado.inversiones", inversiones)
+    ruta[:] = orden.tolist()
+    return ruta
@@ -0,0 +1,88 @@
+"""
+Problema del Viajero (TSP) - Estadísticas de los algoritmos
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Los algoritmos reciben un parámetro opcional estadisticas. Si es None (el
+valor por defecto) no registran nada y el costo es una comparación; si es
+un objeto Estadisticas, acumulan en él contadores, movimientos por tipo,
+aceptación por temperatura y tiempo por fase. Todo se puede exportar a JSON.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+
+class Estadisticas:
+    """Contadores y tiempos que reportan los algoritmos."""
+
+    def __init__(self):
+        self.contadores = {}    # nombre -> cantidad
+        self.movimientos = {}   # tipo -> [propuestos, aceptados, mejoran]
+        self.temperaturas = []  # paso -> [temperatura, propuestos, aceptados]
+        self.fases = {}         # nombre -> segundos
+
+    # Suma una cantidad a un contador
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    # Suma los movimientos propuestos, aceptados y que mejoraron de un tipo
+    def movimiento(self, tipo, propuestos, aceptados, mejoran):
+        actual = self.movimientos.setdefault(tipo, [0, 0, 0])
+        actual[0] += propuestos
+        actual[1] += aceptados
+        actual[2] += mejoran
+
+    # Registra los movimientos de un paso de temperatura de Annealing
+    def temperatura(self, paso, temperatura, propuestos, aceptados):
+        while len(self.temperaturas) <= paso:
+            self.temperaturas.append([temperatura, 0, 0])
+        self.temperaturas[paso][1] += propuestos
+        self.temperaturas[paso][2] += aceptados
+
+    # Mide el tiempo de un bloque: with estadisticas.fase("2-opt"): ...
+    @contextmanager
+    def fase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + time.perf_counter() - inicio
+
+    # Agrega lo registrado en otro objeto (por ejemplo, el de otro proceso)
+    def combinar(self, otra):
+        for nombre, cantidad in otra.contadores.items():
+            self.contar(nombre, cantidad)
+        for tipo, valores in otra.movimientos.items():
+            self.movimiento(tipo, *valores)
+        for paso, (temp, propuestos, aceptados) in enumerate(otra.temperaturas):
+            self.temperatura(paso, temp, propuestos, aceptados)
+        for nombre, segundos in otra.fases.items():
+            self.fases[nombre] = self.fases.get(nombre, 0.0) + segundos
+
+    def a_dict(self):
+        return {
+            "contadores": dict(self.contadores),
+            "movimientos": {
+                tipo: {"propuestos": p, "aceptados": a, "mejoran": m,
+                       "tasa_aceptacion": a / p if p else 0.0}
+                for tipo, (p, a, m) in self.movimientos.items()
+            },
+            "temperaturas": [
+                {"paso": paso, "temperatura": t, "propuestos": p, "aceptados": a,
+                 "tasa_aceptacion": a / p if p else 0.0}
+                for paso, (t, p, a) in enumerate(self.temperaturas)
+            ],
+            "fases_s": dict(self.fases),
+        }
+
+    # Guarda las estadísticas en un archivo JSON
+    def guardar(self, nombre_archivo):
+        with open(nombre_archivo, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, indent=2, ensure_ascii=False)
+
+
+# Mide una fase si hay estadísticas; si no, no hace nada
+def medir_fase(estadisticas, nombre):
+    return nullcontext() if estadisticas is None else estadisticas.fase(nombre)
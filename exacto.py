@@ -0,0 +1,180 @@
+"""
+Problema del Viajero (TSP) - Solución exacta para instancias pequeñas
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Ruta óptima de ruta[0] (índice 0) a ruta[-1] (índice n-1) pasando por todos
+los puntos, con las mismas convenciones que el resto del proyecto:
+- Programación dinámica de Held-Karp sobre subconjuntos (máscaras de bits)
+  con tablas de NumPy, para n <= MAX_PUNTOS_DP.
+- Ramificación y poda con la mejor ruta heurística como incumbente y el
+  árbol generador mínimo de lo que falta como cota, para algunos puntos más.
+"""
+
+import time
+
+import numpy as np
+
+from busqueda_local import or2opt
+from cota_inferior import cota_y_penalizaciones
+from distancias import matriz_distancias_np
+
+# Hasta cuántos puntos se usa la programación dinámica (tabla de 2^(n-2) x (n-2))
+MAX_PUNTOS_DP = 16
+
+# Hasta cuántos puntos resolver_exacto acepta la instancia
+MAX_PUNTOS_EXACTO = 30
+
+
+def _matriz(coords, dist):
+    if dist is not None:
+        return np.asarray(dist, dtype=np.float64)
+    return matriz_distancias_np(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+
+
+def _longitud(d, ruta):
+    return sum(d[ruta[k]][ruta[k + 1]] for k in range(len(ruta) - 1))
+
+
+# Programación dinámica de Held-Karp
+def dp_held_karp(coords, dist=None):
+    """
+    costo[S, j] = ruta más corta que sale de 0, visita exactamente los
+    interiores del conjunto S y termina en j (j en S). Se llena por capas
+    (conjuntos con 1, 2, ... elementos) y cada capa se calcula con NumPy
+    para todos sus conjuntos a la vez:
+        costo[S, j] = min_k costo[S - {j}, k] + d[k][j]
+    No se guarda de dónde viene cada valor: al final la ruta se reconstruye
+    repitiendo el mínimo hacia atrás, así que la única tabla es costo.
+    Memoria: 2^(n-2) x (n-2) valores float64 (1.8 MB con n = 16, 38 MB con n = 20).
+    """
+    d = _matriz(coords, dist)
+    n = len(d)
+    if n <= 3:
+        return list(range(n))
+    m = n - 2
+    interior = d[1:n - 1, 1:n - 1]
+    num_conjuntos = 1 << m
+    costo = np.full((num_conjuntos, m), np.inf)
+    bits = 1 << np.arange(m)
+    costo[bits, np.arange(m)] = d[0, 1:n - 1]
+
+    # Conjuntos agrupados por cantidad de elementos
+    conjuntos = np.arange(num_conjuntos)
+    tamano = np.zeros(num_conjuntos, dtype=np.int8)
+    for b in range(m):
+        tamano += (conjuntos >> b) & 1
+    for t in range(2, m + 1):
+        capa = conjuntos[tamano == t]
+        for j in range(m):
+            con_j = capa[(capa >> j) & 1 == 1]
+            # costo[S - {j}, k] es inf para los k que no están en S - {j}
+            costo[con_j, j] = (costo[con_j ^ (1 << j)] + interior[:, j]).min(axis=1)
+
+    # Cerrar en el punto final y reconstruir hacia atrás
+    todos = num_conjuntos - 1
+    j = int(np.argmin(costo[todos] + d[1:n - 1, n - 1]))
+    camino = [j]
+    conjunto = todos
+    while conjunto != (1 << j):
+        anterior = conjunto ^ (1 << j)
+        j = int(np.argmin(costo[anterior] + interior[:, j]))
+        camino.append(j)
+        conjunto = anterior
+    return [0] + [k + 1 for k in reversed(camino)] + [n - 1]
+
+
+# Ramificación y poda con cota del árbol generador mínimo
+def ramificacion_y_poda(coords, ruta_inicial=None, dist=None, limite_tiempo=None, estadisticas=None):
+    """
+    Búsqueda en profundidad sobre los prefijos de la ruta: desde el último
+    punto v del prefijo, lo que falta es una arista de v a algún restante y
+    luego una ruta por los restantes hasta el final, así que su longitud no
+    puede ser menor que la arista más corta de v a los restantes más el
+    árbol generador mínimo de restantes + {final}. Si el prefijo más esa
+    cota no mejora la mejor ruta conocida, la rama se descarta.
+    Los costos son los de Held-Karp, d(u, v) + pi[u] + pi[v] con las
+    penalizaciones de cota_inferior: todas las rutas aumentan lo mismo, pero
+    los árboles mínimos quedan mucho más cerca de las rutas y se poda antes.
+    La mejor ruta conocida empieza siendo ruta_inicial (o la de Or-2opt sobre
+    el orden por índice) y se actualiza al encontrar una mejor.
+    Con limite_tiempo se devuelve la mejor ruta encontrada hasta ese momento,
+    que puede no ser la óptima.
+    """
+    d_np = _matriz(coords, dist)
+    n = len(d_np)
+    if n <= 3:
+        return list(range(n))
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    fin = n - 1
+    if ruta_inicial is None:
+        ruta_inicial = or2opt(coords, list(range(n)), dist=d_np.tolist())
+    longitud = _longitud(d_np, ruta_inicial)
+    cota, pi = cota_y_penalizaciones(coords, longitud, dist=d_np)
+    if cota >= longitud - 1e-9:
+        return list(ruta_inicial)  # la cota ya demuestra que es óptima
+    d = (d_np + pi[:, None] + pi[None, :]).tolist()
+    mejor = {"ruta": list(ruta_inicial), "costo": _longitud(d, ruta_inicial)}
+    # Vecinos de cada punto de más cercano a más lejano (primero las ramas prometedoras)
+    cercanos = [sorted(range(1, n - 1), key=d[v].__getitem__) for v in range(n)]
+    arboles = {}  # conjunto (máscara) -> costo de su árbol generador mínimo
+    nodos = 0
+
+    def arbol_minimo(mascara):
+        costo = arboles.get(mascara)
+        if costo is not None:
+            return costo
+        puntos = [p for p in range(n) if mascara >> p & 1]
+        # Prim sobre los puntos del conjunto
+        clave = {p: d[puntos[0]][p] for p in puntos[1:]}
+        costo = 0.0
+        while clave:
+            u = min(clave, key=clave.__getitem__)
+            costo += clave.pop(u)
+            fila = d[u]
+            for p in clave:
+                if fila[p] < clave[p]:
+                    clave[p] = fila[p]
+        if len(arboles) < 2_000_000:
+            arboles[mascara] = costo
+        return costo
+
+    prefijo = [0]
+
+    def buscar(v, restantes, costo):
+        nonlocal nodos
+        nodos += 1
+        if plazo is not None and nodos % 1024 == 0 and time.monotonic() >= plazo:
+            raise TimeoutError
+        if not restantes:
+            total = costo + d[v][fin]
+            if total < mejor["costo"] - 1e-9:
+                mejor["costo"] = total
+                mejor["ruta"] = prefijo + [fin]
+            return
+        fila = d[v]
+        candidatos = [u for u in cercanos[v] if restantes >> u & 1]
+        if costo + fila[candidatos[0]] + arbol_minimo(restantes | (1 << fin)) >= mejor["costo"] - 1e-9:
+            return
+        for u in candidatos:
+            prefijo.append(u)
+            buscar(u, restantes & ~(1 << u), costo + fila[u])
+            prefijo.pop()
+
+    try:
+        buscar(0, ((1 << (n - 1)) - 1) & ~1, 0.0)
+    except TimeoutError:
+        pass
+    if estadisticas is not None:
+        estadisticas.contar("exacto.nodos", nodos)
+    return mejor["ruta"]
+
+
+# Ruta óptima con el método que corresponda al tamaño
+def resolver_exacto(coords, dist=None, ruta_inicial=None, limite_tiempo=None, estadisticas=None):
+    n = len(coords)
+    if n > MAX_PUNTOS_EXACTO:
+        raise ValueError(f"resolver_exacto admite hasta {MAX_PUNTOS_EXACTO} puntos (se dieron {n})")
+    if n <= MAX_PUNTOS_DP:
+        return dp_held_karp(coords, dist)
+    return ramificacion_y_poda(coords, ruta_inicial, dist, limite_tiempo, estadisticas)
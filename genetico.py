@@ -0,0 +1,313 @@
+"""
+Problema del Viajero (TSP) - Algoritmo memético con modelo de islas
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Alternativa poblacional a simulated_annealing. Cada isla mantiene una
+población de rutas con extremos fijos (ruta[0] = índice 0, ruta[-1] = n-1),
+todas en un óptimo local de Or-2opt. En cada generación se cruzan parejas
+de rutas, cada hijo se pule con Or-2opt y sobreviven las mejores rutas
+distintas entre padres e hijos.
+- Cruce de orden (OX, por defecto): un tramo de un padre y el resto en el
+  orden del otro.
+- Cruce de aristas (ERX): el hijo se arma casi solo con aristas de los
+  padres, primero las que tienen en común.
+En los dos casos la búsqueda local solo revisa las ciudades de las aristas
+del hijo que no vienen de ningún padre (parámetro activas de
+busqueda_local), así que pulir un hijo cuesta mucho menos que una búsqueda
+local completa.
+Las islas evolucionan en procesos distintos durante migrar_cada
+generaciones; entre una época y otra la mejor ruta de cada isla se copia a
+la siguiente (anillo). Cada isla y época tiene su propia semilla, así que
+el resultado no depende del número de procesos.
+"""
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from busqueda_local import or2opt, or_lk
+from construccion import arista_voraz
+from distancias import coordenadas_np, vecinos_cercanos
+from estadisticas import Estadisticas
+from multi_start import procesos_disponibles, semillas_intentos
+
+# Parámetros por defecto del algoritmo
+TAMANO_POBLACION = 20
+GENERACIONES = 40
+ISLAS = 4
+MIGRAR_CADA = 5
+PROB_MUTACION = 0.1
+PUNTOS_POR_PERTURBACION = 50
+
+# Búsqueda local con que se pule cada ruta
+BUSQUEDAS = {"or2opt": or2opt, "or_lk": or_lk}
+
+# Instancia en cada proceso (se envía una sola vez)
+_COORDS = None
+_VECINOS = None
+
+
+def _iniciar_isla(coords, vecinos):
+    global _COORDS, _VECINOS
+    _COORDS = coords
+    _VECINOS = vecinos
+
+
+def _longitud(ruta):
+    coords = _COORDS
+    hypot = math.hypot
+    total = 0.0
+    for k in range(len(ruta) - 1):
+        a, b = coords[ruta[k]], coords[ruta[k + 1]]
+        total += hypot(a[0] - b[0], a[1] - b[1])
+    return total
+
+
+# Ciudades de las aristas del hijo que no están en ninguno de los padres
+def _ciudades_nuevas(hijo, padre1, padre2):
+    n = len(hijo)
+    siguiente = [[-1, -1] for _ in range(n)]
+    for p, padre in enumerate((padre1, padre2)):
+        for k in range(n - 1):
+            siguiente[padre[k]][p] = padre[k + 1]
+    nuevas = []
+    for k in range(n - 1):
+        a, b = hijo[k], hijo[k + 1]
+        if b not in siguiente[a] and a not in siguiente[b]:
+            nuevas.append(a)
+            nuevas.append(b)
+    return nuevas
+
+
+# Cruce de aristas (ERX) para rutas con extremos fijos
+def cruce_aristas(padre1, padre2, rng):
+    """
+    Desde el inicio, la siguiente ciudad se elige entre las vecinas de la
+    actual en alguno de los padres: primero una arista que está en los dos,
+    si no la vecina con menos vecinas libres (para no dejarla aislada). Si la
+    actual no tiene vecinas libres, se salta a la más cercana libre según las
+    listas de vecinos o, si no hay, a una libre al azar.
+    """
+    n = len(padre1)
+    fin = n - 1
+    adyacentes = [[] for _ in range(n)]
+    for padre in (padre1, padre2):
+        for k in range(n - 1):
+            a, b = padre[k], padre[k + 1]
+            adyacentes[a].append(b)
+            adyacentes[b].append(a)
+    visitada = [False] * n
+    visitada[0] = visitada[fin] = True
+    # Ciudades libres, para sacar una al azar en O(1)
+    libres = list(range(1, n - 1))
+    pos_libre = [0] * n
+    for p, ciudad in enumerate(libres):
+        pos_libre[ciudad] = p
+
+    def quitar(ciudad):
+        p = pos_libre[ciudad]
+        ultima = libres.pop()
+        if ultima != ciudad:
+            libres[p] = ultima
+            pos_libre[ultima] = p
+
+    hijo = [0]
+    actual = 0
+    while libres:
+        candidatas = [c for c in adyacentes[actual] if not visitada[c]]
+        if candidatas:
+            comunes = [c for c in candidatas if candidatas.count(c) > 1]
+            if comunes:
+                elegida = comunes[0]
+            else:
+                elegida = min(candidatas, key=lambda c: sum(not visitada[v] for v in adyacentes[c]))
+        else:
+            elegida = next((c for c in _VECINOS[actual] if not visitada[c]), None)
+            if elegida is None:
+                elegida = libres[rng.randrange(len(libres))]
+        visitada[elegida] = True
+        quitar(elegida)
+        hijo.append(elegida)
+        actual = elegida
+    hijo.append(fin)
+    return hijo
+
+
+# Cruce de orden (OX) sobre las posiciones interiores
+def cruce_orden(padre1, padre2, rng):
+    """
+    El hijo copia padre1[a:b] en las mismas posiciones y llena las demás
+    posiciones interiores, empezando después de b y dando la vuelta, con las
+    ciudades que faltan en el orden en que aparecen en padre2.
+    """
+    n = len(padre1)
+    a = rng.randrange(1, n - 1)
+    b = rng.randrange(a + 1, n)
+    tramo = set(padre1[a:b])
+    interior2 = padre2[1:n - 1]
+    inicio = (b - 1) % (n - 2)  # posición de b dentro del interior
+    orden = [c for c in interior2[inicio:] + interior2[:inicio] if c not in tramo]
+    libres = list(range(b, n - 1)) + list(range(1, a))
+    hijo = list(padre1)
+    for p, c in zip(libres, orden):
+        hijo[p] = c
+    return hijo
+
+
+# Doble puente local: intercambia dos tramos consecutivos cortos
+def _doble_puente(ruta, rng, largo=30):
+    n = len(ruta)
+    largo = max(1, min(largo, (n - 2) // 3))
+    a = rng.randrange(1, n - 2 * largo)
+    b = a + rng.randint(1, largo)
+    c = b + rng.randint(1, largo)
+    ruta[a:c] = ruta[b:c] + ruta[a:b]
+    return [ruta[a - 1], ruta[a], ruta[b - 1], ruta[b], ruta[c - 1], ruta[min(c, n - 1)]]
+
+
+# Deja en la población las mejores rutas distintas
+def _seleccionar(candidatos, tamano):
+    candidatos.sort(key=lambda t: t[0])
+    poblacion = []
+    for longitud, ruta in candidatos:
+        if poblacion and abs(longitud - poblacion[-1][0]) < 1e-9:
+            continue  # misma longitud: casi seguro la misma ruta
+        poblacion.append((longitud, ruta))
+        if len(poblacion) == tamano:
+            break
+    return poblacion
+
+
+# Evoluciona una isla durante algunas generaciones (en un proceso trabajador)
+def _evolucionar(poblacion, ruta_inicial, generaciones, semilla, parametros, plazo, registrar=False):
+    """
+    Si poblacion es None, primero se crea: la ruta inicial y perturbaciones
+    de ella con dobles puentes, todas pulidas con Or-2opt.
+    Devuelve (población, estadísticas o None).
+    """
+    rng = random.Random(semilla)
+    estadisticas = Estadisticas() if registrar else None
+    tamano = parametros["tamano_poblacion"]
+    cruce = cruce_aristas if parametros["cruce"] == "erx" else cruce_orden
+    n = len(ruta_inicial)
+
+    busqueda = BUSQUEDAS[parametros["busqueda"]]
+
+    def pulir(ruta, activas):
+        restante = None if plazo is None else max(0.0, plazo - time.monotonic())
+        return busqueda(_COORDS, ruta, _VECINOS, limite_tiempo=restante, activas=activas)
+
+    if poblacion is None:
+        poblacion = [(_longitud(ruta_inicial), list(ruta_inicial))]
+        for _ in range(3 * tamano):
+            if len(poblacion) >= tamano or (plazo is not None and time.monotonic() >= plazo):
+                break
+            ruta = list(ruta_inicial)
+            activas = []
+            for _ in range(max(1, n // parametros["puntos_por_perturbacion"])):
+                activas.extend(_doble_puente(ruta, rng))
+            ruta = pulir(ruta, activas)
+            poblacion = _seleccionar(poblacion + [(_longitud(ruta), ruta)], tamano)
+
+    for _ in range(generaciones):
+        if plazo is not None and time.monotonic() >= plazo:
+            break
+        hijos = []
+        for _ in range(tamano):
+            if len(poblacion) < 2:
+                break
+            (_, padre1), (_, padre2) = rng.sample(poblacion, 2)
+            hijo = cruce(padre1, padre2, rng)
+            activas = _ciudades_nuevas(hijo, padre1, padre2)
+            if rng.random() < parametros["prob_mutacion"]:
+                activas.extend(_doble_puente(hijo, rng))
+            hijo = pulir(hijo, activas)
+            hijos.append((_longitud(hijo), hijo))
+        poblacion = _seleccionar(poblacion + hijos, tamano)
+        if registrar:
+            estadisticas.contar("genetico.generaciones")
+            estadisticas.contar("genetico.hijos", len(hijos))
+    return poblacion, estadisticas
+
+
+# Algoritmo memético con islas en varios procesos
+def algoritmo_genetico(coords, ruta_inicial=None, tamano_poblacion=TAMANO_POBLACION, generaciones=GENERACIONES,
+                       islas=ISLAS, migrar_cada=MIGRAR_CADA, cruce="ox", busqueda="or2opt", prob_mutacion=PROB_MUTACION,
+                       procesos=None, semilla=None, vecinos=None, k=8, estadisticas=None, limite_tiempo=None,
+                       mostrar=False):
+    """
+    coords: lista de (x, y) o arreglo (n, 2).
+    ruta_inicial: punto de partida de todas las islas (por defecto, arista
+    voraz + Or-LK).
+    cruce: "ox" (cruce de orden) o "erx" (cruce de aristas).
+    busqueda: búsqueda local que pule cada hijo, "or2opt" u "or_lk".
+    procesos: procesos para las islas (None = todos los núcleos, hasta islas).
+    semilla: semilla base; con la misma semilla el resultado es el mismo sin
+    importar el número de procesos.
+    Devuelve la mejor ruta encontrada.
+    """
+    xy = coordenadas_np(coords)
+    n = len(xy)
+    if n <= 4:
+        return list(range(n)) if ruta_inicial is None else list(ruta_inicial)
+    if cruce not in ("erx", "ox"):
+        raise ValueError(f"cruce desconocido: {cruce}")
+    if busqueda not in BUSQUEDAS:
+        raise ValueError(f"búsqueda desconocida: {busqueda}")
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    coords = [tuple(p) for p in xy.tolist()]
+    if vecinos is None:
+        vecinos = vecinos_cercanos(xy, k)
+    if ruta_inicial is None:
+        ruta_inicial = or_lk(coords, arista_voraz(xy, np.asarray(vecinos)), vecinos)
+    if hasattr(vecinos, "tolist"):
+        vecinos = vecinos.tolist()
+    parametros = dict(tamano_poblacion=tamano_poblacion, cruce=cruce, busqueda=busqueda, prob_mutacion=prob_mutacion,
+                      puntos_por_perturbacion=PUNTOS_POR_PERTURBACION)
+    epocas = max(1, math.ceil(generaciones / migrar_cada))
+    semilla_base, semillas = semillas_intentos(epocas * islas, semilla)
+    if mostrar:
+        print(f"   ({islas} islas de {tamano_poblacion} rutas, {generaciones} generaciones, semilla {semilla_base})")
+
+    registrar = estadisticas is not None
+    procesos = min(procesos_disponibles(procesos), islas)
+    pool = None
+    if procesos > 1:
+        pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_isla, initargs=(coords, vecinos))
+    else:
+        _iniciar_isla(coords, vecinos)
+    poblaciones = [None] * islas
+    try:
+        for epoca in range(epocas):
+            if plazo is not None and time.monotonic() >= plazo:
+                break
+            gens = min(migrar_cada, generaciones - epoca * migrar_cada)
+            argumentos = [(poblaciones[i], ruta_inicial, gens, semillas[epoca * islas + i], parametros, plazo,
+                           registrar) for i in range(islas)]
+            if pool is None:
+                resultados = [_evolucionar(*a) for a in argumentos]
+            else:
+                resultados = list(pool.map(_evolucionar, *zip(*argumentos)))
+            poblaciones = [p for p, _ in resultados]
+            if registrar:
+                for _, propias in resultados:
+                    estadisticas.combinar(propias)
+            # Migración en anillo: la mejor ruta de cada isla reemplaza a la peor de la siguiente
+            mejores = [p[0] for p in poblaciones]
+            for i in range(islas):
+                destino = poblaciones[(i + 1) % islas]
+                if len(destino) >= tamano_poblacion:
+                    destino = destino[:-1]
+                poblaciones[(i + 1) % islas] = _seleccionar(destino + [mejores[i]], tamano_poblacion)
+            if mostrar:
+                print(f"   Época {epoca + 1}/{epocas} - Mejor distancia: {min(m[0] for m in mejores):.2f}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    mejor = min((p[0] for p in poblaciones if p), key=lambda t: t[0], default=None)
+    return list(ruta_inicial) if mejor is None else mejor[1]
@@ -0,0 +1,295 @@
+"""
+Problema del Viajero (TSP) - Índice espacial para vecino más cercano
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Rejilla uniforme sobre el plano: cada celda guarda los puntos que caen en
+ella. Para encontrar el punto más cercano solo se revisan anillos de celdas
+alrededor de la consulta, hasta que ninguna celda más lejana puede contener
+un punto mejor. Los puntos se eliminan en O(1), así que sirve para la
+heurística de vecino más cercano sobre instancias de 100k puntos o más.
+"""
+
+import heapq
+import math
+import time
+
+import numpy as np
+
+
+class RejillaEspacial:
+    """Rejilla uniforme con consultas de vecino más cercano y eliminación."""
+
+    def __init__(self, coords, indices=None, puntos_por_celda=2):
+        self.xs = [p[0] for p in coords]
+        self.ys = [p[1] for p in coords]
+        self.puntos_por_celda = puntos_por_celda
+        n = len(coords)
+        # Celda y posición dentro de la celda de cada punto (-1 = no está)
+        self.celda_de = [-1] * n
+        self.pos_en_celda = [0] * n
+        self._construir(list(range(n)) if indices is None else list(indices))
+
+    def __len__(self):
+        return self.vivos
+
+    def __contains__(self, i):
+        return self.celda_de[i] >= 0
+
+    # Reparte los puntos en una rejilla con ~puntos_por_celda puntos por celda
+    def _construir(self, indices):
+        xs, ys = self.xs, self.ys
+        m = len(indices)
+        if m:
+            self.x0 = min(xs[i] for i in indices)
+            self.y0 = min(ys[i] for i in indices)
+            ancho = max(xs[i] for i in indices) - self.x0
+            alto = max(ys[i] for i in indices) - self.y0
+        else:
+            self.x0 = self.y0 = ancho = alto = 0.0
+        celdas_objetivo = max(1, m / self.puntos_por_celda)
+        lado = max(math.sqrt(ancho * alto / celdas_objetivo), max(ancho, alto) / celdas_objetivo)
+        if lado <= 0:
+            lado = 1.0
+        self.lado = lado
+        self.nx = int(ancho / lado) + 1
+        self.ny = int(alto / lado) + 1
+        self.celdas = [[] for _ in range(self.nx * self.ny)]
+        for i in indices:
+            c = self._celda(xs[i], ys[i])
+            self.celda_de[i] = c
+            self.pos_en_celda[i] = len(self.celdas[c])
+            self.celdas[c].append(i)
+        self.vivos = m
+
+    # Coordenadas de la celda que contiene (x, y), recortadas a la rejilla
+    def _columna_fila(self, x, y):
+        cx = int((x - self.x0) / self.lado)
+        cy = int((y - self.y0) / self.lado)
+        cx = 0 if cx < 0 else (self.nx - 1 if cx >= self.nx else cx)
+        cy = 0 if cy < 0 else (self.ny - 1 if cy >= self.ny else cy)
+        return cx, cy
+
+    def _celda(self, x, y):
+        cx, cy = self._columna_fila(x, y)
+        return cy * self.nx + cx
+
+    # Celdas que están exactamente a distancia r (en celdas) de (cx, cy)
+    def _anillo(self, cx, cy, r):
+        nx, ny = self.nx, self.ny
+        if r == 0:
+            yield cy * nx + cx
+            return
+        for y in (cy - r, cy + r):
+            if 0 <= y < ny:
+                for x in range(max(0, cx - r), min(nx, cx + r + 1)):
+                    yield y * nx + x
+        for x in (cx - r, cx + r):
+            if 0 <= x < nx:
+                for y in range(max(0, cy - r + 1), min(ny, cy + r)):
+                    yield y * nx + x
+
+    # Quita un punto del índice en O(1)
+    def eliminar(self, i):
+        c = self.celda_de[i]
+        if c < 0:
+            return
+        celda = self.celdas[c]
+        p = self.pos_en_celda[i]
+        ultimo = celda.pop()
+        if ultimo != i:
+            celda[p] = ultimo
+            self.pos_en_celda[ultimo] = p
+        self.celda_de[i] = -1
+        self.vivos -= 1
+        # Si la rejilla quedó muy vacía, se reconstruye con celdas más grandes
+        # para que las búsquedas no recorran demasiadas celdas vacías
+        if self.vivos and self.vivos * 4 < len(self.celdas) * self.puntos_por_celda:
+            vivos = [j for celda in self.celdas for j in celda]
+            self._construir(vivos)
+
+    # Agrega (o vuelve a agregar) un punto al índice
+    def agregar(self, i):
+        if self.celda_de[i] >= 0:
+            return
+        cx = int((self.xs[i] - self.x0) / self.lado)
+        cy = int((self.ys[i] - self.y0) / self.lado)
+        if not (0 <= cx < self.nx and 0 <= cy < self.ny):
+            # Fuera de la rejilla actual: reconstruir incluyendo el punto
+            vivos = [j for celda in self.celdas for j in celda]
+            vivos.append(i)
+            self._construir(vivos)
+            return
+        c = cy * self.nx + cx
+        self.celda_de[i] = c
+        self.pos_en_celda[i] = len(self.celdas[c])
+        self.celdas[c].append(i)
+        self.vivos += 1
+        # Si las celdas quedaron muy llenas, se reconstruye con celdas más chicas
+        if self.vivos > 4 * len(self.celdas) * self.puntos_por_celda:
+            vivos = [j for celda in self.celdas for j in celda]
+            self._construir(vivos)
+
+    # Pone el punto i en (x, y) y lo agrega al índice; i puede ser un punto
+    # nuevo (i igual al número de puntos) o uno existente que se mueve
+    def colocar(self, i, x, y):
+        if i == len(self.xs):
+            self.xs.append(x)
+            self.ys.append(y)
+            self.celda_de.append(-1)
+            self.pos_en_celda.append(0)
+        else:
+            self.eliminar(i)
+            self.xs[i] = x
+            self.ys[i] = y
+        self.agregar(i)
+
+    # Punto del índice más cercano a (x, y); en empate, el de menor índice
+    def mas_cercano(self, x, y):
+        if self.vivos == 0:
+            return None
+        xs, ys, celdas = self.xs, self.ys, self.celdas
+        hypot = math.hypot
+        cx, cy = self._columna_fila(x, y)
+        r_max = max(cx, self.nx - 1 - cx, cy, self.ny - 1 - cy)
+        mejor = -1
+        mejor_d = float("inf")
+        r = 0
+        while r <= r_max:
+            for c in self._anillo(cx, cy, r):
+                for p in celdas[c]:
+                    d = hypot(xs[p] - x, ys[p] - y)
+                    if d < mejor_d or (d == mejor_d and p < mejor):
+                        mejor_d = d
+                        mejor = p
+            # Todo punto de los anillos siguientes está al menos a r * lado
+            if mejor >= 0 and mejor_d < r * self.lado:
+                break
+            r += 1
+        return mejor
+
+    # Los k puntos del índice más cercanos a (x, y), de menor a mayor distancia
+    def k_mas_cercanos(self, x, y, k, excluir=None):
+        xs, ys, celdas = self.xs, self.ys, self.celdas
+        hypot = math.hypot
+        cx, cy = self._columna_fila(x, y)
+        r_max = max(cx, self.nx - 1 - cx, cy, self.ny - 1 - cy)
+        monticulo = []  # máx-montículo de (-d, -p) con los k mejores
+        r = 0
+        while r <= r_max:
+            for c in self._anillo(cx, cy, r):
+                for p in celdas[c]:
+                    if p == excluir:
+                        continue
+                    d = hypot(xs[p] - x, ys[p] - y)
+                    if len(monticulo) < k:
+                        heapq.heappush(monticulo, (-d, -p))
+                    elif d < -monticulo[0][0]:
+                        heapq.heapreplace(monticulo, (-d, -p))
+            if len(monticulo) == k and -monticulo[0][0] < r * self.lado:
+                break
+            r += 1
+        return [-p for _, p in sorted(monticulo, key=lambda t: (-t[0], -t[1]))]
+
+
+# Vecino más cercano usando la rejilla espacial
+def vecino_mas_cercano_rejilla(coords, limite_tiempo=None):
+    """
+    Misma heurística y mismo resultado que vecino_mas_cercano: la ruta empieza
+    en el índice 0, visita los interiores eligiendo siempre el más cercano
+    (en empate, el de menor índice) y termina en el índice n-1.
+    Cada búsqueda cuesta lo que revisar unas pocas celdas en lugar de
+    recorrer todos los puntos.
+    Si se acaba limite_tiempo (segundos), los puntos que falten se agregan
+    en orden de índice.
+    """
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    n = len(coords)
+    inicio = 0
+    fin = n - 1
+    rejilla = RejillaEspacial(coords, indices=range(1, n - 1))
+    ruta = [inicio]
+    actual = inicio
+    for paso in range(n - 2):
+        # Revisar el reloj cada 256 puntos: una consulta cuesta menos que eso
+        if plazo is not None and paso % 256 == 0 and time.monotonic() >= plazo:
+            visitado = set(ruta)
+            ruta.extend(i for i in range(1, n - 1) if i not in visitado)
+            break
+        mejor = rejilla.mas_cercano(coords[actual][0], coords[actual][1])
+        rejilla.eliminar(mejor)
+        ruta.append(mejor)
+        actual = mejor
+    ruta.append(fin)
+    return ruta
+
+
+# Listas de los k vecinos más cercanos usando la rejilla espacial
+def vecinos_cercanos_rejilla(coords, k=8, puntos_por_celda=4, bloque=512):
+    """
+    Mismo resultado que distancias.vecinos_cercanos (salvo el orden entre
+    empates), pero cada punto solo se compara con los de las celdas cercanas.
+    Se procesa celda por celda con NumPy: los puntos de una celda se comparan
+    a la vez contra el cuadrado de celdas que la rodea, y el cuadrado crece
+    solo para los puntos cuyo k-ésimo vecino podría estar fuera de él.
+    """
+    xy = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    n = len(xy)
+    k = max(0, min(k, n - 1))
+    vecinos = np.empty((n, k), dtype=np.int32)
+    if k == 0:
+        return vecinos
+
+    # Rejilla con ~puntos_por_celda puntos por celda, en formato compacto:
+    # los puntos ordenados por celda y el inicio de cada celda en ese orden
+    x0, y0 = xy.min(axis=0)
+    ancho, alto = xy.max(axis=0) - (x0, y0)
+    celdas_objetivo = max(1, n / puntos_por_celda)
+    lado = max(math.sqrt(ancho * alto / celdas_objetivo), max(ancho, alto) / celdas_objetivo)
+    if lado <= 0:
+        lado = 1.0
+    nx = int(ancho / lado) + 1
+    ny = int(alto / lado) + 1
+    cx = np.minimum(((xy[:, 0] - x0) // lado).astype(np.int64), nx - 1)
+    cy = np.minimum(((xy[:, 1] - y0) // lado).astype(np.int64), ny - 1)
+    celda = cy * nx + cx
+    orden = np.argsort(celda, kind="stable")
+    inicio = np.searchsorted(celda[orden], np.arange(nx * ny + 1))
+
+    for c in np.flatnonzero(np.diff(inicio)):
+        ccx, ccy = int(c % nx), int(c // nx)
+        puntos_celda = orden[inicio[c]:inicio[c + 1]]
+        for b in range(0, len(puntos_celda), bloque):
+            pendientes = puntos_celda[b:b + bloque]
+            r = 1
+            while len(pendientes):
+                x_lo, x_hi = max(0, ccx - r), min(nx - 1, ccx + r)
+                y_lo, y_hi = max(0, ccy - r), min(ny - 1, ccy + r)
+                r += 1
+                candidatos = np.concatenate([orden[inicio[y * nx + x_lo]:inicio[y * nx + x_hi + 1]]
+                                             for y in range(y_lo, y_hi + 1)])
+                if len(candidatos) <= k:
+                    continue
+                p = xy[pendientes]
+                d2 = ((p[:, None, :] - xy[candidatos][None, :, :]) ** 2).sum(axis=2)
+                d2[pendientes[:, None] == candidatos[None, :]] = np.inf
+                elegidos = np.argpartition(d2, k - 1, axis=1)[:, :k]
+                d2_k = np.take_along_axis(d2, elegidos, axis=1)
+                orden_k = np.argsort(d2_k, axis=1, kind="stable")
+                elegidos = np.take_along_axis(elegidos, orden_k, axis=1)
+                kesimo = np.sqrt(d2_k.max(axis=1))
+                # Cualquier punto fuera del cuadrado está al menos a la distancia
+                # del punto al borde del cuadrado (los bordes de la rejilla no cuentan)
+                margen = np.full(len(pendientes), np.inf)
+                if x_lo > 0:
+                    margen = np.minimum(margen, p[:, 0] - (x0 + x_lo * lado))
+                if x_hi < nx - 1:
+                    margen = np.minimum(margen, x0 + (x_hi + 1) * lado - p[:, 0])
+                if y_lo > 0:
+                    margen = np.minimum(margen, p[:, 1] - (y0 + y_lo * lado))
+                if y_hi < ny - 1:
+                    margen = np.minimum(margen, y0 + (y_hi + 1) * lado - p[:, 1])
+                listos = kesimo <= margen
+                vecinos[pendientes[listos]] = candidatos[elegidos[listos]]
+                pendientes = pendientes[~listos]
+    return vecinos
@@ -5,6 +5,8 @@ Cristian Moreno Villarreal
 """
 
 import math
+from carga import cargar_instancia
+from distancias import matriz_distancias
 
 # Nombre del archivo de datos
 DATA_FILE = "datos_60.txt"
@@ -17,6 +19,9 @@ def leer_puntos(nombre_archivo):
             linea = linea.strip()
             if not linea:
                 continue
+            # Lo que sigue a la marca OJO son notas, no puntos
+            if linea.startswith("OJO"):
+                break
             partes = linea.split()
             if len(partes) < 3:
                 continue
@@ -36,7 +41,7 @@ def distancia(a, b):
 
 
 # Encuentra la ruta más corta usando el algoritmo de vecino más cercano
-def vecino_mas_cercano(coords):
+def vecino_mas_cercano(coords, dist=None):
     # Asumimos que los puntos ya están ordenados por ID.
     n = len(coords)
     inicio = 0
@@ -50,9 +55,11 @@ def vecino_mas_cercano(coords):
     while restantes > 0:
         mejor = None
         mejor_d = float("inf")
+        # Distancias desde el punto actual (de la matriz si está disponible)
+        fila = dist[actual] if dist is not None else [distancia(coords[actual], p) for p in coords]
         for i in range(1, n - 1):  # no considerar 0 ni n-1 aquí
             if not visitado[i]:
-                d = distancia(coords[actual], coords[i])
+                d = fila[i]
                 if d < mejor_d:
                     mejor_d = d
                     mejor = i
@@ -65,11 +72,13 @@ def vecino_mas_cercano(coords):
     return ruta
 
 # Mejora la ruta usando el algoritmo de 2-opt simple
-def dos_opt_simple(coords, ruta):
+def dos_opt_simple(coords, ruta, dist=None):
     # Extremos fijos: no tocamos ruta[0] ni ruta[-1]
     n = len(ruta)
     if n <= 3:
         return ruta
+    if dist is None:
+        dist = matriz_distancias(coords)
     mejoro = True
     while mejoro:
         mejoro = False
@@ -79,16 +88,19 @@ def dos_opt_simple(coords, ruta):
             for j in range(i + 1, n - 1):
                 c = ruta[j]      # Último punto del segmento a evaluar
                 d = ruta[j + 1]  # Punto siguiente al segmento
-                antes = distancia(coords[a], coords[b]) + distancia(coords[c], coords[d])
-                despues = distancia(coords[a], coords[c]) + distancia(coords[b], coords[d])
+                antes = dist[a][b] + dist[c][d]
+                despues = dist[a][c] + dist[b][d]
                 if despues + 1e-12 < antes:
                     ruta[i:j + 1] = reversed(ruta[i:j + 1])
+                    b = ruta[i]  # el tramo invertido empieza ahora en c
                     mejoro = True
     return ruta
 
 
 # Calcula la longitud de la ruta
-def longitud(coords, ruta):
+def longitud(coords, ruta, dist=None):
+    if dist is not None:
+        return sum(dist[ruta[i]][ruta[i + 1]] for i in range(len(ruta) - 1))
     total = 0.0
     # Calcula la distancia total de la ruta
     for i in range(len(ruta) - 1):
@@ -97,18 +109,20 @@ def longitud(coords, ruta):
 
 # Función principal
 def main():
-    puntos = leer_puntos(DATA_FILE)
-    if not puntos:
+    # Instancia desde la caché binaria (se regenera sola si el archivo cambia)
+    ids_np, coords_np, _, matriz_np = cargar_instancia(DATA_FILE, matriz=True)
+    if len(ids_np) == 0:
         print("No hay puntos en el archivo de datos.")
         return
-    puntos.sort()
-    ids = [p[0] for p in puntos]
-    coords = [(p[1], p[2]) for p in puntos]
+    ids = ids_np.tolist()
+    coords = [tuple(p) for p in coords_np.tolist()]
+    # Matriz de distancias calculada una sola vez para toda la instancia
+    matriz = matriz_np.tolist()
     # Encuentra la ruta más corta usando el algoritmo de vecino más cercano
-    ruta = vecino_mas_cercano(coords)
-    ruta = dos_opt_simple(coords, ruta)
+    ruta = vecino_mas_cercano(coords, matriz)
+    ruta = dos_opt_simple(coords, ruta, matriz)
     # Calcula la distancia total
-    dist = longitud(coords, ruta)
+    dist = longitud(coords, ruta, matriz)
     ruta_ids = [ids[i] for i in ruta]
     # Imprime la ruta y la distancia total
     print("Archivo:", DATA_FILE)
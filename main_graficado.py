@@ -1,11 +1,13 @@
 import math
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 from copy import deepcopy
 import random
 from matplotlib.widgets import Button, TextBox, Slider
 import tempfile
 import os
+from animacion import animar_rutas
+from distancias import matriz_distancias
+from registro_rutas import INVERSION, RegistroRutas
 
 # Configuración de estilo matplotlib
 plt.rcParams['font.family'] = 'sans-serif'
@@ -24,6 +26,9 @@ def leer_puntos(nombre_archivo):
             linea = linea.strip()
             if not linea:
                 continue
+            # Lo que sigue a la marca OJO son notas, no puntos
+            if linea.startswith("OJO"):
+                break
             partes = linea.split()
             if len(partes) < 3:
                 continue
@@ -43,7 +48,7 @@ def distancia(a, b):
 
 
 # Encuentra la ruta más corta usando el algoritmo de vecino más cercano
-def vecino_mas_cercano(coords):
+def vecino_mas_cercano(coords, dist=None):
     n = len(coords)
     inicio = 0
     fin = n - 1
@@ -55,9 +60,11 @@ def vecino_mas_cercano(coords):
     while restantes > 0:
         mejor = None
         mejor_d = float("inf")
+        # Distancias desde el punto actual (de la matriz si está disponible)
+        fila = dist[actual] if dist is not None else [distancia(coords[actual], p) for p in coords]
         for i in range(1, n - 1):
             if not visitado[i]:
-                d = distancia(coords[actual], coords[i])
+                d = fila[i]
                 if d < mejor_d:
                     mejor_d = d
                     mejor = i
@@ -70,13 +77,16 @@ def vecino_mas_cercano(coords):
 
 
 # Mejora la ruta usando el algoritmo de 2-opt simple
-def dos_opt_simple(coords, ruta_inicial, rutas_intermedias=None):
+# (rutas_intermedias: RegistroRutas donde cada inversión queda como un cuadro)
+def dos_opt_simple(coords, ruta_inicial, rutas_intermedias=None, dist=None):
     ruta = deepcopy(ruta_inicial)
     n = len(ruta)
     if n <= 3:
         if rutas_intermedias is not None:
-            rutas_intermedias.append(deepcopy(ruta))
+            rutas_intermedias.cuadro()
         return ruta
+    if dist is None:
+        dist = matriz_distancias(coords)
     mejoro = True
     iteracion = 0
     while mejoro:
@@ -87,23 +97,27 @@ def dos_opt_simple(coords, ruta_inicial, rutas_intermedias=None):
             for j in range(i + 1, n - 1):
                 c = ruta[j]
                 d = ruta[j + 1]
-                antes = distancia(coords[a], coords[b]) + distancia(coords[c], coords[d])
-                despues = distancia(coords[a], coords[c]) + distancia(coords[b], coords[d])
+                antes = dist[a][b] + dist[c][d]
+                despues = dist[a][c] + dist[b][d]
                 if despues + 1e-12 < antes:
                     ruta[i:j + 1] = reversed(ruta[i:j + 1])
+                    b = ruta[i]  # el tramo invertido empieza ahora en c
                     mejoro = True
                     iteracion += 1
                     if rutas_intermedias is not None:
-                        rutas_intermedias.append(deepcopy(ruta))
+                        rutas_intermedias.movimiento(INVERSION, i, j, ruta)
+                        rutas_intermedias.cuadro()
         if not mejoro:
             break
     if rutas_intermedias is not None:
-        rutas_intermedias.append(deepcopy(ruta))
+        rutas_intermedias.cuadro()
     return ruta
 
 
 # Calcula la longitud de la ruta
-def longitud(coords, ruta):
+def longitud(coords, ruta, dist=None):
+    if dist is not None:
+        return sum(dist[ruta[i]][ruta[i + 1]] for i in range(len(ruta) - 1))
     total = 0.0
     for i in range(len(ruta) - 1):
         total += distancia(coords[ruta[i]], coords[ruta[i + 1]])
@@ -227,13 +241,15 @@ def main():
         print(f"Generando solución para {n_puntos} puntos...")
         
         # Resolver TSP
-        ruta_inicial = vecino_mas_cercano(coords)
-        rutas_intermedias = [deepcopy(ruta_inicial)]
-        ruta_final = dos_opt_simple(coords, ruta_inicial, rutas_intermedias)
+        dist = matriz_distancias(coords)
+        ruta_inicial = vecino_mas_cercano(coords, dist)
+        rutas_intermedias = RegistroRutas(ruta_inicial)
+        rutas_intermedias.cuadro()
+        ruta_final = dos_opt_simple(coords, ruta_inicial, rutas_intermedias, dist)
         
         # Calcular estadísticas
-        dist_inicial = longitud(coords, ruta_inicial)
-        dist_final = longitud(coords, ruta_final)
+        dist_inicial = longitud(coords, ruta_inicial, dist)
+        dist_final = longitud(coords, ruta_final, dist)
         mejora = ((dist_inicial - dist_final) / dist_inicial * 100)
         iteraciones = len(rutas_intermedias) - 1
         
@@ -270,58 +286,9 @@ def main():
             print("Primero genera y resuelve los datos.")
             return
         
-        # Crear figura de animación con espacio para título y progreso
-        fig_anim = plt.figure(figsize=(14, 9))
-        fig_anim.patch.set_facecolor('#ffffff')
-        
-        # Ajustar layout para dar espacio al título y progreso
-        ax_anim = plt.subplot2grid((20, 1), (1, 0), rowspan=18, fig=fig_anim)
-        
-        # Calcular límites fijos para toda la animación
-        x_all = [p[0] for p in coords]
-        y_all = [p[1] for p in coords]
-        x_min, x_max = min(x_all) - 5, max(x_all) + 5
-        y_min, y_max = min(y_all) - 5, max(y_all) + 5
-        
-        # Título fijo en la parte superior
-        titulo_text = fig_anim.text(0.5, 0.96, "", ha='center', va='top', 
-                                    fontsize=14, color='#2c3e50', weight='bold')
-        
-        # Texto de progreso en la parte inferior
-        progress_text = fig_anim.text(0.5, 0.02, "", ha='center', va='bottom', 
-                                     fontsize=11, color='#2c3e50', weight='bold',
-                                     bbox=dict(boxstyle="round,pad=0.4", 
-                                              facecolor='#ecf0f1', alpha=0.9,
-                                              edgecolor='#95a5a6', linewidth=1.5))
-        
-        def update(frame):
-            ax_anim.clear()
-            
-            # Establecer límites fijos
-            ax_anim.set_xlim(x_min, x_max)
-            ax_anim.set_ylim(y_min, y_max)
-            ax_anim.set_aspect('equal', adjustable='box')
-            
-            # Graficar frame actual sin título (lo pondremos arriba)
-            dist_actual = longitud(coords, rutas_intermedias[frame])
-            progreso = (frame / (len(rutas_intermedias) - 1)) * 100
-            
-            # Graficar ruta sin título en el eje
-            graficar_ruta(coords, rutas_intermedias[frame], ids, "", ax_anim, False)
-            
-            # Actualizar título principal arriba
-            titulo = f"Problema del Viajero (TSP) - Optimización en Tiempo Real\nIteración {frame}/{len(rutas_intermedias)-1}  |  Distancia Actual: {dist_actual:.2f}"
-            titulo_text.set_text(titulo)
-            
-            # Actualizar progreso
-            barra = '█' * int(progreso / 2) + '░' * (50 - int(progreso / 2))
-            progress_text.set_text(f"Progreso: {progreso:.0f}% [{barra}]")
-        
+        # Artistas creados una vez; cada cuadro solo actualiza la ruta (blitting)
         velocidad = int(slider_velocidad.val)
-        ani = FuncAnimation(fig_anim, update, frames=len(rutas_intermedias), 
-                          interval=velocidad, repeat=False, blit=False)
-        
-        plt.subplots_adjust(left=0.08, right=0.95, top=0.93, bottom=0.08)
+        animar_rutas(coords, rutas_intermedias, "Problema del Viajero (TSP) - Optimización en Tiempo Real", velocidad)
         plt.show()
     
     button_anim.on_clicked(animar_iteraciones)
@@ -6,11 +6,51 @@ Cristian Moreno Villarreal
 
 import math
 import random
+import time
+from collections import deque
 from copy import deepcopy
+from busqueda_local import or2opt
+from carga import cargar_instancia
+from cota_inferior import brecha, cota_inferior
+from distancias import matriz_distancias
+from estadisticas import Estadisticas, medir_fase
+from exacto import MAX_PUNTOS_EXACTO, resolver_exacto
+from multi_start import multi_start_paralelo, procesos_disponibles, semillas_intentos
+from movimientos import (
+    delta_intercambio, delta_inversion, delta_insercion,
+    aplicar_intercambio, aplicar_inversion, aplicar_insercion,
+)
 
 # Nombre del archivo de datos
 DATA_FILE = "datos_60.txt"
 
+# Procesos para los intentos de Annealing (None = todos los núcleos)
+NUM_PROCESOS = None
+
+# Semilla base de los intentos (None = aleatoria; se imprime para poder repetir)
+SEMILLA = None
+
+# Archivo JSON donde guardar las estadísticas de la ejecución (None = no registrar)
+ARCHIVO_ESTADISTICAS = None
+
+# Tiempo máximo en segundos para toda la optimización (None = sin límite).
+# Si se acaba, cada etapa devuelve la mejor ruta que tenga hasta ese momento.
+LIMITE_TIEMPO = None
+
+# Enfriamiento adaptativo de Annealing (temperatura inicial calibrada,
+# recalentamiento y término al converger) en lugar del geométrico fijo
+ENFRIAMIENTO_ADAPTATIVO = False
+
+# Brecha respecto a la cota inferior con la que se deja de buscar (por ejemplo
+# 0.01 = a lo más 1% sobre la cota; None = hacer todos los intentos)
+BRECHA_OBJETIVO = None
+
+
+# Segundos que faltan para el plazo (None si no hay plazo)
+def tiempo_restante(plazo):
+    return None if plazo is None else max(0.0, plazo - time.monotonic())
+
+
 # Lee los puntos del archivo de datos
 def leer_puntos(nombre_archivo):
     puntos = []  # (id, x, y)
@@ -19,6 +59,9 @@ def leer_puntos(nombre_archivo):
             linea = linea.strip()
             if not linea:
                 continue
+            # Lo que sigue a la marca OJO son notas, no puntos
+            if linea.startswith("OJO"):
+                break
             partes = linea.split()
             if len(partes) < 3:
                 continue
@@ -38,8 +81,11 @@ def distancia(a, b):
 
 
 # Encuentra la ruta más corta usando el algoritmo de vecino más cercano
-def vecino_mas_cercano(coords):
+def vecino_mas_cercano(coords, dist=None, limite_tiempo=None):
     # Asumimos que los puntos ya están ordenados por ID.
+    # Si se acaba limite_tiempo (segundos), los puntos que falten se agregan
+    # en orden de índice para devolver de todos modos una ruta completa.
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
     n = len(coords)
     inicio = 0
     fin = n - 1
@@ -50,11 +96,16 @@ def vecino_mas_cercano(coords):
     restantes = n - 2  # sin inicio y sin fin
     actual = inicio
     while restantes > 0:
+        if plazo is not None and time.monotonic() >= plazo:
+            ruta.extend(i for i in range(1, n - 1) if not visitado[i])
+            break
         mejor = None
         mejor_d = float("inf")
+        # Distancias desde el punto actual (de la matriz si está disponible)
+        fila = dist[actual] if dist is not None else [distancia(coords[actual], p) for p in coords]
         for i in range(1, n - 1):  # no considerar 0 ni n-1 aquí
             if not visitado[i]:
-                d = distancia(coords[actual], coords[i])
+                d = fila[i]
                 if d < mejor_d:
                     mejor_d = d
                     mejor = i
@@ -67,30 +118,52 @@ def vecino_mas_cercano(coords):
     return ruta
 
 # Mejora la ruta usando el algoritmo de 2-opt simple
-def dos_opt_simple(coords, ruta):
+def dos_opt_simple(coords, ruta, dist=None, estadisticas=None, limite_tiempo=None):
     # Extremos fijos: no tocamos ruta[0] ni ruta[-1]
+    # Si se acaba limite_tiempo (segundos) se devuelve la ruta como va
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
     n = len(ruta)
     if n <= 3:
         return ruta
+    if dist is None:
+        dist = matriz_distancias(coords)
+    pasadas = 0
+    inversiones = 0
+    evaluaciones = 0
     mejoro = True
     while mejoro:
         mejoro = False
+        pasadas += 1
         for i in range(1, n - 2):
+            if plazo is not None and time.monotonic() >= plazo:
+                mejoro = False
+                break
             a = ruta[i - 1]  # Punto anterior al segmento que evaluaremos
             b = ruta[i]      # Primer punto del segmento a evaluar
             for j in range(i + 1, n - 1):
                 c = ruta[j]      # Último punto del segmento a evaluar
                 d = ruta[j + 1]  # Punto siguiente al segmento
-                antes = distancia(coords[a], coords[b]) + distancia(coords[c], coords[d])
-                despues = distancia(coords[a], coords[c]) + distancia(coords[b], coords[d])
+                antes = dist[a][b] + dist[c][d]
+                despues = dist[a][c] + dist[b][d]
                 if despues + 1e-12 < antes:
                     ruta[i:j + 1] = reversed(ruta[i:j + 1])
+                    b = ruta[i]  # el tramo invertido empieza ahora en c
+                    inversiones += 1
                     mejoro = True
+            # Se cuenta por fila terminada: si limite_tiempo corta la pasada,
+            # solo cuenta lo que sí se evaluó
+            evaluaciones += n - 2 - i
+    if estadisticas is not None:
+        estadisticas.contar("dos_opt.pasadas", pasadas)
+        estadisticas.contar("dos_opt.inversiones", inversiones)
+        estadisticas.contar("dos_opt.evaluaciones", evaluaciones)
     return ruta
 
 
 # Calcula la longitud de la ruta
-def longitud(coords, ruta):
+def longitud(coords, ruta, dist=None):
+    if dist is not None:
+        return sum(dist[ruta[i]][ruta[i + 1]] for i in range(len(ruta) - 1))
     total = 0.0
     # Calcula la distancia total de la ruta
     for i in range(len(ruta) - 1):
@@ -98,19 +171,119 @@ def longitud(coords, ruta):
     return total
 
 
+# Enfriamiento adaptativo de simulated_annealing (adaptativo=True):
+# proporción de movimientos que empeoran que se aceptarían a la temperatura
+# inicial (los movimientos son al azar sobre toda la ruta, así que casi todos
+# empeoran mucho y solo los pocos que empeoran poco importan)
+ACEPTACION_INICIAL = 0.001
+# movimientos que se muestrean para calcular esa temperatura
+MUESTRAS_TEMPERATURA = 2000
+# la aceptación se mide sobre los últimos VENTANA_ACEPTACION pasos; por encima
+# de ACEPTACION_ALTA se enfría más rápido y por debajo de ACEPTACION_BAJA la
+# búsqueda está casi congelada
+VENTANA_ACEPTACION = 10
+ACEPTACION_ALTA = 0.004
+ACEPTACION_BAJA = 0.00025
+# pasos de temperatura sin mejorar la mejor ruta para considerar que se estancó
+PASOS_ESTANCAMIENTO = 15
+# veces que se recalienta antes de terminar, y a qué múltiplo de la temperatura
+# en que se encontró la mejor ruta
+MAX_RECALENTAMIENTOS = 2
+FACTOR_RECALENTAMIENTO = 20.0
+
+
+# Efecto de un movimiento al azar, con la misma mezcla de movimientos que
+# simulated_annealing (None si el movimiento no cambia la ruta)
+def _delta_al_azar(ruta, nodos_interiores, dist):
+    tipo_movimiento = random.random()
+    if tipo_movimiento < 0.5:
+        i, j = random.sample(nodos_interiores, 2)
+        return delta_intercambio(ruta, i, j, dist)
+    if tipo_movimiento < 0.85:
+        i, j = sorted(random.sample(nodos_interiores, 2))
+        return delta_inversion(ruta, i, j, dist)
+    i = random.choice(nodos_interiores)
+    j = random.choice(nodos_interiores)
+    return None if i == j else delta_insercion(ruta, i, j, dist)
+
+
+# Temperatura a la que se aceptaría la proporción dada de los movimientos que empeoran
+def temperatura_inicial(ruta, dist, aceptacion=ACEPTACION_INICIAL, muestras=MUESTRAS_TEMPERATURA):
+    """
+    Muestrea movimientos al azar sobre la ruta (sin aplicarlos) y busca por
+    bisección la temperatura T con promedio de exp(-delta/T) = aceptacion
+    sobre los que empeoran. Así la temperatura se ajusta a la escala de las
+    coordenadas y a la calidad de la ruta, en lugar de fijarla a mano.
+    Devuelve None si ningún movimiento muestreado empeora la ruta.
+    """
+    nodos_interiores = list(range(1, len(ruta) - 1))
+    if len(nodos_interiores) < 2:
+        return None
+    deltas = []
+    for _ in range(muestras):
+        delta = _delta_al_azar(ruta, nodos_interiores, dist)
+        if delta is not None and delta > 0:
+            deltas.append(delta)
+    if not deltas:
+        return None
+    bajo, alto = min(deltas) * 1e-3, max(deltas) * 1e3
+    for _ in range(40):
+        t = math.sqrt(bajo * alto)  # bisección sobre el logaritmo de T
+        if sum(math.exp(-d / t) for d in deltas) / len(deltas) < aceptacion:
+            bajo = t
+        else:
+            alto = t
+    return math.sqrt(bajo * alto)
+
+
 # Simulated Annealing mejorado con movimientos más efectivos
-def simulated_annealing(coords, ruta_inicial, temp_inicial=5000, temp_final=0.1, alpha=0.98, iteraciones_por_temp=200):
+def simulated_annealing(coords, ruta_inicial, temp_inicial=5000, temp_final=0.1, alpha=0.98, iteraciones_por_temp=200, dist=None, mostrar=True,
+                        estadisticas=None, limite_tiempo=None, longitud_objetivo=None, adaptativo=False):
     """
     Aplica Simulated Annealing para optimizar la ruta después de 2-opt.
     Mantiene fijos los extremos (inicio y fin).
     Usa múltiples tipos de movimientos para mejor exploración.
+    Cada movimiento se evalúa en tiempo constante a partir de las aristas
+    que toca y solo se aplica a la ruta si se acepta.
+    Con limite_tiempo (segundos) el enfriamiento se acelera, si hace falta,
+    para llegar a temp_final justo al acabarse el tiempo, y al llegar el
+    límite se devuelve la mejor ruta encontrada hasta ese momento.
+    Con longitud_objetivo se termina en cuanto la mejor ruta la alcanza.
+    Con adaptativo=True se ignoran temp_inicial y temp_final (con
+    limite_tiempo simplemente se detiene al acabarse el tiempo) y el
+    enfriamiento se calibra solo:
+    - La temperatura inicial es la que acepta ACEPTACION_INICIAL de los
+      movimientos que empeoran (temperatura_inicial).
+    - Después de cada paso se mide qué proporción de los movimientos que
+      empeoran se aceptó en los últimos VENTANA_ACEPTACION pasos: por encima
+      de ACEPTACION_ALTA se enfría con alpha^4 y por debajo de
+      ACEPTACION_BAJA con alpha^2; en medio, con alpha.
+    - Si la búsqueda está casi congelada y la mejor ruta no mejora en
+      PASOS_ESTANCAMIENTO pasos, se vuelve a la mejor ruta y se recalienta a
+      FACTOR_RECALENTAMIENTO veces la temperatura en que se encontró (hasta
+      MAX_RECALENTAMIENTOS veces); la siguiente vez se considera que
+      convergió y termina.
     """
-    ruta_actual = deepcopy(ruta_inicial)
-    mejor_ruta = deepcopy(ruta_inicial)
-    dist_actual = longitud(coords, ruta_actual)
+    inicio = time.monotonic()
+    plazo = None if limite_tiempo is None else inicio + limite_tiempo
+    if dist is None:
+        dist = matriz_distancias(coords)
+    ruta_actual = list(ruta_inicial)
+    mejor_ruta = ruta_actual
+    dist_actual = longitud(coords, ruta_actual, dist)
     mejor_dist = dist_actual
+    # Mientras la ruta actual sea la mejor no hace falta copiarla; solo se
+    # guarda una copia justo antes de aceptar un movimiento que empeora.
+    en_mejor = True
     
     temperatura = temp_inicial
+    if adaptativo:
+        temperatura = temperatura_inicial(ruta_actual, dist)
+        if temperatura is None:
+            return ruta_actual  # ningún movimiento empeora: nada que explorar
+        # Termina al converger y no en temp_final; el piso solo evita que la
+        # temperatura llegue a 0 en una búsqueda muy larga
+        temp_minima = temperatura * 1e-6
     n = len(ruta_actual)
     
     # Solo podemos modificar los nodos interiores (no los extremos)
@@ -118,70 +291,168 @@ def simulated_annealing(coords, ruta_inicial, temp_inicial=5000, temp_final=0.1,
     
     mejoras = 0
     
-    while temperatura > temp_final:
+    # Movimientos propuestos, aceptados y que mejoran, por tipo
+    registrar = estadisticas is not None
+    propuestos = [0, 0, 0]
+    aceptados = [0, 0, 0]
+    mejoran = [0, 0, 0]
+    paso = 0
+    alpha_plazo = None  # alpha máximo para terminar dentro del límite de tiempo
+    # Estado del enfriamiento adaptativo
+    temp_mejor = temperatura
+    ventana = deque(maxlen=VENTANA_ACEPTACION)  # (propuestos que empeoran, aceptados) por paso
+    pasos_sin_mejora = 0
+    recalentamientos = 0
+    
+    while temperatura > temp_final or adaptativo:
+        propuestos_antes = sum(propuestos)
+        aceptados_antes = sum(aceptados)
+        mejoras_antes = mejoras
+        subidas_aceptadas = 0  # movimientos que empeoran y se aceptaron
+        mejor_antes = mejor_dist
         for _ in range(iteraciones_por_temp):
-            # Crear nueva ruta con diferentes tipos de movimientos
-            nueva_ruta = deepcopy(ruta_actual)
+            # Proponer un movimiento y calcular su efecto sin tocar la ruta
             tipo_movimiento = random.random()
+            aplicar = None
+            delta = 0.0
             
             if tipo_movimiento < 0.5:  # 50% - Intercambio de dos nodos
                 if len(nodos_interiores) >= 2:
                     i, j = random.sample(nodos_interiores, 2)
-                    nueva_ruta[i], nueva_ruta[j] = nueva_ruta[j], nueva_ruta[i]
+                    delta = delta_intercambio(ruta_actual, i, j, dist)
+                    aplicar = aplicar_intercambio
+                    tipo = 0
             
             elif tipo_movimiento < 0.85:  # 35% - Inversión de segmento (mini 2-opt)
                 if len(nodos_interiores) >= 2:
                     i, j = sorted(random.sample(nodos_interiores, 2))
-                    nueva_ruta[i:j+1] = reversed(nueva_ruta[i:j+1])
+                    delta = delta_inversion(ruta_actual, i, j, dist)
+                    aplicar = aplicar_inversion
+                    tipo = 1
             
             else:  # 15% - Inserción (mover un nodo a otra posición)
                 if len(nodos_interiores) >= 2:
                     i = random.choice(nodos_interiores)
                     j = random.choice(nodos_interiores)
                     if i != j:
-                        nodo = nueva_ruta.pop(i)
-                        nueva_ruta.insert(j, nodo)
+                        delta = delta_insercion(ruta_actual, i, j, dist)
+                        aplicar = aplicar_insercion
+                        tipo = 2
             
-            # Calcular nueva distancia
-            nueva_dist = longitud(coords, nueva_ruta)
-            delta = nueva_dist - dist_actual
+            if registrar and aplicar is not None:
+                propuestos[tipo] += 1
             
-            # Decidir si aceptar la nueva ruta
+            # Decidir si aceptar el movimiento
             if delta < 0:  # Mejora
-                ruta_actual = nueva_ruta
-                dist_actual = nueva_dist
+                aplicar(ruta_actual, i, j)
+                dist_actual += delta
                 mejoras += 1
+                if registrar:
+                    aceptados[tipo] += 1
+                    mejoran[tipo] += 1
                 
                 if dist_actual < mejor_dist:
-                    mejor_ruta = deepcopy(ruta_actual)
                     mejor_dist = dist_actual
+                    en_mejor = True
             else:  # Peor solución
                 # Aceptar con probabilidad exp(-delta/T)
                 probabilidad = math.exp(-delta / temperatura)
-                if random.random() < probabilidad:
-                    ruta_actual = nueva_ruta
-                    dist_actual = nueva_dist
+                if random.random() < probabilidad and aplicar is not None:
+                    if en_mejor:
+                        mejor_ruta = ruta_actual[:]
+                        en_mejor = False
+                    aplicar(ruta_actual, i, j)
+                    dist_actual += delta
+                    subidas_aceptadas += 1
+                    if registrar:
+                        aceptados[tipo] += 1
         
+        if registrar:
+            estadisticas.temperatura(paso, temperatura, sum(propuestos) - propuestos_antes,
+                                     sum(aceptados) - aceptados_antes)
+        paso += 1
+        if longitud_objetivo is not None and mejor_dist <= longitud_objetivo:
+            break
         # Enfriar temperatura
-        temperatura *= alpha
+        alpha_paso = alpha
+        if adaptativo:
+            # Los movimientos propuestos que no mejoraron empeoran la ruta
+            ventana.append((iteraciones_por_temp - (mejoras - mejoras_antes), subidas_aceptadas))
+            subidas = sum(v[0] for v in ventana)
+            aceptacion = sum(v[1] for v in ventana) / subidas if subidas else 0.0
+            if mejor_dist < mejor_antes:
+                temp_mejor = temperatura
+                pasos_sin_mejora = 0
+            else:
+                pasos_sin_mejora += 1
+            if aceptacion > ACEPTACION_ALTA:
+                alpha_paso = alpha ** 4
+            elif aceptacion < ACEPTACION_BAJA:
+                alpha_paso = alpha ** 2
+                if pasos_sin_mejora >= PASOS_ESTANCAMIENTO:
+                    if recalentamientos == MAX_RECALENTAMIENTOS:
+                        break  # convergió
+                    # Recalentar desde la mejor ruta
+                    recalentamientos += 1
+                    pasos_sin_mejora = 0
+                    if not en_mejor:
+                        ruta_actual = mejor_ruta[:]
+                        dist_actual = mejor_dist
+                        en_mejor = True
+                    temperatura = temp_mejor * FACTOR_RECALENTAMIENTO
+                    alpha_paso = 1.0
+        if alpha_plazo is not None:
+            alpha_paso = min(alpha_paso, alpha_plazo)
+        temperatura *= alpha_paso
+        if adaptativo:
+            temperatura = max(temperatura, temp_minima)
+        if plazo is not None:
+            ahora = time.monotonic()
+            if ahora >= plazo:
+                break
+            # Pasos que caben en el tiempo que queda, al ritmo medido hasta ahora;
+            # si son menos de los que faltan con alpha, se enfría más rápido.
+            # Con un reloj de baja resolución (~15 ms en Windows) puede que
+            # aún no haya avanzado: entonces todavía no hay ritmo que medir
+            if ahora > inicio and temperatura > temp_final and not adaptativo:
+                pasos_posibles = (plazo - ahora) / ((ahora - inicio) / paso)
+                alpha_plazo = (temp_final / temperatura) ** (1 / max(pasos_posibles, 1))
+    
+    if registrar:
+        for k, nombre in enumerate(("intercambio", "inversion", "insercion")):
+            estadisticas.movimiento("sa." + nombre, propuestos[k], aceptados[k], mejoran[k])
+        estadisticas.contar("sa.pasos_temperatura", paso)
+        if adaptativo:
+            estadisticas.contar("sa.recalentamientos", recalentamientos)
     
-    print(f"   (Annealing realizó {mejoras} mejoras)")
+    if en_mejor:
+        mejor_ruta = ruta_actual
+    
+    if mostrar:
+        print(f"   (Annealing realizó {mejoras} mejoras)")
     return mejor_ruta
 
 
 # 2-opt mejorado con más iteraciones
-def dos_opt_mejorado(coords, ruta):
+def dos_opt_mejorado(coords, ruta, dist=None, estadisticas=None, limite_tiempo=None):
     """
     Versión mejorada de 2-opt que itera múltiples veces desde diferentes puntos
     para encontrar mejores soluciones
     """
+    if dist is None:
+        dist = matriz_distancias(coords)
     mejor_ruta = deepcopy(ruta)
-    mejor_dist = longitud(coords, mejor_ruta)
+    mejor_dist = longitud(coords, mejor_ruta, dist)
+    
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
     
     # Aplicar 2-opt múltiples veces
     for intento in range(3):  # 3 pasadas completas
-        ruta_temp = dos_opt_simple(coords, mejor_ruta)
-        dist_temp = longitud(coords, ruta_temp)
+        restante = tiempo_restante(plazo)
+        if restante == 0:
+            break
+        ruta_temp = dos_opt_simple(coords, mejor_ruta, dist, estadisticas, restante)
+        dist_temp = longitud(coords, ruta_temp, dist)
         if dist_temp < mejor_dist:
             mejor_ruta = ruta_temp
             mejor_dist = dist_temp
@@ -190,58 +461,134 @@ def dos_opt_mejorado(coords, ruta):
 
 # Función principal
 def main():
-    puntos = leer_puntos(DATA_FILE)
-    if not puntos:
+    estadisticas = Estadisticas() if ARCHIVO_ESTADISTICAS else None
+    plazo = None if LIMITE_TIEMPO is None else time.monotonic() + LIMITE_TIEMPO
+    
+    # Instancia desde la caché binaria (se regenera sola si el archivo cambia)
+    with medir_fase(estadisticas, "carga"):
+        ids_np, coords_np, _, dist_np = cargar_instancia(DATA_FILE, matriz=True)
+    if len(ids_np) == 0:
         print("No hay puntos en el archivo de datos.")
         return
-    puntos.sort()
-    ids = [p[0] for p in puntos]
-    coords = [(p[1], p[2]) for p in puntos]
+    ids = ids_np.tolist()
+    coords = [tuple(p) for p in coords_np.tolist()]
+    # Matriz de distancias calculada una sola vez y compartida por todas las etapas
+    dist = dist_np.tolist()
     
     # Paso 1: Genera ruta inicial con vecino más cercano
     print("=== Optimización del Viajero (TSP) ===")
     print(f"Archivo: {DATA_FILE}")
     print(f"Puntos: {len(coords)}\n")
     
-    ruta = vecino_mas_cercano(coords)
-    dist_inicial = longitud(coords, ruta)
+    with medir_fase(estadisticas, "vecino_mas_cercano"):
+        ruta = vecino_mas_cercano(coords, dist, tiempo_restante(plazo))
+    dist_inicial = longitud(coords, ruta, dist)
     print(f"1. Vecino más cercano - Distancia: {dist_inicial:.2f}")
     
     # Paso 2: Optimiza con 2-opt mejorado (múltiples pasadas)
-    ruta = dos_opt_mejorado(coords, ruta)
-    dist_2opt = longitud(coords, ruta)
+    with medir_fase(estadisticas, "dos_opt"):
+        ruta = dos_opt_mejorado(coords, ruta, dist, estadisticas, tiempo_restante(plazo))
+    dist_2opt = longitud(coords, ruta, dist)
     mejora_2opt = ((dist_inicial - dist_2opt) / dist_inicial) * 100
     print(f"2. Después de 2-opt    - Distancia: {dist_2opt:.2f} (mejora: {mejora_2opt:.2f}%)")
     
-    # Paso 3: Ejecutar múltiples intentos de Simulated Annealing para encontrar la mejor solución
-    print(f"3. Ejecutando Annealing múltiples veces para encontrar mejor solución...")
-    mejor_ruta_global = ruta
-    mejor_dist_global = dist_2opt
+    # Paso 2b: Or-opt (junto con 2-opt) para salir del óptimo local de 2-opt
+    with medir_fase(estadisticas, "or_opt"):
+        ruta = or2opt(coords, ruta, dist=dist, estadisticas=estadisticas, limite_tiempo=tiempo_restante(plazo))
+    dist_local = longitud(coords, ruta, dist)
+    mejora_oropt = ((dist_2opt - dist_local) / dist_2opt) * 100
+    print(f"   Después de Or-opt   - Distancia: {dist_local:.2f} (mejora: {mejora_oropt:.2f}%)")
+    
+    # Cota inferior: ninguna ruta puede ser más corta, así que mide qué tan lejos
+    # del óptimo puede estar la ruta actual
+    with medir_fase(estadisticas, "cota_inferior"):
+        cota = cota_inferior(coords, dist_local, dist=dist_np, limite_tiempo=tiempo_restante(plazo))
+    print(f"   Cota inferior (Held-Karp): {cota:.2f} (brecha: {brecha(dist_local, cota) * 100:.2f}%)")
+    longitud_objetivo = None if BRECHA_OBJETIVO is None else cota * (1 + BRECHA_OBJETIVO)
     
+    # Paso 3: Ejecutar múltiples intentos de Simulated Annealing en paralelo
     num_intentos = 35  # Ejecutar 35 veces y quedarse con la mejor
-    for intento in range(1, num_intentos + 1):
-        print(f"   Intento {intento}/{num_intentos}...", end=" ")
-        ruta_temp = simulated_annealing(coords, ruta, temp_inicial=10000, temp_final=0.01, alpha=0.97, iteraciones_por_temp=300)
-        dist_temp = longitud(coords, ruta_temp)
-        print(f"Distancia: {dist_temp:.2f}")
+    semilla_base, semillas = semillas_intentos(num_intentos, SEMILLA)
+    procesos = min(procesos_disponibles(NUM_PROCESOS), num_intentos)
+    mejor_ruta_global = ruta
+    mejor_dist_global = dist_local
+    mejor_intento = 0  # 0 = la ruta de la búsqueda local
+    exacto = len(coords) <= MAX_PUNTOS_EXACTO
+    if exacto:
+        # Con pocos puntos la ruta óptima cuesta menos que los intentos de Annealing
+        print(f"3. Calculando la ruta óptima ({len(coords)} puntos)...")
+        with medir_fase(estadisticas, "exacto"):
+            mejor_ruta_global = resolver_exacto(coords_np, dist_np, ruta, tiempo_restante(plazo), estadisticas)
+        mejor_dist_global = longitud(coords, mejor_ruta_global, dist)
+        num_intentos = 0
+        semillas = []
+    else:
+        print(f"3. Ejecutando Annealing múltiples veces para encontrar mejor solución...")
+        print(f"   ({procesos} procesos, semilla {semilla_base})")
+    
+    parametros_sa = dict(temp_inicial=10000, temp_final=0.01, alpha=0.97, iteraciones_por_temp=300, mostrar=False,
+                         longitud_objetivo=longitud_objetivo, adaptativo=ENFRIAMIENTO_ADAPTATIVO)
+    if not exacto and longitud_objetivo is not None and dist_local <= longitud_objetivo:
+        # La búsqueda local ya está dentro de la brecha objetivo
+        print("   La ruta ya está dentro de la brecha objetivo; no hace falta Annealing")
+        num_intentos = 0
+        semillas = []
+    if plazo is not None:
+        # El tiempo que queda se reparte entre las rondas de intentos (cada
+        # proceso ejecuta uno tras otro sus intentos); cada intento ajusta su
+        # enfriamiento para terminar dentro de su parte
+        rondas = max(1, math.ceil(num_intentos / procesos))
+        parametros_sa["limite_tiempo"] = tiempo_restante(plazo) / rondas
+    intentos = multi_start_paralelo(simulated_annealing, coords, ruta, semillas, NUM_PROCESOS, dist, estadisticas,
+                                    **parametros_sa)
+    inicio_sa = time.perf_counter()
+    for recibidos, (intento, semilla, ruta_temp) in enumerate(intentos, 1):
+        # Los intentos llegan a medida que terminan, no necesariamente en orden
+        dist_temp = longitud(coords, ruta_temp, dist)
+        print(f"   Intento {intento}/{num_intentos} - Distancia: {dist_temp:.2f}")
         
-        if dist_temp < mejor_dist_global:
+        # En empate gana el intento con menor número, para que el resultado no
+        # dependa del orden en que terminan los procesos
+        if (dist_temp, intento) < (mejor_dist_global, mejor_intento):
             mejor_ruta_global = ruta_temp
             mejor_dist_global = dist_temp
+            mejor_intento = intento
             print(f"      ¡Nueva mejor distancia encontrada!")  # Indicador de mejora
+        
+        if plazo is not None and time.monotonic() >= plazo and recibidos < num_intentos:
+            # Se acabó el tiempo: los intentos en cola se cancelan y los que ya
+            # corren terminan enseguida, porque tienen el mismo plazo
+            print("   Se acabó el tiempo; se descartan los intentos pendientes")
+            intentos.close()
+            break
+        if longitud_objetivo is not None and mejor_dist_global <= longitud_objetivo and recibidos < num_intentos:
+            print(f"   Brecha objetivo alcanzada; se descartan los intentos pendientes")
+            # Se cancelan los intentos en cola; close() espera a los que ya corren
+            intentos.close()
+            break
+    
+    if estadisticas is not None:
+        # Tiempo de reloj de todos los intentos juntos
+        estadisticas.fases["annealing"] = time.perf_counter() - inicio_sa
     
     dist_final = mejor_dist_global
     ruta = mejor_ruta_global
     
-    mejora_sa = ((dist_2opt - dist_final) / dist_2opt) * 100
+    mejora_sa = ((dist_local - dist_final) / dist_local) * 100
     mejora_total = ((dist_inicial - dist_final) / dist_inicial) * 100
-    print(f"\n   Mejor resultado de Annealing - Distancia: {dist_final:.2f} (mejora adicional: {mejora_sa:.2f}%)")
+    etiqueta = "Ruta óptima" if exacto else "Mejor resultado de Annealing"
+    print(f"\n   {etiqueta} - Distancia: {dist_final:.2f} (mejora adicional: {mejora_sa:.2f}%)")
     
     print(f"\nMejora total: {mejora_total:.2f}% (de {dist_inicial:.2f} a {dist_final:.2f})")
+    print(f"Brecha respecto a la cota inferior: {brecha(dist_final, cota) * 100:.2f}% (cota {cota:.2f})")
     
     # Imprime la ruta final
     ruta_ids = [ids[i] for i in ruta]
     print(f"\nRuta final (IDs): {ruta_ids}")
+    
+    if estadisticas is not None:
+        estadisticas.guardar(ARCHIVO_ESTADISTICAS)
+        print(f"\nEstadísticas guardadas en {ARCHIVO_ESTADISTICAS}")
 
 # Main
 if __name__ == "__main__":
@@ -6,11 +6,18 @@ Cristian Moreno Villarreal
 
 import math
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
 from copy import deepcopy
 import random
 from matplotlib.widgets import Button, TextBox, Slider
 import numpy as np
+from animacion import animar_rutas
+from distancias import matriz_distancias
+from registro_rutas import INTERCAMBIO, INSERCION, INVERSION, RegistroRutas
+from multi_start import multi_start_paralelo, procesos_disponibles, semillas_intentos
+from movimientos import (
+    delta_intercambio, delta_inversion, delta_insercion,
+    aplicar_intercambio, aplicar_inversion, aplicar_insercion,
+)
 
 # Configuración de estilo matplotlib
 plt.rcParams['font.family'] = 'sans-serif'
@@ -21,6 +28,12 @@ plt.rcParams['figure.facecolor'] = '#ffffff'
 # Nombre del archivo de datos
 DATA_FILE = "datos_60.txt"
 
+# Procesos para los intentos de Annealing (None = todos los núcleos)
+NUM_PROCESOS = None
+
+# Semilla base de los intentos (None = aleatoria; se imprime para poder repetir)
+SEMILLA = None
+
 # Lee los puntos del archivo de datos
 def leer_puntos(nombre_archivo):
     puntos = []  # (id, x, y)
@@ -30,6 +43,9 @@ def leer_puntos(nombre_archivo):
                 linea = linea.strip()
                 if not linea:
                     continue
+                # Lo que sigue a la marca OJO son notas, no puntos
+                if linea.startswith("OJO"):
+                    break
                 partes = linea.split()
                 if len(partes) < 3:
                     continue
@@ -51,7 +67,7 @@ def distancia(a, b):
 
 
 # Encuentra la ruta más corta usando el algoritmo de vecino más cercano
-def vecino_mas_cercano(coords):
+def vecino_mas_cercano(coords, dist=None):
     n = len(coords)
     inicio = 0
     fin = n - 1
@@ -63,9 +79,11 @@ def vecino_mas_cercano(coords):
     while restantes > 0:
         mejor = None
         mejor_d = float("inf")
+        # Distancias desde el punto actual (de la matriz si está disponible)
+        fila = dist[actual] if dist is not None else [distancia(coords[actual], p) for p in coords]
         for i in range(1, n - 1):
             if not visitado[i]:
-                d = distancia(coords[actual], coords[i])
+                d = fila[i]
                 if d < mejor_d:
                     mejor_d = d
                     mejor = i
@@ -78,13 +96,16 @@ def vecino_mas_cercano(coords):
 
 
 # Mejora la ruta usando el algoritmo de 2-opt simple
-def dos_opt_simple(coords, ruta_inicial, rutas_intermedias=None):
+# (rutas_intermedias: RegistroRutas donde cada inversión queda como un cuadro)
+def dos_opt_simple(coords, ruta_inicial, rutas_intermedias=None, dist=None):
     ruta = deepcopy(ruta_inicial)
     n = len(ruta)
     if n <= 3:
         if rutas_intermedias is not None:
-            rutas_intermedias.append(deepcopy(ruta))
+            rutas_intermedias.cuadro()
         return ruta
+    if dist is None:
+        dist = matriz_distancias(coords)
     mejoro = True
     iteracion = 0
     while mejoro:
@@ -95,34 +116,38 @@ def dos_opt_simple(coords, ruta_inicial, rutas_intermedias=None):
             for j in range(i + 1, n - 1):
                 c = ruta[j]
                 d = ruta[j + 1]
-                antes = distancia(coords[a], coords[b]) + distancia(coords[c], coords[d])
-                despues = distancia(coords[a], coords[c]) + distancia(coords[b], coords[d])
+                antes = dist[a][b] + dist[c][d]
+                despues = dist[a][c] + dist[b][d]
                 if despues + 1e-12 < antes:
                     ruta[i:j + 1] = reversed(ruta[i:j + 1])
+                    b = ruta[i]  # el tramo invertido empieza ahora en c
                     mejoro = True
                     iteracion += 1
                     if rutas_intermedias is not None:
-                        rutas_intermedias.append(deepcopy(ruta))
+                        rutas_intermedias.movimiento(INVERSION, i, j, ruta)
+                        rutas_intermedias.cuadro()
         if not mejoro:
             break
     if rutas_intermedias is not None:
-        rutas_intermedias.append(deepcopy(ruta))
+        rutas_intermedias.cuadro()
     return ruta
 
 
 # 2-opt mejorado con más iteraciones
-def dos_opt_mejorado(coords, ruta, rutas_intermedias=None):
+def dos_opt_mejorado(coords, ruta, rutas_intermedias=None, dist=None):
     """
     Versión mejorada de 2-opt que itera múltiples veces desde diferentes puntos
     para encontrar mejores soluciones
     """
+    if dist is None:
+        dist = matriz_distancias(coords)
     mejor_ruta = deepcopy(ruta)
-    mejor_dist = longitud(coords, mejor_ruta)
+    mejor_dist = longitud(coords, mejor_ruta, dist)
     
     # Aplicar 2-opt múltiples veces
     for intento in range(3):  # 3 pasadas completas
-        ruta_temp = dos_opt_simple(coords, mejor_ruta, rutas_intermedias)
-        dist_temp = longitud(coords, ruta_temp)
+        ruta_temp = dos_opt_simple(coords, mejor_ruta, rutas_intermedias, dist)
+        dist_temp = longitud(coords, ruta_temp, dist)
         if dist_temp < mejor_dist:
             mejor_ruta = ruta_temp
             mejor_dist = dist_temp
@@ -132,16 +157,28 @@ def dos_opt_mejorado(coords, ruta, rutas_intermedias=None):
 
 # Simulated Annealing mejorado con movimientos más efectivos
 def simulated_annealing(coords, ruta_inicial, temp_inicial=5000, temp_final=0.1, alpha=0.98, 
-                       iteraciones_por_temp=200, rutas_intermedias=None, capturar_cada=10):
+                       iteraciones_por_temp=200, rutas_intermedias=None, capturar_cada=10, dist=None):
     """
     Aplica Simulated Annealing para optimizar la ruta después de 2-opt.
     Mantiene fijos los extremos (inicio y fin).
     Usa múltiples tipos de movimientos para mejor exploración.
+    Cada movimiento se evalúa en tiempo constante a partir de las aristas
+    que toca y solo se aplica a la ruta si se acepta.
+    rutas_intermedias es un RegistroRutas que empieza en ruta_inicial: se
+    anota cada movimiento aceptado y cada captura es un cuadro con la mejor
+    ruta hasta ese momento (sin copiar la ruta).
     """
-    ruta_actual = deepcopy(ruta_inicial)
-    mejor_ruta = deepcopy(ruta_inicial)
-    dist_actual = longitud(coords, ruta_actual)
+    if dist is None:
+        dist = matriz_distancias(coords)
+    registrar = rutas_intermedias is not None
+    ruta_actual = list(ruta_inicial)
+    mejor_ruta = ruta_actual
+    dist_actual = longitud(coords, ruta_actual, dist)
     mejor_dist = dist_actual
+    # Mientras la ruta actual sea la mejor no hace falta copiarla
+    en_mejor = True
+    # Movimientos registrados hasta la mejor ruta (cuando no es la actual)
+    movimientos_mejor = 0
     
     temperatura = temp_inicial
     n = len(ruta_actual)
@@ -155,66 +192,90 @@ def simulated_annealing(coords, ruta_inicial, temp_inicial=5000, temp_final=0.1,
     while temperatura > temp_final:
         for _ in range(iteraciones_por_temp):
             iteracion_global += 1
-            # Crear nueva ruta con diferentes tipos de movimientos
-            nueva_ruta = deepcopy(ruta_actual)
+            # Proponer un movimiento y calcular su efecto sin tocar la ruta
             tipo_movimiento = random.random()
+            aplicar = None
+            delta = 0.0
             
             if tipo_movimiento < 0.5:  # 50% - Intercambio de dos nodos
                 if len(nodos_interiores) >= 2:
                     i, j = random.sample(nodos_interiores, 2)
-                    nueva_ruta[i], nueva_ruta[j] = nueva_ruta[j], nueva_ruta[i]
+                    delta = delta_intercambio(ruta_actual, i, j, dist)
+                    aplicar = aplicar_intercambio
+                    tipo = INTERCAMBIO
             
             elif tipo_movimiento < 0.85:  # 35% - Inversión de segmento (mini 2-opt)
                 if len(nodos_interiores) >= 2:
                     i, j = sorted(random.sample(nodos_interiores, 2))
-                    nueva_ruta[i:j+1] = reversed(nueva_ruta[i:j+1])
+                    delta = delta_inversion(ruta_actual, i, j, dist)
+                    aplicar = aplicar_inversion
+                    tipo = INVERSION
             
             else:  # 15% - Inserción (mover un nodo a otra posición)
                 if len(nodos_interiores) >= 2:
                     i = random.choice(nodos_interiores)
                     j = random.choice(nodos_interiores)
                     if i != j:
-                        nodo = nueva_ruta.pop(i)
-                        nueva_ruta.insert(j, nodo)
-            
-            # Calcular nueva distancia
-            nueva_dist = longitud(coords, nueva_ruta)
-            delta = nueva_dist - dist_actual
+                        delta = delta_insercion(ruta_actual, i, j, dist)
+                        aplicar = aplicar_insercion
+                        tipo = INSERCION
             
-            # Decidir si aceptar la nueva ruta
+            # Decidir si aceptar el movimiento
             if delta < 0:  # Mejora
-                ruta_actual = nueva_ruta
-                dist_actual = nueva_dist
+                aplicar(ruta_actual, i, j)
+                dist_actual += delta
                 mejoras += 1
+                if registrar:
+                    rutas_intermedias.movimiento(tipo, i, j, ruta_actual)
                 
                 if dist_actual < mejor_dist:
-                    mejor_ruta = deepcopy(ruta_actual)
                     mejor_dist = dist_actual
+                    en_mejor = True
                     # Capturar mejoras significativas
-                    if rutas_intermedias is not None:
-                        rutas_intermedias.append(deepcopy(mejor_ruta))
+                    if registrar:
+                        rutas_intermedias.cuadro()
             else:  # Peor solución
                 # Aceptar con probabilidad exp(-delta/T)
                 probabilidad = math.exp(-delta / temperatura)
-                if random.random() < probabilidad:
-                    ruta_actual = nueva_ruta
-                    dist_actual = nueva_dist
+                if random.random() < probabilidad and aplicar is not None:
+                    if en_mejor:
+                        mejor_ruta = ruta_actual[:]
+                        en_mejor = False
+                        if registrar:
+                            movimientos_mejor = rutas_intermedias.num_movimientos
+                    aplicar(ruta_actual, i, j)
+                    dist_actual += delta
+                    if registrar:
+                        rutas_intermedias.movimiento(tipo, i, j, ruta_actual)
             
             # Capturar rutas intermedias cada N iteraciones
-            if rutas_intermedias is not None and iteracion_global % capturar_cada == 0:
-                rutas_intermedias.append(deepcopy(mejor_ruta))
+            if registrar and iteracion_global % capturar_cada == 0:
+                rutas_intermedias.cuadro(None if en_mejor else movimientos_mejor)
         
         # Enfriar temperatura
         temperatura *= alpha
     
-    if rutas_intermedias is not None:
-        rutas_intermedias.append(deepcopy(mejor_ruta))
+    if en_mejor:
+        mejor_ruta = ruta_actual
+    
+    if registrar:
+        rutas_intermedias.cuadro(None if en_mejor else movimientos_mejor)
     
     return mejor_ruta
 
 
+# Un intento de Annealing que devuelve también sus capturas para la animación
+# (a nivel de módulo para poder ejecutarse en otro proceso)
+def _sa_capturando(coords, ruta, dist=None, **parametros):
+    capturas = RegistroRutas(ruta)
+    mejor_ruta = simulated_annealing(coords, ruta, rutas_intermedias=capturas, dist=dist, **parametros)
+    return mejor_ruta, capturas
+
+
 # Calcula la longitud de la ruta
-def longitud(coords, ruta):
+def longitud(coords, ruta, dist=None):
+    if dist is not None:
+        return sum(dist[ruta[i]][ruta[i + 1]] for i in range(len(ruta) - 1))
     total = 0.0
     for i in range(len(ruta) - 1):
         total += distancia(coords[ruta[i]], coords[ruta[i + 1]])
@@ -289,8 +350,9 @@ def main():
     
     # Variables globales
     global coords, ids, rutas_intermedias, ruta_inicial, ruta_final, mostrar_etiquetas
-    global temp_inicial, temp_final, alpha_sa, iters_temp, num_intentos_sa
+    global temp_inicial, temp_final, alpha_sa, iters_temp, num_intentos_sa, matriz
     coords = []
+    matriz = None
     ids = []
     rutas_intermedias = []
     mostrar_etiquetas = True
@@ -468,7 +530,7 @@ def main():
     
     def generar_y_resolver(event):
         global coords, ids, rutas_intermedias, ruta_inicial, ruta_final
-        global temp_inicial, temp_final, alpha_sa, iters_temp, num_intentos_sa
+        global temp_inicial, temp_final, alpha_sa, iters_temp, num_intentos_sa, matriz
         
         try:
             n_puntos = int(num_text.text)
@@ -498,18 +560,20 @@ def main():
         puntos.sort(key=lambda t: t[0])
         ids = [p[0] for p in puntos]
         coords = [(p[1], p[2]) for p in puntos]
+        matriz = matriz_distancias(coords)
         
         print(f"\n=== Generando solución para {n_puntos} puntos ===")
         
         # Paso 1: Vecino más cercano
-        ruta_inicial = vecino_mas_cercano(coords)
-        dist_inicial = longitud(coords, ruta_inicial)
+        ruta_inicial = vecino_mas_cercano(coords, matriz)
+        dist_inicial = longitud(coords, ruta_inicial, matriz)
         print(f"1. Vecino más cercano - Distancia: {dist_inicial:.2f}")
         
         # Paso 2: 2-opt mejorado
-        rutas_intermedias = [deepcopy(ruta_inicial)]
-        ruta = dos_opt_mejorado(coords, ruta_inicial, rutas_intermedias)
-        dist_2opt = longitud(coords, ruta)
+        rutas_intermedias = RegistroRutas(ruta_inicial)
+        rutas_intermedias.cuadro()
+        ruta = dos_opt_mejorado(coords, ruta_inicial, rutas_intermedias, matriz)
+        dist_2opt = longitud(coords, ruta, matriz)
         mejora_2opt = ((dist_inicial - dist_2opt) / dist_inicial * 100)
         print(f"2. Después de 2-opt - Distancia: {dist_2opt:.2f} (mejora: {mejora_2opt:.2f}%)")
         
@@ -548,7 +612,7 @@ def main():
     
     def optimizar_con_sa(event):
         global coords, ids, rutas_intermedias, ruta_final
-        global temp_inicial, temp_final, alpha_sa, iters_temp, num_intentos_sa
+        global temp_inicial, temp_final, alpha_sa, iters_temp, num_intentos_sa, matriz
         
         if not coords:
             print("Primero genera los puntos.")
@@ -563,35 +627,50 @@ def main():
         else:
             ruta_base = ruta_final
         
-        dist_antes_sa = longitud(coords, ruta_base)
+        dist_antes_sa = longitud(coords, ruta_base, matriz)
         
         # Ejecutar múltiples intentos de SA
         mejor_ruta_global = ruta_base
         mejor_dist_global = dist_antes_sa
         
-        # Limpiar rutas intermedias para la animación de SA
-        rutas_sa = [deepcopy(ruta_base)]
-        
-        for intento in range(1, num_intentos_sa + 1):
-            print(f"   Intento {intento}/{num_intentos_sa}...", end=" ")
-            ruta_temp = simulated_annealing(coords, ruta_base, temp_inicial, temp_final, 
-                                          alpha_sa, iters_temp, rutas_sa, capturar_cada=50)
-            dist_temp = longitud(coords, ruta_temp)
-            print(f"Distancia: {dist_temp:.2f}")
+        mejor_intento = 0
+        
+        # Los intentos corren en paralelo; sus capturas se guardan por intento
+        # para armar la animación en orden al final
+        semilla_base, semillas = semillas_intentos(num_intentos_sa, SEMILLA)
+        procesos = min(procesos_disponibles(NUM_PROCESOS), num_intentos_sa)
+        print(f"   ({procesos} procesos, semilla {semilla_base})")
+        capturas_por_intento = {}
+        
+        intentos = multi_start_paralelo(_sa_capturando, coords, ruta_base, semillas, NUM_PROCESOS, matriz,
+                                        temp_inicial=temp_inicial, temp_final=temp_final, alpha=alpha_sa,
+                                        iteraciones_por_temp=iters_temp, capturar_cada=50)
+        for intento, semilla, (ruta_temp, capturas) in intentos:
+            capturas_por_intento[intento] = capturas
+            dist_temp = longitud(coords, ruta_temp, matriz)
+            print(f"   Intento {intento}/{num_intentos_sa} - Distancia: {dist_temp:.2f}")
             
-            if dist_temp < mejor_dist_global:
+            # En empate gana el intento con menor número
+            if (dist_temp, intento) < (mejor_dist_global, mejor_intento):
                 mejor_ruta_global = ruta_temp
                 mejor_dist_global = dist_temp
+                mejor_intento = intento
                 print(f"      ¡Nueva mejor distancia encontrada!")
         
+        # Rutas intermedias para la animación de SA
+        rutas_sa = RegistroRutas(ruta_base)
+        rutas_sa.cuadro()
+        for intento in sorted(capturas_por_intento):
+            rutas_sa.extender(capturas_por_intento[intento])
+        
         ruta_final = mejor_ruta_global
         dist_final = mejor_dist_global
         
         # Agregar a rutas intermedias para animación
-        rutas_intermedias.extend(rutas_sa)
+        rutas_intermedias.extender(rutas_sa)
         
         # Calcular mejoras
-        dist_inicial = longitud(coords, vecino_mas_cercano(coords))
+        dist_inicial = longitud(coords, vecino_mas_cercano(coords, matriz), matriz)
         mejora_sa = ((dist_antes_sa - dist_final) / dist_antes_sa * 100)
         mejora_total = ((dist_inicial - dist_final) / dist_inicial * 100)
         
@@ -630,58 +709,9 @@ def main():
             print("Primero genera y resuelve los datos.")
             return
         
-        # Crear figura de animación con espacio para título y progreso
-        fig_anim = plt.figure(figsize=(14, 9))
-        fig_anim.patch.set_facecolor('#ffffff')
-        
-        # Ajustar layout para dar espacio al título y progreso
-        ax_anim = plt.subplot2grid((20, 1), (1, 0), rowspan=18, fig=fig_anim)
-        
-        # Calcular límites fijos para toda la animación
-        x_all = [p[0] for p in coords]
-        y_all = [p[1] for p in coords]
-        x_min, x_max = min(x_all) - 5, max(x_all) + 5
-        y_min, y_max = min(y_all) - 5, max(y_all) + 5
-        
-        # Título fijo en la parte superior
-        titulo_text = fig_anim.text(0.5, 0.96, "", ha='center', va='top', 
-                                    fontsize=14, color='#2c3e50', weight='bold')
-        
-        # Texto de progreso en la parte inferior
-        progress_text = fig_anim.text(0.5, 0.02, "", ha='center', va='bottom', 
-                                     fontsize=11, color='#2c3e50', weight='bold',
-                                     bbox=dict(boxstyle="round,pad=0.4", 
-                                              facecolor='#ecf0f1', alpha=0.9,
-                                              edgecolor='#95a5a6', linewidth=1.5))
-        
-        def update(frame):
-            ax_anim.clear()
-            
-            # Establecer límites fijos
-            ax_anim.set_xlim(x_min, x_max)
-            ax_anim.set_ylim(y_min, y_max)
-            ax_anim.set_aspect('equal', adjustable='box')
-            
-            # Graficar frame actual sin título (lo pondremos arriba)
-            dist_actual = longitud(coords, rutas_intermedias[frame])
-            progreso = (frame / (len(rutas_intermedias) - 1)) * 100
-            
-            # Graficar ruta sin título en el eje
-            graficar_ruta(coords, rutas_intermedias[frame], ids, "", ax_anim, False)
-            
-            # Actualizar título principal arriba
-            titulo = f"Optimización TSP en Tiempo Real\nIteración {frame}/{len(rutas_intermedias)-1}  |  Distancia Actual: {dist_actual:.2f}"
-            titulo_text.set_text(titulo)
-            
-            # Actualizar progreso
-            barra = '█' * int(progreso / 2) + '░' * (50 - int(progreso / 2))
-            progress_text.set_text(f"Progreso: {progreso:.0f}% [{barra}]")
-        
+        # Artistas creados una vez; cada cuadro solo actualiza la ruta (blitting)
         velocidad = int(slider_velocidad.val)
-        ani = FuncAnimation(fig_anim, update, frames=len(rutas_intermedias), 
-                          interval=velocidad, repeat=False, blit=False)
-        
-        plt.subplots_adjust(left=0.08, right=0.95, top=0.93, bottom=0.08)
+        animar_rutas(coords, rutas_intermedias, "Optimización TSP en Tiempo Real", velocidad)
         plt.show()
     
     button_anim.on_clicked(animar_iteraciones)
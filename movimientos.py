@@ -0,0 +1,77 @@
+"""
+Problema del Viajero (TSP) - Movimientos con evaluación incremental
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Cada movimiento de Simulated Annealing cambia solo 2-4 aristas de la ruta,
+así que su efecto sobre la distancia total se calcula mirando únicamente
+esas aristas, en tiempo constante. La ruta solo se modifica cuando el
+movimiento se acepta.
+
+Las posiciones i, j siempre son interiores (1..n-2): los extremos de la
+ruta nunca se mueven.
+"""
+
+
+# Cambio de distancia al intercambiar los nodos de las posiciones i y j
+def delta_intercambio(ruta, i, j, dist):
+    if i > j:
+        i, j = j, i
+    a = ruta[i]
+    b = ruta[j]
+    p = ruta[i - 1]
+    q = ruta[j + 1]
+    if j == i + 1:
+        # Nodos contiguos: la arista a-b se conserva (solo cambia de sentido)
+        return dist[p][b] + dist[a][q] - dist[p][a] - dist[b][q]
+    a_sig = ruta[i + 1]
+    b_ant = ruta[j - 1]
+    antes = dist[p][a] + dist[a][a_sig] + dist[b_ant][b] + dist[b][q]
+    despues = dist[p][b] + dist[b][a_sig] + dist[b_ant][a] + dist[a][q]
+    return despues - antes
+
+
+# Cambio de distancia al invertir el segmento ruta[i..j] (i < j)
+def delta_inversion(ruta, i, j, dist):
+    a = ruta[i - 1]
+    b = ruta[i]
+    c = ruta[j]
+    d = ruta[j + 1]
+    return dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+
+
+# Cambio de distancia al sacar el nodo de la posición i e insertarlo en j
+# (equivale a nodo = ruta.pop(i); ruta.insert(j, nodo))
+def delta_insercion(ruta, i, j, dist):
+    if i == j:
+        return 0.0
+    x = ruta[i]
+    p = ruta[i - 1]
+    q = ruta[i + 1]
+    # Al quitar x, p y q quedan unidos
+    delta = dist[p][q] - dist[p][x] - dist[x][q]
+    if i < j:
+        # x queda entre ruta[j] y ruta[j + 1]
+        u = ruta[j]
+        v = ruta[j + 1]
+    else:
+        # x queda entre ruta[j - 1] y ruta[j]
+        u = ruta[j - 1]
+        v = ruta[j]
+    return delta + dist[u][x] + dist[x][v] - dist[u][v]
+
+
+# Aplica el intercambio de las posiciones i y j
+def aplicar_intercambio(ruta, i, j):
+    ruta[i], ruta[j] = ruta[j], ruta[i]
+
+
+# Aplica la inversión del segmento ruta[i..j]
+def aplicar_inversion(ruta, i, j):
+    ruta[i:j + 1] = reversed(ruta[i:j + 1])
+
+
+# Aplica la inserción del nodo de la posición i en la posición j
+def aplicar_insercion(ruta, i, j):
+    if i != j:
+        ruta.insert(j, ruta.pop(i))
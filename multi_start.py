@@ -0,0 +1,102 @@
+"""
+Problema del Viajero (TSP) - Multi-start en paralelo
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Reparte los intentos independientes de una metaheurística (por ejemplo
+simulated_annealing) entre varios procesos. Cada intento recibe su propia
+semilla derivada de una semilla base, así que el resultado de cada intento
+es reproducible sin importar en qué proceso ni en qué orden se ejecute.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from estadisticas import Estadisticas
+
+# Datos de la instancia en cada proceso trabajador (se envían una sola vez)
+_COORDS = None
+_DIST = None
+
+
+def _iniciar_trabajador(coords, dist):
+    global _COORDS, _DIST
+    _COORDS = coords
+    _DIST = dist
+
+
+# Ejecuta un intento con su semilla dentro del proceso trabajador; devuelve
+# también sus estadísticas (o None) para sumarlas en el proceso principal
+def _ejecutar_intento(funcion, ruta, semilla, parametros, registrar=False):
+    random.seed(semilla)
+    if not registrar:
+        return funcion(_COORDS, ruta, dist=_DIST, **parametros), None
+    estadisticas = Estadisticas()
+    return funcion(_COORDS, ruta, dist=_DIST, estadisticas=estadisticas, **parametros), estadisticas
+
+
+# Semillas independientes y reproducibles para cada intento
+def semillas_intentos(num_intentos, semilla=None):
+    """
+    Devuelve (semilla_base, [semilla de cada intento]). Si no se da semilla
+    base se elige una al azar; imprimirla permite repetir la ejecución.
+    """
+    secuencia = np.random.SeedSequence(semilla)
+    hijas = secuencia.spawn(num_intentos)
+    return secuencia.entropy, [int(h.generate_state(1)[0]) for h in hijas]
+
+
+# Número de procesos a usar: todos los núcleos si no se indica
+def procesos_disponibles(procesos=None):
+    if procesos is None or procesos <= 0:
+        return os.cpu_count() or 1
+    return procesos
+
+
+# Ejecuta los intentos en paralelo y los entrega a medida que terminan
+def multi_start_paralelo(funcion, coords, ruta, semillas, procesos=None, dist=None, estadisticas=None, **parametros):
+    """
+    Generador que produce (intento, semilla, resultado) conforme cada intento
+    termina, donde resultado es lo que devuelve funcion(coords, ruta,
+    dist=dist, **parametros). Los intentos se numeran desde 1.
+    funcion debe estar definida a nivel de módulo para poder enviarse a los
+    procesos. Con un solo proceso los intentos se ejecutan aquí mismo, en orden.
+    Si se da un objeto Estadisticas, cada intento registra en uno propio y al
+    terminar se suman en el que se dio.
+    Si quien lo consume se detiene antes (close() o break), los intentos que
+    aún no empiezan se cancelan, pero los que ya corren en un proceso no se
+    pueden interrumpir: close() espera a que terminen (a lo más uno por
+    proceso). Para acotar esa espera, cada intento debe recibir su propio
+    límite de tiempo, como hace main_optimizado.
+    """
+    registrar = estadisticas is not None
+    procesos = min(procesos_disponibles(procesos), len(semillas))
+    if procesos <= 1:
+        _iniciar_trabajador(coords, dist)
+        for intento, semilla in enumerate(semillas, start=1):
+            resultado, propias = _ejecutar_intento(funcion, ruta, semilla, parametros, registrar)
+            if registrar:
+                estadisticas.combinar(propias)
+            yield intento, semilla, resultado
+        return
+
+    pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                               initargs=(coords, dist))
+    try:
+        futuros = {
+            pool.submit(_ejecutar_intento, funcion, ruta, semilla, parametros, registrar): (intento, semilla)
+            for intento, semilla in enumerate(semillas, start=1)
+        }
+        for futuro in as_completed(futuros):
+            intento, semilla = futuros[futuro]
+            resultado, propias = futuro.result()
+            if registrar:
+                estadisticas.combinar(propias)
+            yield intento, semilla, resultado
+    finally:
+        # Si quien consume el generador se detiene antes, se cancelan los intentos
+        # en cola; los que ya empezaron terminan y su resultado se descarta
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,187 @@
+"""
+Problema del Viajero (TSP) - Resolución por partición para instancias enormes
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Para 100k a 1M de puntos el plano se divide en celdas (árbol k-d: cada celda
+se parte por la mediana de su lado más largo hasta tener a lo más
+tamano_celda puntos). Las celdas se ordenan resolviendo una instancia
+pequeña con el punto inicial, los centroides de las celdas y el punto final,
+y cada celda se resuelve por separado, en un grupo de procesos, con el mismo
+pipeline de main_optimizado (vecino más cercano + 2-opt y, si se pide,
+Annealing) como una ruta con extremos fijos: entra por el punto más cercano a
+la celda anterior y sale por el más cercano a la siguiente. Las rutas de las
+celdas se concatenan y al final se repara cada costura con 2-opt y Or-opt
+sobre los puntos de la ruta alrededor de ella.
+Cada proceso solo recibe los puntos de su celda o de su ventana, así que su
+memoria depende de tamano_celda y no del tamaño de la instancia.
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+import main_optimizado as m
+from busqueda_local import or2opt
+from construccion import arista_voraz
+from distancias import coordenadas_np, matriz_distancias, vecinos_cercanos
+from estadisticas import medir_fase
+from multi_start import procesos_disponibles, semillas_intentos
+
+# Máximo de puntos por celda (la matriz de una celda ocupa 8·tamano_celda² bytes)
+TAMANO_CELDA = 100
+
+
+# Divide los índices en celdas de a lo más `tamano` puntos con un árbol k-d
+def particion_kd(xy, tamano=TAMANO_CELDA, indices=None):
+    """
+    Cada celda con más de `tamano` puntos se parte en dos mitades iguales por
+    la mediana de su lado más largo, así que todas quedan con entre
+    tamano/2 y tamano puntos. Devuelve una lista de arreglos de índices.
+    """
+    if indices is None:
+        indices = np.arange(len(xy))
+    pendientes = [np.asarray(indices)]
+    celdas = []
+    while pendientes:
+        celda = pendientes.pop()
+        if len(celda) <= tamano:
+            celdas.append(celda)
+            continue
+        puntos = xy[celda]
+        eje = int(np.argmax(puntos.max(axis=0) - puntos.min(axis=0)))
+        mitad = len(celda) // 2
+        orden = np.argpartition(puntos[:, eje], mitad)
+        pendientes.append(celda[orden[:mitad]])
+        pendientes.append(celda[orden[mitad:]])
+    return celdas
+
+
+# Resuelve una celda (en un proceso trabajador): ruta de puntos[0] a puntos[-1]
+def _resolver_celda(puntos, semilla, parametros_sa, plazo):
+    if len(puntos) <= 3:
+        return list(range(len(puntos)))
+    coords = [tuple(p) for p in puntos.tolist()]
+    dist = matriz_distancias(coords)
+    ruta = m.vecino_mas_cercano(coords, dist, m.tiempo_restante(plazo))
+    ruta = m.dos_opt_mejorado(coords, ruta, dist, limite_tiempo=m.tiempo_restante(plazo))
+    if parametros_sa is not None:
+        random.seed(semilla)
+        ruta = m.simulated_annealing(coords, ruta, dist=dist, mostrar=False,
+                                     limite_tiempo=m.tiempo_restante(plazo), **parametros_sa)
+    return ruta
+
+
+# Mejora un tramo de la ruta alrededor de una costura, sin mover sus extremos
+def _reparar_ventana(puntos, plazo):
+    if len(puntos) <= 3:
+        return list(range(len(puntos)))
+    coords = [tuple(p) for p in puntos.tolist()]
+    dist = matriz_distancias(coords)
+    ruta = m.dos_opt_mejorado(coords, list(range(len(coords))), dist, limite_tiempo=m.tiempo_restante(plazo))
+    return or2opt(coords, ruta, dist=dist, limite_tiempo=m.tiempo_restante(plazo))
+
+
+# Aplica funcion a cada juego de argumentos, en el grupo de procesos si lo hay
+def _mapear(pool, funcion, *argumentos, procesos=1):
+    if pool is None:
+        return list(map(funcion, *argumentos))
+    tareas = len(argumentos[0])
+    # Lotes de varias tareas por envío: cada tarea es pequeña
+    return list(pool.map(funcion, *argumentos, chunksize=max(1, tareas // (8 * procesos))))
+
+
+# Orden de las celdas: ruta del punto inicial al final pasando por los centroides
+def _ordenar_celdas(xy, celdas):
+    n = len(xy)
+    centroides = np.array([xy[c].mean(axis=0) for c in celdas]).reshape(-1, 2)
+    puntos = np.vstack([xy[0], centroides, xy[n - 1]])
+    coords = [tuple(p) for p in puntos.tolist()]
+    ruta = or2opt(coords, arista_voraz(puntos))
+    return [celdas[i - 1] for i in ruta[1:-1]], centroides[np.asarray(ruta[1:-1], dtype=np.intp) - 1]
+
+
+# Ruta para instancias enormes: partición, celdas en paralelo y reparación de costuras
+def resolver_por_particion(coords, tamano_celda=TAMANO_CELDA, procesos=None, semilla=None, parametros_sa=None,
+                           pulir=False, estadisticas=None, limite_tiempo=None):
+    """
+    coords: lista de (x, y) o arreglo (n, 2); la ruta va del índice 0 al n-1.
+    procesos: procesos del grupo (None = todos los núcleos; 1 = todo aquí).
+    parametros_sa: si se da (un dict para simulated_annealing), cada celda se
+    mejora también con Annealing, con una semilla propia derivada de semilla.
+    pulir: al final, Or-2opt sobre toda la ruta con listas de vecinos
+    (corrige también las costuras entre celdas que no son consecutivas, pero
+    las listas de vecinos se calculan en un solo proceso).
+    Con limite_tiempo las etapas que no alcanzan a terminar devuelven lo que
+    tengan, como en el resto del proyecto.
+    """
+    xy = coordenadas_np(coords)
+    n = len(xy)
+    if n <= 3:
+        return list(range(n))
+    plazo = None if limite_tiempo is None else time.monotonic() + limite_tiempo
+    procesos = procesos_disponibles(procesos)
+
+    with medir_fase(estadisticas, "particion.celdas"):
+        celdas = particion_kd(xy, tamano_celda, np.arange(1, n - 1))
+        celdas, centroides = _ordenar_celdas(xy, celdas)
+        # Entrada de cada celda: su punto más cercano a la salida de la
+        # anterior; salida: el más cercano al centroide de la siguiente
+        subinstancias = []
+        anterior = xy[0]
+        for c, celda in enumerate(celdas):
+            siguiente = centroides[c + 1] if c + 1 < len(celdas) else xy[n - 1]
+            puntos = xy[celda]
+            entrada = int(np.argmin(((puntos - anterior) ** 2).sum(axis=1)))
+            a_siguiente = ((puntos - siguiente) ** 2).sum(axis=1)
+            if len(celda) > 1:
+                a_siguiente[entrada] = np.inf
+            salida = int(np.argmin(a_siguiente))
+            resto = [p for p in range(len(celda)) if p != entrada and p != salida]
+            orden = np.array([entrada] + resto + ([salida] if salida != entrada else []), dtype=np.intp)
+            subinstancias.append(celda[orden])
+            anterior = puntos[salida]
+    _, semillas = semillas_intentos(len(celdas), semilla)
+
+    pool = None if procesos <= 1 else ProcessPoolExecutor(max_workers=procesos)
+    try:
+        with medir_fase(estadisticas, "particion.resolver"):
+            rutas = _mapear(pool, _resolver_celda, [xy[s] for s in subinstancias], semillas,
+                            repeat(parametros_sa, len(celdas)), repeat(plazo, len(celdas)), procesos=procesos)
+        ruta = [0]
+        costuras = []  # posición del primer punto de cada celda (salvo la primera)
+        for s, ruta_celda in zip(subinstancias, rutas):
+            costuras.append(len(ruta))
+            ruta.extend(s[ruta_celda].tolist())
+        ruta.append(n - 1)
+        costuras.append(n - 1)
+
+        # Ventanas disjuntas de la ruta alrededor de cada costura
+        with medir_fase(estadisticas, "particion.reparar"):
+            radio = max(2, tamano_celda // 4)
+            ventanas = []
+            fin_anterior = 0
+            for pos in costuras:
+                ini = max(pos - radio, fin_anterior)
+                fin = min(pos + radio, n - 1)
+                if fin - ini >= 3:
+                    ventanas.append((ini, fin))
+                    fin_anterior = fin
+            arreglo = np.asarray(ruta, dtype=np.intp)
+            tramos = [arreglo[ini:fin + 1] for ini, fin in ventanas]
+            reparadas = _mapear(pool, _reparar_ventana, [xy[t] for t in tramos], repeat(plazo, len(tramos)),
+                                procesos=procesos)
+            for (ini, fin), tramo, orden in zip(ventanas, tramos, reparadas):
+                ruta[ini:fin + 1] = tramo[orden].tolist()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    if pulir:
+        with medir_fase(estadisticas, "particion.pulir"):
+            ruta = or2opt(xy.tolist(), ruta, vecinos_cercanos(xy, 8), estadisticas=estadisticas,
+                          limite_tiempo=m.tiempo_restante(plazo))
+    return ruta
@@ -0,0 +1,220 @@
+"""
+Problema del Viajero (TSP) - Representación compacta de la ruta
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Lista de dos niveles: la ruta se parte en ~sqrt(n) segmentos guardados en
+arreglos int32, cada uno con un bit de "invertido". Invertir un tramo largo
+solo parte a lo más dos segmentos y voltea el orden (y el bit) de los
+segmentos intermedios, así que cuesta O(sqrt(n)) en lugar de O(n).
+Para cada ciudad se guarda en qué segmento está y en qué lugar, de modo que
+siguiente, anterior, posición y "está entre" cuestan O(1).
+"""
+
+import math
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+
+class Recorrido:
+    """
+    Ruta abierta sobre las ciudades 0..n-1 con inversión sub-lineal.
+    capacidad: tamaño del índice inverso si la ruta no usa todos los índices
+    (por ejemplo, la de ruta_incremental, que deja huecos al eliminar).
+    """
+
+    def __init__(self, ruta, tam_segmento=None, capacidad=None):
+        n = len(ruta)
+        self.n = n
+        self.tam_segmento = tam_segmento or max(8, int(math.sqrt(n)))
+        # Índice inverso: segmento de cada ciudad y su lugar dentro del arreglo
+        capacidad = max(n, capacidad or 0)
+        self.seg = array("i", bytes(4 * capacidad))
+        self.idx = array("i", bytes(4 * capacidad))
+        self._construir(array("i", ruta))
+
+    # Reparte la ruta en segmentos de tam_segmento ciudades
+    def _construir(self, ciudades):
+        t = self.tam_segmento
+        self.contenido = [ciudades[k:k + t] for k in range(0, len(ciudades), t)]
+        self.invertido = [False] * len(self.contenido)
+        # Orden de los segmentos en la ruta, lugar de cada segmento en ese
+        # orden y posición de la ruta donde empieza cada lugar
+        self.orden = list(range(len(self.contenido)))
+        self.rango = list(range(len(self.contenido)))
+        self.inicio = list(range(0, len(ciudades), t))
+        seg, idx = self.seg, self.idx
+        for s, arr in enumerate(self.contenido):
+            for k, c in enumerate(arr):
+                seg[c] = s
+                idx[c] = k
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        for s in self.orden:
+            arr = self.contenido[s]
+            yield from (reversed(arr) if self.invertido[s] else arr)
+
+    # Ciudad en la posición p de la ruta
+    def __getitem__(self, p):
+        if p < 0:
+            p += self.n
+        if not 0 <= p < self.n:
+            raise IndexError("posición fuera de la ruta")
+        r = bisect_right(self.inicio, p) - 1
+        s = self.orden[r]
+        arr = self.contenido[s]
+        k = p - self.inicio[r]
+        return arr[len(arr) - 1 - k] if self.invertido[s] else arr[k]
+
+    def tolist(self):
+        return list(self)
+
+    # Ruta como arreglo int32 (copia)
+    def a_numpy(self):
+        return np.fromiter(self, dtype=np.int32, count=self.n)
+
+    # Copia independiente (para guardar una ruta sin deepcopy de listas)
+    def copia(self):
+        otra = Recorrido.__new__(Recorrido)
+        otra.n = self.n
+        otra.tam_segmento = self.tam_segmento
+        otra.seg = array("i", self.seg)
+        otra.idx = array("i", self.idx)
+        otra.contenido = [array("i", arr) for arr in self.contenido]
+        otra.invertido = self.invertido[:]
+        otra.orden = self.orden[:]
+        otra.rango = self.rango[:]
+        otra.inicio = self.inicio[:]
+        return otra
+
+    # Posición de la ciudad c en la ruta
+    def posicion(self, c):
+        s = self.seg[c]
+        k = self.idx[c]
+        if self.invertido[s]:
+            k = len(self.contenido[s]) - 1 - k
+        return self.inicio[self.rango[s]] + k
+
+    # Ciudad que sigue a c en la ruta (None si c es la última)
+    def siguiente(self, c):
+        s = self.seg[c]
+        arr = self.contenido[s]
+        k = self.idx[c] + (-1 if self.invertido[s] else 1)
+        if 0 <= k < len(arr):
+            return arr[k]
+        r = self.rango[s] + 1
+        if r == len(self.orden):
+            return None
+        s = self.orden[r]
+        arr = self.contenido[s]
+        return arr[-1] if self.invertido[s] else arr[0]
+
+    # Ciudad que precede a c en la ruta (None si c es la primera)
+    def anterior(self, c):
+        s = self.seg[c]
+        arr = self.contenido[s]
+        k = self.idx[c] + (1 if self.invertido[s] else -1)
+        if 0 <= k < len(arr):
+            return arr[k]
+        r = self.rango[s] - 1
+        if r < 0:
+            return None
+        s = self.orden[r]
+        arr = self.contenido[s]
+        return arr[0] if self.invertido[s] else arr[-1]
+
+    # True si b está en el tramo que va de a hasta c (inclusive)
+    def entre(self, a, b, c):
+        return self.posicion(a) <= self.posicion(b) <= self.posicion(c)
+
+    # Parte el segmento del lugar r para que la posición p empiece un segmento
+    def _partir(self, r, p):
+        k = p - self.inicio[r]
+        if k == 0:
+            return
+        s = self.orden[r]
+        arr = self.contenido[s]
+        m = len(arr)
+        inv = self.invertido[s]
+        # En el arreglo interno, el primer tramo de la ruta es el prefijo
+        # (o el sufijo si el segmento está invertido)
+        corte = m - k if inv else k
+        izquierda, derecha = arr[:corte], arr[corte:]
+        nuevo = len(self.contenido)
+        seg, idx = self.seg, self.idx
+        for j, c in enumerate(derecha):
+            seg[c] = nuevo
+            idx[c] = j
+        self.contenido[s] = izquierda
+        self.contenido.append(derecha)
+        self.invertido.append(inv)
+        # El nuevo segmento va después en la ruta, o antes si está invertido
+        lugar = r if inv else r + 1
+        self.orden.insert(lugar, nuevo)
+        self.rango.append(0)
+        self.inicio.insert(r + 1, p)
+        for q in range(r, len(self.orden)):
+            self.rango[self.orden[q]] = q
+
+    # Invierte el tramo de posiciones i..j (como ruta[i:j+1] = reversed(...))
+    def invertir(self, i, j):
+        if i >= j:
+            return
+        inicio = self.inicio
+        r = bisect_right(inicio, i) - 1
+        if j < (inicio[r + 1] if r + 1 < len(inicio) else self.n):
+            # Todo el tramo cae en un solo segmento: se invierte ahí mismo
+            s = self.orden[r]
+            arr = self.contenido[s]
+            a, b = i - inicio[r], j - inicio[r]
+            if self.invertido[s]:
+                a, b = len(arr) - 1 - b, len(arr) - 1 - a
+            arr[a:b + 1] = arr[a:b + 1][::-1]
+            idx = self.idx
+            for k in range(a, b + 1):
+                idx[arr[k]] = k
+            return
+        # Dejar i al inicio de un segmento y j al final de otro
+        self._partir(r, i)
+        if j + 1 < self.n:
+            self._partir(bisect_right(self.inicio, j + 1) - 1, j + 1)
+        ra = bisect_right(self.inicio, i) - 1
+        rb = bisect_right(self.inicio, j) - 1
+        # Voltear el orden y el bit de los segmentos ra..rb
+        orden = self.orden
+        orden[ra:rb + 1] = orden[ra:rb + 1][::-1]
+        p = i
+        for q in range(ra, rb + 1):
+            s = orden[q]
+            self.invertido[s] = not self.invertido[s]
+            self.rango[s] = q
+            inicio[q] = p
+            p += len(self.contenido[s])
+        # Cada inversión agrega a lo más dos segmentos: si ya hay demasiados,
+        # se reconstruye (costo O(n) cada ~sqrt(n) inversiones)
+        if len(orden) > 2 * (self.n // self.tam_segmento + 1):
+            self._construir(array("i", self))
+
+    # Mueve la ciudad de la posición i a la posición j (como pop(i) + insert(j))
+    def mover(self, i, j):
+        if i < j:
+            self.invertir(i, j)
+            self.invertir(i, j - 1)
+        elif j < i:
+            self.invertir(j, i)
+            self.invertir(j + 1, i)
+
+    # Intercambia las ciudades de las posiciones i y j
+    def intercambiar(self, i, j):
+        a, b = self[i], self[j]
+        sa, ka = self.seg[a], self.idx[a]
+        sb, kb = self.seg[b], self.idx[b]
+        self.contenido[sa][ka] = b
+        self.contenido[sb][kb] = a
+        self.seg[a], self.idx[a] = sb, kb
+        self.seg[b], self.idx[b] = sa, ka
@@ -0,0 +1,132 @@
+"""
+Problema del Viajero (TSP) - Registro de rutas intermedias por movimientos
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+En lugar de copiar la ruta completa en cada captura, se guarda la ruta
+inicial, cada movimiento aplicado (tipo, i, j) y, cada cierto número de
+movimientos, una copia completa de la ruta (cuadro clave). Un cuadro de la
+animación es solo la cantidad de movimientos aplicados hasta ese momento.
+Para obtener la ruta de un cuadro se parte del cuadro clave anterior y se
+repiten los movimientos que faltan; recorrer los cuadros en orden solo
+repite los movimientos nuevos de cada uno.
+"""
+
+from array import array
+from bisect import bisect_right
+
+from movimientos import aplicar_intercambio, aplicar_inversion, aplicar_insercion
+
+# Tipos de movimiento (los mismos códigos que usa simulated_annealing)
+INTERCAMBIO = 0
+INVERSION = 1
+INSERCION = 2
+_APLICAR = (aplicar_intercambio, aplicar_inversion, aplicar_insercion)
+
+# Marca entre dos registros unidos con extender (nunca se repite)
+_REINICIO = -1
+
+
+class RegistroRutas:
+    """
+    Secuencia de rutas (len, registro[k], for ruta in registro) guardada
+    como movimientos. Quien registra aplica cada movimiento a su ruta y
+    luego llama a movimiento(tipo, i, j, ruta); los movimientos deben
+    aplicarse, en orden, sobre la ruta en la que quedó el registro.
+    """
+
+    def __init__(self, ruta_inicial, cada_clave=None):
+        # Con un cuadro clave cada ~n movimientos, las copias completas
+        # ocupan lo mismo que los movimientos
+        self.cada_clave = cada_clave or max(64, len(ruta_inicial))
+        self._tipos = array('b')
+        self._i = array('i')
+        self._j = array('i')
+        self._claves_pos = array('q', [0])  # movimiento en que empieza cada cuadro clave
+        self._claves = [array('i', ruta_inicial)]
+        self._cuadros = array('q')  # movimientos aplicados en cada cuadro
+        self._desde_clave = 0
+        self._cache = None  # (movimientos, ruta) del último cuadro reconstruido
+
+    @property
+    def num_movimientos(self):
+        return len(self._tipos)
+
+    # Registra un movimiento ya aplicado a ruta
+    def movimiento(self, tipo, i, j, ruta):
+        self._tipos.append(tipo)
+        self._i.append(i)
+        self._j.append(j)
+        self._desde_clave += 1
+        if self._desde_clave >= self.cada_clave:
+            self._claves_pos.append(len(self._tipos))
+            self._claves.append(array('i', ruta))
+            self._desde_clave = 0
+
+    # Agrega un cuadro con la ruta tras `movimientos` movimientos (por defecto, la actual)
+    def cuadro(self, movimientos=None):
+        self._cuadros.append(len(self._tipos) if movimientos is None else movimientos)
+
+    # Agrega al final los cuadros de otro registro (que puede empezar en otra ruta)
+    def extender(self, otro):
+        if isinstance(otro, RegistroRutas):
+            self._tipos.append(_REINICIO)
+            self._i.append(0)
+            self._j.append(0)
+            inicio = len(self._tipos)
+            self._claves_pos.extend(pos + inicio for pos in otro._claves_pos)
+            self._claves.extend(otro._claves)
+            self._tipos.extend(otro._tipos)
+            self._i.extend(otro._i)
+            self._j.extend(otro._j)
+            self._cuadros.extend(pos + inicio for pos in otro._cuadros)
+            self._desde_clave = otro._desde_clave
+            return
+        # Cualquier otra secuencia de rutas: un cuadro clave por ruta
+        for ruta in otro:
+            self._tipos.append(_REINICIO)
+            self._i.append(0)
+            self._j.append(0)
+            self._claves_pos.append(len(self._tipos))
+            self._claves.append(array('i', ruta))
+            self._cuadros.append(len(self._tipos))
+            self._desde_clave = 0
+
+    def __len__(self):
+        return len(self._cuadros)
+
+    # Ruta del cuadro k (una lista nueva)
+    def __getitem__(self, k):
+        if k < 0:
+            k += len(self._cuadros)
+        if not 0 <= k < len(self._cuadros):
+            raise IndexError("cuadro fuera de rango")
+        objetivo = self._cuadros[k]
+        clave = bisect_right(self._claves_pos, objetivo) - 1
+        inicio = self._claves_pos[clave]
+        if self._cache is not None and inicio <= self._cache[0] <= objetivo:
+            # Seguir desde el último cuadro reconstruido
+            desde, ruta = self._cache
+        else:
+            desde, ruta = inicio, list(self._claves[clave])
+        tipos, ii, jj = self._tipos, self._i, self._j
+        for m in range(desde, objetivo):
+            if tipos[m] != _REINICIO:
+                _APLICAR[tipos[m]](ruta, ii[m], jj[m])
+        self._cache = (objetivo, ruta)
+        return list(ruta)
+
+    def __iter__(self):
+        for k in range(len(self._cuadros)):
+            yield self[k]
+
+    # Bytes que ocupan los movimientos, los cuadros y los cuadros clave
+    def tamano_bytes(self):
+        arreglos = [self._tipos, self._i, self._j, self._claves_pos, self._cuadros] + self._claves
+        return sum(len(a) * a.itemsize for a in arreglos)
+
+    # El caché no se envía a otros procesos
+    def __getstate__(self):
+        estado = self.__dict__.copy()
+        estado["_cache"] = None
+        return estado
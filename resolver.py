@@ -0,0 +1,415 @@
+"""
+Problema del Viajero (TSP) - Resolución desde la línea de comandos
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Resuelve uno o varios archivos de puntos con la secuencia de etapas que se
+elija (construcción, mejora local, Annealing) y escribe las rutas, las
+longitudes y, si se piden, las estadísticas en JSON. No usa matplotlib, así
+que sirve para ejecutar el resolvedor sin pantalla.
+
+Con --lote se resuelven muchas instancias a la vez (una por proceso) y se
+escribe una línea JSON por instancia en cuanto termina; si la ejecución se
+interrumpe, al repetirla se saltan las instancias que ya están en la salida.
+
+Uso:
+    python resolver.py datos_60.txt
+    python resolver.py datos_*.txt --etapas rejilla or2opt --salida rutas.json
+    python resolver.py datos_200.txt --semilla 7 --intentos 10 --procesos 4 --limite-tiempo 30
+    python resolver.py instancias/ --lote --salida resultados.jsonl --trabajadores 8
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import main_optimizado as m
+from busqueda_local import dos_opt_vecinos, or2opt, or_lk, or_opt
+from carga import cargar_instancia
+from construccion import arista_voraz, ruta_curva
+from cota_inferior import brecha, cota_inferior
+from dos_opt_vectorizado import dos_opt_vectorizado
+from estadisticas import Estadisticas, medir_fase
+from exacto import MAX_PUNTOS_EXACTO, resolver_exacto
+from genetico import algoritmo_genetico
+from indice_espacial import vecino_mas_cercano_rejilla
+from multi_start import multi_start_paralelo, procesos_disponibles, semillas_intentos
+from particion import resolver_por_particion
+
+# Etapas de main_optimizado
+ETAPAS_POR_DEFECTO = ["nn", "2opt", "or2opt", "sa"]
+
+# Parámetros de Annealing (los mismos de main_optimizado)
+PARAMETROS_SA = dict(temp_inicial=10000, temp_final=0.01, alpha=0.97, iteraciones_por_temp=300)
+
+
+# --- Etapas: cada una recibe la instancia y la ruta actual y devuelve otra ---
+
+def _nn(instancia, ruta, limite, opciones, estadisticas):
+    return m.vecino_mas_cercano(instancia["coords"], instancia["dist"], limite)
+
+
+def _rejilla(instancia, ruta, limite, opciones, estadisticas):
+    return vecino_mas_cercano_rejilla(instancia["coords"], limite)
+
+
+def _curva(curva):
+    def etapa(instancia, ruta, limite, opciones, estadisticas):
+        return ruta_curva(instancia["xy"], curva)
+    return etapa
+
+
+def _voraz(instancia, ruta, limite, opciones, estadisticas):
+    return arista_voraz(instancia["xy"], instancia["vecinos"])
+
+
+def _dos_opt(instancia, ruta, limite, opciones, estadisticas):
+    return m.dos_opt_mejorado(instancia["coords"], ruta, instancia["dist"], estadisticas, limite)
+
+
+def _dos_opt_vectorizado(instancia, ruta, limite, opciones, estadisticas):
+    return dos_opt_vectorizado(instancia["xy"], ruta, estadisticas=estadisticas, limite_tiempo=limite)
+
+
+def _busqueda_local(funcion):
+    def etapa(instancia, ruta, limite, opciones, estadisticas):
+        return funcion(instancia["coords"], ruta, instancia["vecinos"], dist=instancia["dist"],
+                       estadisticas=estadisticas, limite_tiempo=limite)
+    return etapa
+
+
+# Partición en celdas resueltas en paralelo (para 100k puntos o más)
+def _particion(instancia, ruta, limite, opciones, estadisticas):
+    return resolver_por_particion(instancia["xy"], procesos=opciones["procesos"], semilla=opciones["semilla"],
+                                  estadisticas=estadisticas, limite_tiempo=limite)
+
+
+# Algoritmo memético con islas a partir de la ruta actual
+def _genetico(instancia, ruta, limite, opciones, estadisticas):
+    return algoritmo_genetico(instancia["xy"], ruta, procesos=opciones["procesos"], semilla=opciones["semilla"],
+                              vecinos=instancia["vecinos"], estadisticas=estadisticas, limite_tiempo=limite)
+
+
+# Multi-start de Annealing como en main_optimizado
+def _annealing(instancia, ruta, limite, opciones, estadisticas):
+    coords, dist = instancia["coords"], instancia["dist"]
+    num_intentos = opciones["intentos"]
+    if num_intentos <= 0:
+        return ruta
+    _, semillas = semillas_intentos(num_intentos, opciones["semilla"])
+    procesos = min(procesos_disponibles(opciones["procesos"]), num_intentos)
+    parametros = dict(PARAMETROS_SA, mostrar=False, adaptativo=opciones.get("sa_adaptativo", False))
+    objetivo = None
+    if opciones.get("brecha_objetivo") is not None:
+        objetivo = _cota(instancia, ruta) * (1 + opciones["brecha_objetivo"])
+        if m.longitud(coords, ruta, dist) <= objetivo:
+            return ruta
+        parametros["longitud_objetivo"] = objetivo
+    plazo = None
+    if limite is not None:
+        plazo = time.monotonic() + limite
+        parametros["limite_tiempo"] = limite / math.ceil(num_intentos / procesos)
+    mejor, mejor_clave = ruta, (m.longitud(coords, ruta, dist), 0)
+    intentos = multi_start_paralelo(m.simulated_annealing, coords, ruta, semillas, procesos, dist, estadisticas,
+                                    **parametros)
+    for recibidos, (intento, _, ruta_sa) in enumerate(intentos, 1):
+        # En empate gana el intento con menor número (resultado reproducible)
+        clave = (m.longitud(coords, ruta_sa, dist), intento)
+        if clave < mejor_clave:
+            mejor, mejor_clave = ruta_sa, clave
+        terminar = objetivo is not None and mejor_clave[0] <= objetivo
+        if plazo is not None and time.monotonic() >= plazo:
+            terminar = True
+        if terminar and recibidos < num_intentos:
+            intentos.close()
+            break
+    return mejor
+
+
+# Ruta óptima de una instancia pequeña; la ruta actual es la incumbente inicial
+def _exacto(instancia, ruta, limite, opciones, estadisticas):
+    return resolver_exacto(instancia["xy"], instancia["dist_np"], ruta, limite, estadisticas)
+
+
+# Cota inferior de la instancia (se calcula una vez, con la ruta actual como cota superior)
+def _cota(instancia, ruta):
+    if instancia.get("cota") is None:
+        instancia["cota"] = cota_inferior(instancia["xy"], m.longitud(instancia["coords"], ruta, instancia["dist"]),
+                                          dist=instancia["dist_np"])
+    return instancia["cota"]
+
+
+# Nombre de la etapa -> (función, usa la matriz de distancias, usa listas de vecinos)
+ETAPAS = {
+    "nn": (_nn, True, False),
+    "rejilla": (_rejilla, False, False),
+    "hilbert": (_curva("hilbert"), False, False),
+    "morton": (_curva("morton"), False, False),
+    "voraz": (_voraz, False, True),
+    "2opt": (_dos_opt, True, False),
+    "2opt-vec": (_dos_opt_vectorizado, False, False),
+    "2opt-vecinos": (_busqueda_local(dos_opt_vecinos), False, True),
+    "or-opt": (_busqueda_local(or_opt), False, True),
+    "or2opt": (_busqueda_local(or2opt), False, True),
+    "lk": (_busqueda_local(or_lk), False, True),
+    "sa": (_annealing, True, False),
+    "genetico": (_genetico, False, True),
+    "particion": (_particion, False, False),
+    "exacto": (_exacto, False, False),
+}
+
+
+# Resuelve un archivo con las etapas dadas y devuelve el resultado como dict
+def resolver_archivo(nombre_archivo, etapas, opciones):
+    """
+    opciones: semilla, intentos, procesos, limite_tiempo (para todo el
+    archivo, en segundos), k (vecinos de la búsqueda local), usar_cache,
+    estadisticas (True para incluirlas en el resultado), cota (True para
+    reportar la cota inferior y la brecha) y brecha_objetivo (los intentos
+    de Annealing se detienen al quedar a esa brecha de la cota) y
+    sa_adaptativo (enfriamiento adaptativo en los intentos de Annealing).
+    Con n <= MAX_PUNTOS_EXACTO la etapa sa se cambia por exacto (la ruta
+    óptima cuesta menos que los intentos de Annealing), salvo con sin_exacto;
+    con más puntos, la etapa exacto se omite (queda marcada con "omitida").
+    La cota inferior también cuesta O(n^2) por iteración.
+    La matriz de distancias (memoria O(n^2)) solo se calcula si alguna etapa
+    la usa; para instancias grandes conviene hilbert, voraz o rejilla, y luego
+    2opt-vec, or2opt y lk, y genetico en lugar de sa.
+    """
+    inicio = time.monotonic()
+    limite_tiempo = opciones.get("limite_tiempo")
+    plazo = None if limite_tiempo is None else inicio + limite_tiempo
+    estadisticas = Estadisticas() if opciones.get("estadisticas") else None
+    usa_matriz = any(ETAPAS[e][1] for e in etapas)
+    k = opciones.get("k", 8) if any(ETAPAS[e][2] for e in etapas) else None
+
+    with medir_fase(estadisticas, "carga"):
+        ids, xy, vecinos, dist_np = cargar_instancia(nombre_archivo, k=k, matriz=usa_matriz,
+                                                     usar_cache=opciones.get("usar_cache", True))
+    n = len(ids)
+    instancia = {
+        "xy": xy,
+        "coords": [tuple(p) for p in xy.tolist()],
+        "vecinos": vecinos,
+        "dist": dist_np.tolist() if usa_matriz else None,
+        "dist_np": dist_np,
+    }
+    # Sin etapa de construcción se parte del orden por ID (ya tiene los extremos fijos)
+    ruta = list(range(n))
+    resultado_etapas = []
+    if n > 3:
+        for etapa in etapas:
+            if etapa == "sa" and n <= MAX_PUNTOS_EXACTO and not opciones.get("sin_exacto"):
+                etapa = "exacto"
+            if etapa == "exacto" and n > MAX_PUNTOS_EXACTO:
+                # Sin ruta óptima a este tamaño: la etapa se omite y la ruta sigue igual
+                print(f"{nombre_archivo}: se omite la etapa exacto ({n} puntos; admite hasta "
+                      f"{MAX_PUNTOS_EXACTO})", file=sys.stderr)
+                resultado_etapas.append({
+                    "etapa": etapa,
+                    "longitud": m.longitud(instancia["coords"], ruta, instancia["dist"]),
+                    "tiempo_s": 0.0,
+                    "omitida": True,
+                })
+                continue
+            funcion = ETAPAS[etapa][0]
+            inicio_etapa = time.monotonic()
+            with medir_fase(estadisticas, etapa):
+                ruta = funcion(instancia, ruta, m.tiempo_restante(plazo), opciones, estadisticas)
+            resultado_etapas.append({
+                "etapa": etapa,
+                "longitud": m.longitud(instancia["coords"], ruta, instancia["dist"]),
+                "tiempo_s": round(time.monotonic() - inicio_etapa, 4),
+            })
+
+    resultado = {
+        "archivo": nombre_archivo,
+        "n": n,
+        "longitud": m.longitud(instancia["coords"], ruta, instancia["dist"]) if n > 1 else 0.0,
+        "tiempo_s": round(time.monotonic() - inicio, 4),
+        "etapas": resultado_etapas,
+        "ruta": ids[ruta].tolist() if n else [],
+    }
+    if opciones.get("cota") and n > 1:
+        with medir_fase(estadisticas, "cota_inferior"):
+            cota = _cota(instancia, ruta)
+        resultado["cota_inferior"] = cota
+        resultado["brecha"] = brecha(resultado["longitud"], cota)
+    if estadisticas is not None:
+        resultado["estadisticas"] = estadisticas.a_dict()
+    return resultado
+
+
+# Resuelve un archivo del lote; un archivo con error no detiene el lote
+def _resolver_en_lote(nombre_archivo, etapas, opciones):
+    try:
+        return resolver_archivo(nombre_archivo, etapas, opciones)
+    except Exception as e:  # cualquier falla de una instancia queda en su línea
+        return {"archivo": nombre_archivo, "error": f"{type(e).__name__}: {e}"}
+
+
+# Archivos que ya están en una salida JSONL (para continuar un lote)
+def instancias_terminadas(salida):
+    """
+    Devuelve los archivos de las líneas completas de la salida. Las líneas
+    con "error" no cuentan: esas instancias se vuelven a intentar (el error
+    pudo ser pasajero, como falta de memoria o de disco). Si la última línea
+    quedó a medias (la ejecución se cortó mientras se escribía), se quita
+    del archivo para que la siguiente línea empiece limpia.
+    """
+    terminadas = set()
+    if not os.path.exists(salida):
+        return terminadas
+    with open(salida, "rb+") as f:
+        contenido = f.read()
+        completo = contenido.rfind(b"\n") + 1
+        if completo < len(contenido):
+            f.truncate(completo)
+    for linea in contenido[:completo].splitlines():
+        try:
+            resultado = json.loads(linea)
+            if "error" not in resultado:
+                terminadas.add(os.path.normpath(resultado["archivo"]))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return terminadas
+
+
+# Resuelve muchos archivos en varios procesos y escribe una línea JSON por archivo
+def resolver_lote(archivos, etapas, opciones, salida, trabajadores=None):
+    """
+    salida es un archivo de texto abierto; cada resultado se escribe (y se
+    vacía a disco) en cuanto su instancia termina, así que las líneas quedan
+    en orden de término. Solo hay a la vez el doble de instancias que de
+    trabajadores en vuelo, de modo que la memoria no crece con el tamaño
+    del lote. Devuelve cuántas instancias se resolvieron.
+    """
+    trabajadores = min(procesos_disponibles(trabajadores), max(1, len(archivos)))
+
+    def escribir(resultado):
+        salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        salida.flush()
+
+    if trabajadores <= 1:
+        for nombre in archivos:
+            escribir(_resolver_en_lote(nombre, etapas, opciones))
+        return len(archivos)
+
+    pendientes = iter(archivos)
+    en_vuelo = set()
+    pool = ProcessPoolExecutor(max_workers=trabajadores)
+    try:
+        for nombre in pendientes:
+            en_vuelo.add(pool.submit(_resolver_en_lote, nombre, etapas, opciones))
+            if len(en_vuelo) < 2 * trabajadores:
+                continue
+            listos, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                escribir(futuro.result())
+        for futuro in wait(en_vuelo).done:
+            escribir(futuro.result())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return len(archivos)
+
+
+# Expande directorios (sus *.txt) y patrones glob en una lista de archivos
+def expandir_archivos(entradas):
+    archivos = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            archivos.extend(sorted(glob.glob(os.path.join(entrada, "*.txt"))))
+        elif glob.has_magic(entrada):
+            archivos.extend(sorted(f for f in glob.glob(entrada) if os.path.isfile(f)))
+        else:
+            archivos.append(entrada)
+    return archivos
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Resuelve el TSP con extremos fijos sobre archivos de puntos")
+    parser.add_argument("archivos", nargs="+", help="archivos de puntos (ID X Y), directorios o patrones glob")
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=ETAPAS_POR_DEFECTO,
+                        help="etapas en orden (por defecto: %(default)s)")
+    parser.add_argument("--semilla", type=int, help="semilla base de Annealing (por defecto, aleatoria)")
+    parser.add_argument("--intentos", type=int, default=35, help="intentos de Annealing")
+    parser.add_argument("--procesos", type=int,
+                        help="procesos para Annealing, genetico y particion (por defecto, todos los núcleos; 1 con --lote)")
+    parser.add_argument("--limite-tiempo", type=float, help="segundos máximos por archivo")
+    parser.add_argument("--cota", action="store_true", help="reportar la cota inferior (Held-Karp) y la brecha")
+    parser.add_argument("--brecha-objetivo", type=float,
+                        help="detener Annealing al quedar a esta brecha de la cota (0.01 = 1%%)")
+    parser.add_argument("--sa-adaptativo", action="store_true",
+                        help="enfriamiento adaptativo de Annealing (temperatura calibrada y término al converger)")
+    parser.add_argument("--sin-exacto", action="store_true",
+                        help=f"usar Annealing también con {MAX_PUNTOS_EXACTO} puntos o menos (en lugar de la ruta óptima)")
+    parser.add_argument("--k", type=int, default=8, help="vecinos por ciudad en la búsqueda local")
+    parser.add_argument("--sin-cache", action="store_true", help="no leer ni escribir la caché .npz")
+    parser.add_argument("--estadisticas", action="store_true", help="incluir las estadísticas de los algoritmos")
+    parser.add_argument("--salida", help="archivo JSON (o JSONL con --lote) de salida (por defecto, la salida estándar)")
+    parser.add_argument("--lote", action="store_true",
+                        help="una instancia por proceso y una línea JSON por instancia; continúa una salida existente")
+    parser.add_argument("--trabajadores", type=int, help="procesos del lote (por defecto, todos los núcleos)")
+    args = parser.parse_args(argv)
+    args.archivos = expandir_archivos(args.archivos)
+    if not args.archivos:
+        parser.error("no se encontró ningún archivo")
+    for nombre in args.archivos:
+        if not os.path.isfile(nombre):
+            parser.error(f"no existe el archivo {nombre}")
+    return args
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    # Con semilla fija cada archivo se resuelve igual que si fuera el único
+    semilla = args.semilla if args.semilla is not None else semillas_intentos(0)[0]
+    opciones = {
+        "semilla": semilla,
+        "intentos": args.intentos,
+        "procesos": args.procesos,
+        "limite_tiempo": args.limite_tiempo,
+        "k": args.k,
+        "usar_cache": not args.sin_cache,
+        "estadisticas": args.estadisticas,
+        "cota": args.cota,
+        "brecha_objetivo": args.brecha_objetivo,
+        "sin_exacto": args.sin_exacto,
+        "sa_adaptativo": args.sa_adaptativo,
+    }
+    if args.lote:
+        # Los procesos se usan para resolver varias instancias a la vez, no
+        # para los intentos de Annealing de cada una
+        if args.procesos is None:
+            opciones["procesos"] = 1
+        if not args.salida:
+            resolver_lote(args.archivos, args.etapas, opciones, sys.stdout, args.trabajadores)
+            return
+        terminadas = instancias_terminadas(args.salida)
+        pendientes = [a for a in args.archivos if os.path.normpath(a) not in terminadas]
+        print(f"{len(args.archivos) - len(pendientes)} instancias ya resueltas, {len(pendientes)} pendientes "
+              f"(semilla {semilla})", file=sys.stderr)
+        with open(args.salida, "a", encoding="utf-8") as f:
+            resolver_lote(pendientes, args.etapas, opciones, f, args.trabajadores)
+        return
+    reporte = {
+        "etapas": args.etapas,
+        "semilla": semilla,
+        "resultados": [resolver_archivo(nombre, args.etapas, opciones) for nombre in args.archivos],
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(reporte, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+
+
+# Main
+if __name__ == "__main__":
+    main()
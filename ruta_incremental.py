@@ -0,0 +1,242 @@
+"""
+Problema del Viajero (TSP) - Mantenimiento incremental de una ruta resuelta
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Cuando el conjunto de puntos cambia poco a poco (unos cuantos puntos por
+minuto sobre rutas de miles), volver a correr todo el pipeline desde la
+lectura del archivo es un desperdicio. RutaIncremental guarda la ruta ya
+resuelta, la rejilla espacial y las listas de vecinos, y aplica cada cambio
+en el lugar:
+- Insertar: el punto nuevo entra en la arista de la ruta donde cuesta menos
+  (inserción más barata), buscando solo entre las aristas de sus vecinos.
+- Eliminar: el anterior y el siguiente del punto quedan unidos.
+- Mover: se saca el punto y se vuelve a insertar en su nueva posición.
+Después, Or-2opt repara la ruta empezando solo por las ciudades de las
+aristas que cambiaron, así que la búsqueda depende del tamaño del cambio y
+no del de la ruta. Aun así, cada cambio tiene una parte O(n): la ruta es
+una lista, así que insertar o quitar un punto recorre las posiciones que le
+siguen, y cada reparación arma de nuevo el estado de la búsqueda local
+(posiciones y ciudades activas) y las posiciones de la ruta. Son pasadas
+simples, mucho más baratas que resolver todo de nuevo, pero crecen con n.
+Los extremos (ruta[0] y ruta[-1]) se pueden mover, pero no eliminar, y
+siempre siguen siendo el inicio y el final.
+"""
+
+import math
+
+from busqueda_local import or2opt
+from construccion import arista_voraz
+from distancias import coordenadas_np, vecinos_cercanos
+from indice_espacial import RejillaEspacial
+
+
+class RutaIncremental:
+    """
+    Ruta con extremos fijos sobre un conjunto de puntos que cambia.
+    Los puntos se identifican por su ID (como en los archivos de datos);
+    internamente cada uno tiene un índice, y los índices de los puntos
+    eliminados se reutilizan para los nuevos.
+    """
+
+    def __init__(self, coords, ruta=None, ids=None, k=8):
+        """
+        coords: lista de (x, y) o arreglo (n, 2), con al menos 2 puntos.
+        ruta: ruta ya resuelta sobre los índices de coords (por defecto,
+        arista voraz + Or-2opt del índice 0 al n-1).
+        ids: ID de cada punto (por defecto, su índice), por ejemplo los de
+        carga.cargar_puntos.
+        k: vecinos por punto para la inserción y la reparación.
+        """
+        xy = coordenadas_np(coords)
+        n = len(xy)
+        if n < 2:
+            raise ValueError("la ruta necesita al menos el punto inicial y el final")
+        self.k = k
+        self.coords = [tuple(p) for p in xy.tolist()]
+        if ids is None:
+            ids = range(n)
+        self.ids = ids.tolist() if hasattr(ids, "tolist") else list(ids)
+        self.indice = {id_: i for i, id_ in enumerate(self.ids)}
+        if len(self.ids) != n or len(self.indice) != n:
+            raise ValueError("se necesita un ID distinto para cada punto")
+        self.libres = []  # índices de puntos eliminados, para reutilizarlos
+        vecinos = vecinos_cercanos(xy, k)
+        if ruta is None:
+            ruta = or2opt(self.coords, arista_voraz(xy, vecinos), vecinos)
+        self.ruta = list(ruta)
+        self.pos = [0] * n
+        self._actualizar_posiciones()
+        self.rejilla = RejillaEspacial(self.coords)
+        # vecinos[i]: los k puntos más cercanos a i, de menor a mayor distancia;
+        # inversos[i]: los puntos que tienen a i en su lista
+        self.vecinos = vecinos.tolist()
+        self.inversos = [set() for _ in range(n)]
+        for i, lista in enumerate(self.vecinos):
+            for j in lista:
+                self.inversos[j].add(i)
+        self.activas = []  # ciudades pendientes de reparar
+
+    def __len__(self):
+        return len(self.ruta)
+
+    def __contains__(self, id_):
+        return id_ in self.indice
+
+    def _d(self, i, j):
+        a, b = self.coords[i], self.coords[j]
+        return math.hypot(a[0] - b[0], a[1] - b[1])
+
+    def _actualizar_posiciones(self, desde=0):
+        ruta, pos = self.ruta, self.pos
+        for p in range(desde, len(ruta)):
+            pos[ruta[p]] = p
+
+    def _buscar(self, id_):
+        i = self.indice.get(id_)
+        if i is None:
+            raise ValueError(f"no existe el punto {id_}")
+        return i
+
+    # --- Listas de vecinos ---
+
+    def _fijar_vecinos(self, i, lista):
+        for j in self.vecinos[i]:
+            self.inversos[j].discard(i)
+        self.vecinos[i] = lista
+        for j in lista:
+            self.inversos[j].add(i)
+
+    def _calcular_vecinos(self, i):
+        x, y = self.coords[i]
+        return self.rejilla.k_mas_cercanos(x, y, self.k, excluir=i)
+
+    # Lista propia del punto i y entrada de i en las listas de los puntos
+    # cercanos para los que ahora es uno de sus k más cercanos. Se revisan
+    # los 2k puntos más cercanos a i: las listas son una heurística, así que
+    # no hace falta la búsqueda inversa exacta
+    def _anunciar(self, i):
+        self._fijar_vecinos(i, self._calcular_vecinos(i))
+        x, y = self.coords[i]
+        for j in self.rejilla.k_mas_cercanos(x, y, 2 * self.k, excluir=i):
+            lista = self.vecinos[j]
+            if i in lista:
+                continue
+            d_ji = self._d(j, i)
+            if len(lista) >= self.k and d_ji >= self._d(j, lista[-1]):
+                continue
+            p = len(lista)
+            while p > 0 and self._d(j, lista[p - 1]) > d_ji:
+                p -= 1
+            self._fijar_vecinos(j, (lista[:p] + [i] + lista[p:])[:self.k])
+
+    # Los puntos que tenían a i en su lista la recalculan sin él (o con i en
+    # su nueva posición)
+    def _retirar(self, i):
+        for j in list(self.inversos[i]):
+            self._fijar_vecinos(j, self._calcular_vecinos(j))
+
+    # --- Cambios sobre la ruta ---
+
+    # Inserta i en la arista de la ruta donde agrega menos longitud
+    def _insertar_en_ruta(self, i):
+        ruta, pos = self.ruta, self.pos
+        mejor, mejor_costo = 0, math.inf
+        for j in self.vecinos[i]:
+            p = pos[j]
+            for q in (p - 1, p):
+                if q < 0 or q + 1 >= len(ruta):
+                    continue
+                a, b = ruta[q], ruta[q + 1]
+                costo = self._d(a, i) + self._d(i, b) - self._d(a, b)
+                if costo < mejor_costo:
+                    mejor, mejor_costo = q, costo
+        ruta.insert(mejor + 1, i)
+        self._actualizar_posiciones(mejor + 1)
+        self.activas.extend((ruta[mejor], i, ruta[mejor + 2]))
+
+    def _sacar_de_ruta(self, i):
+        p = self.pos[i]
+        del self.ruta[p]
+        self._actualizar_posiciones(p)
+        self.activas.extend((self.ruta[p - 1], self.ruta[p]))
+
+    def _es_extremo(self, i):
+        return i == self.ruta[0] or i == self.ruta[-1]
+
+    # Agrega un punto nuevo
+    def insertar(self, id_, x, y, reparar=True):
+        if id_ in self.indice:
+            raise ValueError(f"ya existe el punto {id_}")
+        if self.libres:
+            i = self.libres.pop()
+            self.coords[i] = (x, y)
+            self.ids[i] = id_
+        else:
+            i = len(self.coords)
+            self.coords.append((x, y))
+            self.ids.append(id_)
+            self.pos.append(0)
+            self.vecinos.append([])
+            self.inversos.append(set())
+        self.indice[id_] = i
+        self.rejilla.colocar(i, x, y)
+        self._anunciar(i)
+        self._insertar_en_ruta(i)
+        if reparar:
+            self.reparar()
+
+    # Quita un punto (no puede ser el inicio ni el final)
+    def eliminar(self, id_, reparar=True):
+        i = self._buscar(id_)
+        if self._es_extremo(i):
+            raise ValueError(f"el punto {id_} es un extremo de la ruta y no se puede eliminar")
+        self._sacar_de_ruta(i)
+        self.rejilla.eliminar(i)
+        self._retirar(i)
+        self._fijar_vecinos(i, [])
+        del self.indice[id_]
+        self.ids[i] = None
+        self.libres.append(i)
+        if reparar:
+            self.reparar()
+
+    # Cambia las coordenadas de un punto; los extremos siguen en su lugar
+    def mover(self, id_, x, y, reparar=True):
+        i = self._buscar(id_)
+        extremo = self._es_extremo(i)
+        if not extremo:
+            self._sacar_de_ruta(i)
+        self.coords[i] = (x, y)
+        self.rejilla.colocar(i, x, y)
+        self._retirar(i)
+        self._anunciar(i)
+        if extremo:
+            p = self.pos[i]
+            self.activas.extend(self.ruta[max(0, p - 1):p + 2])
+        else:
+            self._insertar_en_ruta(i)
+        if reparar:
+            self.reparar()
+
+    # Or-2opt que empieza solo por las ciudades de las aristas que cambiaron
+    def reparar(self, estadisticas=None, limite_tiempo=None):
+        """
+        Con reparar=False en insertar, eliminar y mover se pueden acumular
+        varios cambios y repararlos todos juntos con una sola llamada.
+        """
+        activas = [i for i in self.activas if self.ids[i] is not None]
+        self.activas = []
+        if not activas:
+            return
+        self.ruta = or2opt(self.coords, self.ruta, self.vecinos, estadisticas=estadisticas,
+                           limite_tiempo=limite_tiempo, activas=activas)
+        self._actualizar_posiciones()
+
+    # Ruta como lista de IDs
+    def ruta_ids(self):
+        return [self.ids[i] for i in self.ruta]
+
+    def longitud(self):
+        ruta = self.ruta
+        return sum(self._d(ruta[p], ruta[p + 1]) for p in range(len(ruta) - 1))
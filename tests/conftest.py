@@ -0,0 +1,13 @@
+"""
+Problema del Viajero (TSP) - Configuración de las pruebas
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Los módulos del proyecto están en la raíz del repositorio; se agrega al
+path para poder importarlos al correr pytest desde cualquier carpeta.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+"""
+Problema del Viajero (TSP) - Pruebas del enfriamiento adaptativo
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+simulated_annealing(adaptativo=True) calibra la temperatura inicial,
+recalienta al estancarse y termina al converger; con semilla fija, la ruta
+debe conservar los extremos, no ser más larga que la inicial y no pasar de
+MAX_RECALENTAMIENTOS recalentamientos.
+"""
+
+import random
+
+import pytest
+
+import main_optimizado as m
+from estadisticas import Estadisticas
+
+
+def _instancia(n, semilla):
+    azar = random.Random(semilla)
+    return [(azar.uniform(0, 100), azar.uniform(0, 100)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+@pytest.mark.parametrize("inicial", ["orden", "dos_opt"])
+def test_adaptativo(semilla, inicial):
+    coords = _instancia(30, semilla)
+    dist = m.matriz_distancias(coords)
+    ruta_inicial = list(range(len(coords)))
+    if inicial == "dos_opt":
+        ruta_inicial = m.dos_opt_simple(coords, ruta_inicial, dist)
+    random.seed(semilla)
+    estadisticas = Estadisticas()
+    ruta = m.simulated_annealing(coords, list(ruta_inicial), dist=dist, mostrar=False,
+                                 estadisticas=estadisticas, adaptativo=True)
+    assert sorted(ruta) == list(range(len(coords)))
+    assert ruta[0] == ruta_inicial[0] and ruta[-1] == ruta_inicial[-1]
+    assert m.longitud(coords, ruta, dist) <= m.longitud(coords, ruta_inicial, dist) + 1e-9
+    assert 0 <= estadisticas.contadores["sa.recalentamientos"] <= m.MAX_RECALENTAMIENTOS
+
+
+def test_adaptativo_respeta_el_maximo_de_recalentamientos(monkeypatch):
+    coords = _instancia(30, 4)
+    dist = m.matriz_distancias(coords)
+    ruta_inicial = m.dos_opt_simple(coords, list(range(len(coords))), dist)
+    usados = []
+    for maximo in (0, 1, 3):
+        monkeypatch.setattr(m, "MAX_RECALENTAMIENTOS", maximo)
+        random.seed(4)
+        estadisticas = Estadisticas()
+        m.simulated_annealing(coords, list(ruta_inicial), dist=dist, mostrar=False,
+                              estadisticas=estadisticas, adaptativo=True)
+        usados.append(estadisticas.contadores["sa.recalentamientos"])
+        assert usados[-1] <= maximo
+    # Desde un óptimo local se estanca enseguida: sí llega a recalentar
+    assert max(usados) > 0
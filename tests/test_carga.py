@@ -0,0 +1,154 @@
+"""
+Problema del Viajero (TSP) - Pruebas de carga.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+cargar_puntos debe leer exactamente los mismos puntos que leer_puntos (ya
+ordenados como puntos.sort() en los scripts), también en archivos sucios.
+cargar_instancia debe notar cuando el archivo cambia, reutilizar la caché
+cuando solo cambia la fecha y seguir funcionando si no puede escribirla.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import carga
+from carga import cargar_instancia, cargar_puntos
+from distancias import matriz_distancias_np, vecinos_cercanos
+from main_optimizado import leer_puntos
+
+SUCIO = (
+    "3 10.5 20.25\n"
+    "\n"
+    "   \n"
+    "1 -4 7e2\n"
+    "2\t0.5\t.25  columna extra\n"
+    "4 1.0\n"
+    "x 1.0 2.0\n"
+    "5 uno 2.0\n"
+    "6 1.0 2.0.0\n"
+    "7.0 1.0 2.0\n"
+    "2 +3.5 -0.0\r\n"
+    "  8   1e-3   4E+1  \n"
+    "0 0 0\n"
+    "  OJO: lo que sigue son notas\n"
+    "9 1.0 1.0\n"
+)
+
+
+# Lo que leen los scripts: leer_puntos y luego puntos.sort()
+def _esperado(archivo):
+    puntos = sorted(leer_puntos(archivo))
+    ids = np.array([p[0] for p in puntos], dtype=np.int64)
+    coords = np.array([(p[1], p[2]) for p in puntos], dtype=np.float64).reshape(-1, 2)
+    return ids, coords
+
+
+@pytest.mark.parametrize("texto", [
+    SUCIO,
+    SUCIO.replace("\n", "\r\n"),
+    SUCIO.split("  OJO")[0],
+    "OJO al inicio\n1 2 3\n",
+    "",
+    "\n\n",
+    "".join(f"{i} {i * 0.5} {-i}\n" for i in range(200, 0, -1)),
+])
+@pytest.mark.parametrize("tam_bloque", [16, 1 << 22])
+def test_cargar_puntos_igual_a_leer_puntos(texto, tam_bloque, tmp_path):
+    archivo = tmp_path / "puntos.txt"
+    archivo.write_bytes(texto.encode("utf-8"))
+    ids, coords = cargar_puntos(str(archivo), tam_bloque=tam_bloque)
+    esperado_ids, esperado_coords = _esperado(str(archivo))
+    assert ids.dtype == np.int64 and coords.dtype == np.float64
+    assert coords.shape == (len(ids), 2)
+    np.testing.assert_array_equal(ids, esperado_ids)
+    np.testing.assert_array_equal(coords, esperado_coords)
+
+
+# --- Caché binaria (cargar_instancia) ---
+
+def _escribir_instancia(archivo, desplazamiento=0.0, mtime_ns=None):
+    archivo.write_text("".join(f"{i} {i + desplazamiento} {i * i % 7}\n" for i in range(1, 13)))
+    if mtime_ns is not None:
+        os.utime(archivo, ns=(mtime_ns, mtime_ns))
+
+
+def _archivos(carpeta):
+    return sorted(p.name for p in carpeta.iterdir())
+
+
+def test_cache_detecta_archivo_cambiado(tmp_path):
+    archivo = tmp_path / "puntos.txt"
+    _escribir_instancia(archivo, mtime_ns=10 ** 18)
+    _, coords, _, dist = cargar_instancia(str(archivo), k=3, matriz=True)
+    assert coords[0, 0] == 1.0
+    # Mismo tamaño, otro contenido y otra fecha: se vuelve a leer el texto
+    _escribir_instancia(archivo, desplazamiento=1.0, mtime_ns=2 * 10 ** 18)
+    ids, coords, vecinos, dist = cargar_instancia(str(archivo), k=3, matriz=True)
+    esperado_ids, esperado_coords = cargar_puntos(str(archivo))
+    np.testing.assert_array_equal(ids, esperado_ids)
+    np.testing.assert_array_equal(coords, esperado_coords)
+    np.testing.assert_allclose(dist, matriz_distancias_np(esperado_coords))
+    np.testing.assert_array_equal(vecinos, vecinos_cercanos(esperado_coords, 3))
+
+
+def test_cache_sobrevive_cambio_de_fecha(tmp_path, monkeypatch):
+    archivo = tmp_path / "puntos.txt"
+    _escribir_instancia(archivo, mtime_ns=10 ** 18)
+    antes = cargar_instancia(str(archivo), k=3, matriz=True)
+    os.utime(archivo, ns=(3 * 10 ** 18, 3 * 10 ** 18))
+
+    def sin_leer(*args, **kwargs):
+        raise AssertionError("no debería volver a leer el texto ni recalcular")
+
+    monkeypatch.setattr(carga, "cargar_puntos", sin_leer)
+    monkeypatch.setattr(carga, "vecinos_cercanos", sin_leer)
+    monkeypatch.setattr(carga, "matriz_distancias_np", sin_leer)
+    despues = cargar_instancia(str(archivo), k=3, matriz=True)
+    for a, b in zip(antes, despues):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_cache_otro_k_no_reescribe_la_matriz(tmp_path):
+    archivo = tmp_path / "puntos.txt"
+    _escribir_instancia(archivo)
+    cargar_instancia(str(archivo), k=3, matriz=True)
+    estado = os.stat(carga.nombre_cache_dist(str(archivo)))
+    _, _, vecinos, dist = cargar_instancia(str(archivo), k=5, matriz=True)
+    nuevo = os.stat(carga.nombre_cache_dist(str(archivo)))
+    assert (nuevo.st_ino, nuevo.st_mtime_ns) == (estado.st_ino, estado.st_mtime_ns)
+    assert vecinos.shape == (12, 5) and dist.shape == (12, 12)
+    # Solo las cachés, sin temporales olvidados
+    assert _archivos(tmp_path) == ["puntos.txt", "puntos.txt.dist.npz", "puntos.txt.npz"]
+
+
+def test_cache_no_escribible_carga_en_memoria(tmp_path, monkeypatch):
+    archivo = tmp_path / "puntos.txt"
+    _escribir_instancia(archivo)
+
+    def sin_permiso(*args, **kwargs):
+        raise PermissionError("directorio de solo lectura")
+
+    monkeypatch.setattr(carga.tempfile, "mkstemp", sin_permiso)
+    ids, coords, vecinos, dist = cargar_instancia(str(archivo), k=3, matriz=True)
+    esperado_ids, esperado_coords = cargar_puntos(str(archivo))
+    np.testing.assert_array_equal(ids, esperado_ids)
+    np.testing.assert_array_equal(coords, esperado_coords)
+    assert vecinos.shape == (12, 3) and dist.shape == (12, 12)
+    assert _archivos(tmp_path) == ["puntos.txt"]
+
+
+@pytest.mark.skipif(not hasattr(os, "geteuid") or os.geteuid() == 0,
+                    reason="root puede escribir en un directorio de solo lectura")
+def test_cache_en_directorio_de_solo_lectura(tmp_path):
+    archivo = tmp_path / "puntos.txt"
+    _escribir_instancia(archivo)
+    os.chmod(tmp_path, 0o555)
+    try:
+        ids, coords, _, dist = cargar_instancia(str(archivo), matriz=True)
+        assert len(ids) == 12 and dist.shape == (12, 12)
+        assert _archivos(tmp_path) == ["puntos.txt"]
+    finally:
+        os.chmod(tmp_path, 0o755)
@@ -0,0 +1,48 @@
+"""
+Problema del Viajero (TSP) - Pruebas de cota_inferior.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+La cota de Held-Karp nunca puede pasar de la longitud de la ruta óptima
+(calculada con exacto.dp_held_karp), con o sin matriz de distancias y con
+o sin una cota superior.
+"""
+
+import random
+
+import pytest
+
+from cota_inferior import brecha, cota_inferior
+from distancias import matriz_distancias_np
+from exacto import dp_held_karp
+
+TOLERANCIA = 1e-9
+
+
+def _instancia(n, semilla):
+    azar = random.Random(semilla)
+    return [(azar.uniform(0, 100), azar.uniform(0, 100)) for _ in range(n)]
+
+
+def _optimo(coords, dist):
+    ruta = dp_held_karp(coords, dist)
+    return sum(dist[ruta[k]][ruta[k + 1]] for k in range(len(ruta) - 1))
+
+
+@pytest.mark.parametrize("n", [3, 5, 8, 12])
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_cota_no_pasa_del_optimo(n, semilla):
+    coords = _instancia(n, semilla)
+    dist = matriz_distancias_np(coords)
+    optimo = _optimo(coords, dist)
+    for cota in (cota_inferior(coords), cota_inferior(coords, dist=dist),
+                 cota_inferior(coords, cota_superior=optimo, dist=dist),
+                 cota_inferior(coords, cota_superior=1.5 * optimo)):
+        assert 0 < cota <= optimo * (1 + TOLERANCIA)
+    assert brecha(optimo, cota) >= 0.0
+
+
+def test_cota_en_puntos_alineados_es_el_optimo():
+    # Sobre una recta la ruta óptima es el segmento y la cota lo alcanza
+    coords = [(float(x), 0.0) for x in (0, 3, 1, 4, 2, 5)]
+    assert cota_inferior(coords) == pytest.approx(5.0)
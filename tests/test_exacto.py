@@ -0,0 +1,72 @@
+"""
+Problema del Viajero (TSP) - Pruebas de exacto.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Con n <= 9 se pueden probar todas las rutas: la programación dinámica y la
+ramificación y poda deben dar la misma longitud que la fuerza bruta.
+"""
+
+import itertools
+import random
+
+import pytest
+
+from distancias import matriz_distancias_np
+from exacto import MAX_PUNTOS_EXACTO, dp_held_karp, ramificacion_y_poda, resolver_exacto
+
+
+def _instancia(n, semilla):
+    azar = random.Random(semilla)
+    if semilla == 0:
+        # Rejilla con puntos repetidos: muchos empates entre rutas
+        return [(float(k % 3), float(k // 3 % 2)) for k in range(n)]
+    return [(azar.uniform(0, 100), azar.uniform(0, 100)) for _ in range(n)]
+
+
+def _longitud(dist, ruta):
+    return sum(dist[ruta[k]][ruta[k + 1]] for k in range(len(ruta) - 1))
+
+
+# Mejor longitud de 0 a n-1 probando todos los órdenes de los puntos interiores
+def fuerza_bruta(dist):
+    n = len(dist)
+    return min(_longitud(dist, (0,) + orden + (n - 1,)) for orden in itertools.permutations(range(1, n - 1)))
+
+
+def _es_ruta(ruta, n):
+    return sorted(ruta) == list(range(n)) and ruta[0] == 0 and ruta[-1] == n - 1
+
+
+CASOS = [(n, semilla) for n in range(2, 10) for semilla in (0, 1, 2)]
+
+
+@pytest.mark.parametrize("n, semilla", CASOS)
+def test_dp_held_karp_igual_a_fuerza_bruta(n, semilla):
+    coords = _instancia(n, semilla)
+    dist = matriz_distancias_np(coords)
+    ruta = dp_held_karp(coords)
+    assert _es_ruta(ruta, n)
+    assert _longitud(dist, ruta) == pytest.approx(fuerza_bruta(dist))
+
+
+@pytest.mark.parametrize("n, semilla", CASOS)
+def test_ramificacion_y_poda_igual_a_fuerza_bruta(n, semilla):
+    coords = _instancia(n, semilla)
+    dist = matriz_distancias_np(coords)
+    ruta = ramificacion_y_poda(coords, dist=dist)
+    assert _es_ruta(ruta, n)
+    assert _longitud(dist, ruta) == pytest.approx(fuerza_bruta(dist))
+
+
+def test_ramificacion_y_poda_mejora_una_ruta_inicial_mala():
+    coords = _instancia(9, 3)
+    dist = matriz_distancias_np(coords)
+    ruta = ramificacion_y_poda(coords, ruta_inicial=list(range(9)), dist=dist)
+    assert _longitud(dist, ruta) == pytest.approx(fuerza_bruta(dist))
+
+
+def test_resolver_exacto_rechaza_instancias_grandes():
+    coords = _instancia(MAX_PUNTOS_EXACTO + 1, 1)
+    with pytest.raises(ValueError):
+        resolver_exacto(coords)
@@ -0,0 +1,61 @@
+"""
+Problema del Viajero (TSP) - Pruebas de movimientos.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Cada delta en O(1) debe coincidir con la diferencia de longitudes de la
+ruta completa antes y después de aplicar el movimiento.
+"""
+
+import math
+import random
+
+import pytest
+
+from movimientos import (aplicar_insercion, aplicar_intercambio, aplicar_inversion, delta_insercion,
+                         delta_intercambio, delta_inversion)
+
+N = 12
+
+
+def _longitud(ruta, dist):
+    return sum(dist[ruta[k]][ruta[k + 1]] for k in range(len(ruta) - 1))
+
+
+@pytest.fixture
+def instancia():
+    azar = random.Random(7)
+    coords = [(azar.uniform(0, 100), azar.uniform(0, 100)) for _ in range(N)]
+    dist = [[math.dist(a, b) for b in coords] for a in coords]
+    ruta = [0] + azar.sample(range(1, N - 1), N - 2) + [N - 1]
+    return ruta, dist
+
+
+# Todos los pares de posiciones interiores (los extremos nunca se mueven)
+PARES = [(i, j) for i in range(1, N - 1) for j in range(1, N - 1)]
+
+
+@pytest.mark.parametrize("i, j", [(i, j) for i, j in PARES if i != j])
+def test_delta_intercambio(instancia, i, j):
+    ruta, dist = instancia
+    nueva = ruta[:]
+    aplicar_intercambio(nueva, i, j)
+    assert delta_intercambio(ruta, i, j, dist) == pytest.approx(_longitud(nueva, dist) - _longitud(ruta, dist))
+
+
+@pytest.mark.parametrize("i, j", [(i, j) for i, j in PARES if i < j])
+def test_delta_inversion(instancia, i, j):
+    ruta, dist = instancia
+    nueva = ruta[:]
+    aplicar_inversion(nueva, i, j)
+    assert delta_inversion(ruta, i, j, dist) == pytest.approx(_longitud(nueva, dist) - _longitud(ruta, dist))
+
+
+@pytest.mark.parametrize("i, j", PARES)
+def test_delta_insercion(instancia, i, j):
+    ruta, dist = instancia
+    nueva = ruta[:]
+    aplicar_insercion(nueva, i, j)
+    assert delta_insercion(ruta, i, j, dist) == pytest.approx(_longitud(nueva, dist) - _longitud(ruta, dist),
+                                                              abs=1e-9)
+    assert nueva[0] == ruta[0] and nueva[-1] == ruta[-1]
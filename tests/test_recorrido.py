@@ -0,0 +1,93 @@
+"""
+Problema del Viajero (TSP) - Pruebas de recorrido.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Recorrido debe comportarse igual que una lista con las mismas operaciones,
+y la búsqueda local sobre un Recorrido debe dar la misma ruta que sobre la
+lista.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+import busqueda_local
+from distancias import vecinos_cercanos
+from recorrido import Recorrido
+
+
+def _revisar(recorrido, lista):
+    assert recorrido.tolist() == lista
+    assert len(recorrido) == len(lista)
+    for p, c in enumerate(lista):
+        assert recorrido[p] == c
+        assert recorrido.posicion(c) == p
+        assert recorrido.siguiente(c) == (lista[p + 1] if p + 1 < len(lista) else None)
+        assert recorrido.anterior(c) == (lista[p - 1] if p > 0 else None)
+
+
+@pytest.mark.parametrize("n, tam_segmento", [(1, None), (7, 2), (50, None), (200, 8)])
+def test_operaciones_igual_que_lista(n, tam_segmento):
+    azar = random.Random(n)
+    lista = list(range(n))
+    azar.shuffle(lista)
+    recorrido = Recorrido(lista, tam_segmento)
+    for _ in range(300):
+        i, j = sorted(azar.randrange(n) for _ in range(2))
+        operacion = azar.choice(("invertir", "mover", "intercambiar"))
+        if operacion == "invertir":
+            recorrido.invertir(i, j)
+            lista[i:j + 1] = lista[i:j + 1][::-1]
+        elif operacion == "mover":
+            i, j = azar.sample((i, j), 2)
+            recorrido.mover(i, j)
+            lista.insert(j, lista.pop(i))
+        else:
+            recorrido.intercambiar(i, j)
+            lista[i], lista[j] = lista[j], lista[i]
+    _revisar(recorrido, lista)
+    copia = recorrido.copia()
+    if n > 1:
+        recorrido.invertir(0, n - 1)
+    assert copia.tolist() == lista
+    assert recorrido.a_numpy().tolist() == lista[::-1]
+
+
+def test_indices_con_huecos():
+    ruta = [0, 9, 4, 7, 2]
+    recorrido = Recorrido(ruta, 2, capacidad=10)
+    recorrido.invertir(1, 3)
+    _revisar(recorrido, [0, 7, 4, 9, 2])
+
+
+# La búsqueda con Recorrido hace los mismos movimientos, en el mismo orden
+@pytest.mark.parametrize("motor", ["dos_opt_vecinos", "or_opt", "or2opt", "lin_kernighan", "or_lk"])
+def test_busqueda_local_igual_con_recorrido(motor, monkeypatch):
+    n = 300
+    xy = np.random.default_rng(5).random((n, 2)) * 100
+    coords = [tuple(p) for p in xy.tolist()]
+    vecinos = vecinos_cercanos(xy, 8)
+    inicial = list(range(n))
+    funcion = getattr(busqueda_local, motor)
+    con_lista = funcion(coords, list(inicial), vecinos)
+    monkeypatch.setattr(busqueda_local, "MIN_PUNTOS_RECORRIDO", 0)
+    ruta = list(inicial)
+    con_recorrido = funcion(coords, ruta, vecinos)
+    assert con_recorrido is ruta
+    assert con_recorrido == con_lista
+    # Solo algunas ciudades activas, sobre una ruta que no usa todos los
+    # índices (como en ruta_incremental: los eliminados no tienen vecinos ni
+    # aparecen en las listas de los demás)
+    con_huecos = [c for c in inicial if c % 7 != 3 or c in (0, n - 1)]
+    usados = np.array(sorted(con_huecos))
+    vecinos_huecos = [[] for _ in range(n)]
+    for c, fila in zip(usados.tolist(), vecinos_cercanos(xy[usados], 8)):
+        vecinos_huecos[c] = usados[fila].tolist()
+    activas = con_huecos[40:60]
+    monkeypatch.setattr(busqueda_local, "MIN_PUNTOS_RECORRIDO", 10 ** 9)
+    esperado = funcion(coords, list(con_huecos), vecinos_huecos, activas=activas)
+    assert esperado != con_huecos and sorted(esperado) == sorted(con_huecos)
+    monkeypatch.setattr(busqueda_local, "MIN_PUNTOS_RECORRIDO", 0)
+    assert funcion(coords, list(con_huecos), vecinos_huecos, activas=activas) == esperado
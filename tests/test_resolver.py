@@ -0,0 +1,45 @@
+"""
+Problema del Viajero (TSP) - Pruebas del modo lote de resolver.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+"""
+
+import json
+import os
+
+import resolver
+from resolver import instancias_terminadas
+
+
+def test_instancias_terminadas_reintenta_errores(tmp_path):
+    salida = tmp_path / "resultados.jsonl"
+    lineas = [
+        {"archivo": "a.txt", "n": 3, "longitud": 1.0},
+        {"archivo": "b.txt", "error": "MemoryError: "},
+        {"archivo": "./c.txt", "n": 4, "longitud": 2.0},
+    ]
+    salida.write_text("".join(json.dumps(r) + "\n" for r in lineas) + '{"archivo": "d.t')
+    assert instancias_terminadas(str(salida)) == {"a.txt", os.path.normpath("c.txt")}
+    # La línea a medias se quitó del archivo
+    assert salida.read_text().endswith('"longitud": 2.0}\n')
+
+
+def test_instancias_terminadas_sin_salida(tmp_path):
+    assert instancias_terminadas(str(tmp_path / "no_existe.jsonl")) == set()
+
+
+def test_un_error_no_detiene_el_lote(tmp_path, monkeypatch):
+    def resolver_o_fallar(nombre_archivo, etapas, opciones):
+        if nombre_archivo == "malo.txt":
+            raise RuntimeError("falla inesperada")
+        return {"archivo": nombre_archivo, "n": 0}
+
+    monkeypatch.setattr(resolver, "resolver_archivo", resolver_o_fallar)
+    with open(tmp_path / "salida.jsonl", "w") as salida:
+        assert resolver.resolver_lote(["a.txt", "malo.txt", "b.txt"], ["nn"], {}, salida, trabajadores=1) == 3
+    lineas = [json.loads(linea) for linea in (tmp_path / "salida.jsonl").read_text().splitlines()]
+    assert lineas == [
+        {"archivo": "a.txt", "n": 0},
+        {"archivo": "malo.txt", "error": "RuntimeError: falla inesperada"},
+        {"archivo": "b.txt", "n": 0},
+    ]
@@ -0,0 +1,98 @@
+"""
+Problema del Viajero (TSP) - Pruebas de ruta_incremental.py
+Adrian Flores Villatoro
+Cristian Moreno Villarreal
+
+Secuencias al azar de inserciones, eliminaciones y movimientos: después de
+cada cambio la ruta debe pasar exactamente una vez por cada punto vivo, los
+extremos deben seguir siendo los mismos y las listas de vecinos deben
+coincidir con sus listas inversas.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from ruta_incremental import RutaIncremental
+
+K = 5
+
+
+def _revisar(ruta, vivos, inicio, fin):
+    ids = ruta.ruta_ids()
+    assert sorted(ids) == sorted(vivos)
+    assert ids[0] == inicio and ids[-1] == fin
+    assert len(ruta) == len(vivos)
+    for p, i in enumerate(ruta.ruta):
+        assert ruta.pos[i] == p
+    activos = set(ruta.ruta)
+    assert activos == {ruta.indice[id_] for id_ in vivos}
+    assert set(ruta.libres).isdisjoint(activos)
+    for i in range(len(ruta.vecinos)):
+        if i not in activos:
+            # Índice libre: sin ID, sin lista y en la lista de nadie
+            assert ruta.ids[i] is None and ruta.vecinos[i] == [] and not ruta.inversos[i]
+            continue
+        lista = ruta.vecinos[i]
+        assert len(lista) == len(set(lista)) <= K and i not in lista
+        assert set(lista) <= activos
+        for j in lista:
+            assert i in ruta.inversos[j]
+        for j in ruta.inversos[i]:
+            assert i in ruta.vecinos[j]
+    assert ruta.longitud() == pytest.approx(sum(
+        np.hypot(*np.subtract(ruta.coords[a], ruta.coords[b])) for a, b in zip(ruta.ruta, ruta.ruta[1:])))
+
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_cambios_al_azar(semilla):
+    azar = random.Random(semilla)
+    n = 40
+    coords = [(azar.uniform(0, 100), azar.uniform(0, 100)) for _ in range(n)]
+    ids = [100 + i for i in range(n)]
+    ruta = RutaIncremental(coords, ids=ids, k=K)
+    inicio, fin = ruta.ruta_ids()[0], ruta.ruta_ids()[-1]
+    vivos = set(ids)
+    siguiente_id = 1000
+    _revisar(ruta, vivos, inicio, fin)
+    for paso in range(150):
+        operacion = azar.choice(("insertar", "eliminar", "mover", "mover_extremo"))
+        # Con reparar=False se acumulan cambios y se reparan juntos cada tanto
+        reparar = paso % 4 != 0
+        x, y = azar.uniform(0, 100), azar.uniform(0, 100)
+        interiores = sorted(vivos - {inicio, fin})
+        if operacion == "insertar" or len(interiores) < 3:
+            ruta.insertar(siguiente_id, x, y, reparar=reparar)
+            vivos.add(siguiente_id)
+            siguiente_id += 1
+        elif operacion == "eliminar":
+            id_ = azar.choice(interiores)
+            ruta.eliminar(id_, reparar=reparar)
+            vivos.remove(id_)
+        elif operacion == "mover":
+            ruta.mover(azar.choice(interiores), x, y, reparar=reparar)
+        else:
+            ruta.mover(azar.choice((inicio, fin)), x, y, reparar=reparar)
+        _revisar(ruta, vivos, inicio, fin)
+        if paso % 10 == 9:
+            antes = ruta.longitud()
+            ruta.reparar()
+            assert ruta.longitud() <= antes + 1e-9
+            _revisar(ruta, vivos, inicio, fin)
+
+
+def test_reutiliza_indices_y_rechaza_cambios_invalidos():
+    ruta = RutaIncremental([(0, 0), (1, 0), (2, 0), (3, 0)], ids=["a", "b", "c", "d"], k=2)
+    indice_b = ruta.indice["b"]
+    ruta.eliminar("b")
+    ruta.insertar("e", 1.5, 0.5)
+    assert ruta.indice["e"] == indice_b
+    assert ruta.ruta_ids()[0] == "a" and ruta.ruta_ids()[-1] == "d"
+    with pytest.raises(ValueError):
+        ruta.eliminar("a")
+    with pytest.raises(ValueError):
+        ruta.eliminar("b")
+    with pytest.raises(ValueError):
+        ruta.insertar("c", 0.0, 0.0)
+    _revisar(ruta, {"a", "c", "d", "e"}, "a", "d")